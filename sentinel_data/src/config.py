@@ -14,6 +14,9 @@ class Settings(BaseSettings):
     # Vector DB
     QDRANT_URL: str = "http://localhost:6333"
 
+    # Recordings
+    MAX_LOST_FRAMES_FILLED: int = 64  # Cap on silence written for one gap (~4s of 64ms frames)
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,87 @@
+# sentinel_data/src/storage/ogg_opus.py
+import random
+import struct
+from typing import BinaryIO, List
+
+from sentinel_shared.utils.audio import opus_packet_samples
+
+def _crc_table() -> List[int]:
+    # Ogg CRC-32: polynomial 0x04C11DB7, not reflected, initial value 0
+    table = []
+    for i in range(256):
+        r = i << 24
+        for _ in range(8):
+            r = ((r << 1) ^ 0x04C11DB7) if r & 0x80000000 else (r << 1)
+        table.append(r & 0xFFFFFFFF)
+    return table
+
+_CRC_TABLE = _crc_table()
+
+def _ogg_crc(data: bytes) -> int:
+    crc = 0
+    for b in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ b]
+    return crc
+
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_BOS, _EOS = 0x02, 0x04
+
+class OggOpusWriter:
+    """
+    Muxes Opus packets, exactly as the client encoded them, into an Ogg
+    Opus file (RFC 7845). Nothing is decoded or re-encoded; this only adds
+    Ogg page framing, about 1% overhead.
+    """
+    PRE_SKIP = 312  # libopus encoder lookahead at 48kHz
+    PAGE_SECONDS = 1.0
+
+    def __init__(self, f: BinaryIO, channels: int = 1, input_sample_rate: int = 48000):
+        self.f = f
+        self.serial = random.getrandbits(32)
+        self.seq = 0
+        self.granule = 0  # 48kHz samples of all completed packets
+        self._segments: List[int] = []
+        self._body = bytearray()
+        self._page_samples = 0
+
+        head = struct.pack("<8sBBHIhB", b"OpusHead", 1, channels, self.PRE_SKIP,
+                           input_sample_rate, 0, 0)
+        self._write_page(head, [len(head)], 0, _BOS)
+        vendor = b"sentinel"
+        tags = b"OpusTags" + struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", 0)
+        self._write_page(tags, self._lacing(len(tags)), 0, 0)
+
+    @staticmethod
+    def _lacing(length: int) -> List[int]:
+        return [255] * (length // 255) + [length % 255]
+
+    def _write_page(self, body: bytes, segments: List[int], granule: int, flags: int):
+        header = _PAGE_HEADER.pack(b"OggS", 0, flags, granule, self.serial, self.seq, 0, len(segments))
+        page = bytearray(header + bytes(segments) + body)
+        struct.pack_into("<I", page, 22, _ogg_crc(page))
+        self.f.write(page)
+        self.seq += 1
+
+    def write_packet(self, packet: bytes):
+        lacing = self._lacing(len(packet))
+        if len(self._segments) + len(lacing) > 255:
+            self._flush(0)
+        self._segments.extend(lacing)
+        self._body += packet
+        samples = opus_packet_samples(packet)
+        self.granule += samples
+        self._page_samples += samples
+        if self._page_samples >= self.PAGE_SECONDS * 48000:
+            self._flush(0)
+
+    def _flush(self, flags: int):
+        if not self._segments and not flags:
+            return
+        self._write_page(bytes(self._body), self._segments, self.granule, flags)
+        self._segments = []
+        self._body = bytearray()
+        self._page_samples = 0
+
+    def close(self):
+        """Writes the last page with the end-of-stream flag."""
+        self._flush(_EOS)
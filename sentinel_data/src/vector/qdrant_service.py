@@ -41,7 +41,8 @@ class QdrantService:
 
     def upsert_knowledge(self, kb_items: list[dict], embeddings: list[list[float]]):
         """
-        kb_items: List of dicts with 'id', 'text', 'metadata'
+        kb_items: List of dicts with 'id', 'text', 'metadata' and optionally
+                  'org_id' (entries without one are matched for every org)
         embeddings: List of vectors
         """
         points = []
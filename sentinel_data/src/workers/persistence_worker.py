@@ -16,6 +16,9 @@ from src.config import settings
 from src.db.session import AsyncSessionLocal
 from src.db.models import Call, TranscriptSegment, Organization, User
 from src.storage.s3_service import S3Service
+from src.storage.ogg_opus import OggOpusWriter
+from sentinel_shared.schemas.events import AudioConfig, OPUS
+from sentinel_shared.utils.audio import CHANNEL_LAYOUTS, CODECS, iter_opus_packets, parse_frame, skip_frames
 
 logger = logging.getLogger("worker.persistence")
 
@@ -26,8 +29,11 @@ class PersistenceWorker:
         self.nc = None
         self.temp_dir = "/tmp/sentinel_audio"
         os.makedirs(self.temp_dir, exist_ok=True)
-        # Track active file handles: {session_id: file_handle}
+        # Sessions with audio on disk: {session_id: {channel: [(path, AudioConfig), ...]}},
+        # one file per envelope channel and run of frames in the same format (newest last)
         self.active_files = {}
+        # Newest frame sequence number written per (session_id, channel) (gap/duplicate detection)
+        self.last_seq = {}
         self.segment_queue = []
         self.BATCH_SIZE = 50
         self.FLUSH_INTERVAL = 5 # seconds
@@ -47,6 +53,8 @@ class PersistenceWorker:
         # 3. Subscribe to Audio (Group: persistence ensures we get a copy)
         # Note: In high-scale, you'd write to local disk, not RAM.
         await self.nc.subscribe("audio.raw.>", queue="persistence_archiver", cb=self.handle_audio)
+        # End-of-call from the Gateway: archive the recording
+        await self.nc.subscribe("session.end.>", queue="persistence_archiver", cb=self.handle_session_end)
 
         # 4. Subscribe to Transcript Events (We need to update Speech Service to emit these!)
         # For now, we listen to the UI triggers as a proxy for "meaningful events" to log
@@ -59,32 +67,87 @@ class PersistenceWorker:
     async def handle_audio(self, msg):
         subject = msg.subject
         session_id = subject.split(".")[-1]
-        data = msg.data
+        try:
+            header, data = parse_frame(msg.data)
+        except ValueError as e:
+            logger.warning(f"[{session_id}] Malformed audio frame dropped: {e}")
+            return
+
+        # The envelope is authoritative for the codec: after the client's
+        # Opus -> PCM fallback the frames change format mid-call
+        config = AudioConfig.from_headers(msg.headers)
+        config.encoding = CODECS.get(header.codec, config.encoding)
+
+        # Frames are appended, so anything at or behind the last written one
+        # (a duplicate, or overtaken by a later frame) is dropped. Each
+        # envelope channel (two-stream sessions) numbers its frames itself.
+        stream = (session_id, header.channel)
+        last = self.last_seq.get(stream)
+        if last is not None and header.seq <= last:
+            # A merged replay after a resume may still end with new frames
+            if header.seq + header.frames - 1 <= last:
+                return
+            header, data = skip_frames(header, data, last + 1 - header.seq, config.sample_rate, config.channels)
+        # A Gateway-merged frame covers `frames` sequence numbers
+        self.last_seq[stream] = header.seq + header.frames - 1
+        lost = header.seq - last - 1 if last is not None else 0
+
+        # OPTIMIZATION: Write to Disk (Linear I/O) instead of RAM.
+        # Opus frames are stored as received (length-prefixed packets).
+        # Channels go to separate files; a format change closes the current
+        # file and starts the next one.
+        segments = self.active_files.setdefault(session_id, {}).setdefault(header.channel, [])
+        if not segments or segments[-1][1] != config:
+            ext = "opus" if config.encoding == OPUS else "pcm"
+            segments.append((f"{self.temp_dir}/{session_id}.{header.channel}.{len(segments)}.{ext}", config))
+        file_path = segments[-1][0]
 
-        # OPTIMIZATION: Write to Disk (Linear I/O) instead of RAM
-        file_path = f"{self.temp_dir}/{session_id}.pcm"
-        
         async with aiofiles.open(file_path, "ab") as f:
+            if lost and config.encoding != OPUS:
+                # Keep the recording's timeline: silence where frames went missing
+                await f.write(bytes(min(lost, settings.MAX_LOST_FRAMES_FILLED) * (len(data) // header.frames)))
+            elif lost:
+                logger.warning(f"[{session_id}] {lost} Opus frames missing before #{header.seq}")
             await f.write(data)
 
-    # Trigger this when you detect "Call Ended" signal
+    async def handle_session_end(self, msg):
+        await self.finalize_session(msg.subject.split(".")[-1])
+
+    def _mux_opus(self, packets_path: str, ogg_path: str, config: AudioConfig):
+        with open(packets_path, "rb") as src, open(ogg_path, "wb") as dst:
+            writer = OggOpusWriter(dst, channels=config.channels, input_sample_rate=config.sample_rate)
+            for packet in iter_opus_packets(src.read()):
+                writer.write_packet(bytes(packet))
+            writer.close()
+
     async def finalize_session(self, session_id):
-        raw_path = f"{self.temp_dir}/{session_id}.pcm"
-        compressed_path = f"{self.temp_dir}/{session_id}.ogg"
-        
+        channels = self.active_files.pop(session_id, {})
+        for channel, segments in channels.items():
+            self.last_seq.pop((session_id, channel), None)
+            # One recording per channel (two-stream sessions: <id>.agent, <id>.customer)
+            # and format run; runs after a mid-call format change get a suffix
+            stem = f"{session_id}.{CHANNEL_LAYOUTS[channel]}" if channel in CHANNEL_LAYOUTS else session_id
+            for index, (path, config) in enumerate(segments):
+                name = stem if index == 0 else f"{stem}.{index}"
+                if config.encoding == OPUS:
+                    await self._finalize_opus(name, path, config)
+                else:
+                    await self._finalize_pcm(name, path, config)
+
+    async def _finalize_pcm(self, name, raw_path, config):
+        compressed_path = f"{self.temp_dir}/{name}.ogg"
         if not os.path.exists(raw_path):
             return
 
         try:
             # OPTIMIZATION: Transcode PCM -> OGG (Opus)
             # -f s16le: Input format (Signed 16-bit Little Endian)
-            # -ar 16000: Input Sample Rate
-            # -ac 1: Input Channels (Mono)
+            # -ar / -ac: Client's sample rate and channel count (AudioConfig)
             # -c:a libopus: Encoder
             # -b:a 16k: Bitrate (very low, optimized for speech)
             process = await asyncio.create_subprocess_exec(
                 "ffmpeg", "-y",
-                "-f", "s16le", "-ar", "16000", "-ac", "1", "-i", raw_path,
+                "-f", "s16le", "-ar", str(config.sample_rate), "-ac", str(config.channels), "-i", raw_path,
                 "-c:a", "libopus", "-b:a", "16k",
                 compressed_path,
                 stdout=asyncio.subprocess.DEVNULL,
@@ -93,18 +156,33 @@ class PersistenceWorker:
             await process.wait()
 
             # Upload the compressed file
-            s3_key = f"recordings/{session_id}.ogg"
+            s3_key = f"recordings/{name}.ogg"
             await self.s3.upload_file(compressed_path, s3_key)
             
             # Cleanup
             os.remove(raw_path)
             os.remove(compressed_path)
-            logger.info(f"[{session_id}] Archived compressed audio.")
+            logger.info(f"[{name}] Archived compressed audio.")
             
         except Exception as e:
             logger.error(f"Transcoding failed: {e}")
             # Fallback: Upload raw PCM if transcoding fails
 
+    async def _finalize_opus(self, name, packets_path, config):
+        compressed_path = f"{self.temp_dir}/{name}.ogg"
+        if not os.path.exists(packets_path):
+            return
+        try:
+            # OPTIMIZATION: Client already encoded Opus; just add the Ogg
+            # container (no ffmpeg, no re-encode, no quality loss)
+            await asyncio.to_thread(self._mux_opus, packets_path, compressed_path, config)
+            await self.s3.upload_file(compressed_path, f"recordings/{name}.ogg")
+            os.remove(packets_path)
+            os.remove(compressed_path)
+            logger.info(f"[{name}] Archived Opus audio (passthrough).")
+        except Exception as e:
+            logger.error(f"Opus archive failed: {e}")
+
     async def handle_ui_event(self, msg):
         """
         When the Speech Service finds a 'Trigger', we log it as a Segment.
@@ -5,14 +5,17 @@ import time
 def test_inference():
     client = httpclient.InferenceServerClient(url="localhost:8000")
     
-    # Create dummy audio (1 sec silence)
-    audio = np.zeros(16000, dtype=np.float32)
+    # Create dummy audio (1 sec silence), shape [batch, samples]
+    audio = np.zeros((1, 16000), dtype=np.float32)
+    lengths = np.array([[16000]], dtype=np.int32)
     
     # Prepare Input
     inputs = [
-        httpclient.InferInput("AUDIO_DATA", audio.shape, "FP32")
+        httpclient.InferInput("AUDIO_DATA", audio.shape, "FP32"),
+        httpclient.InferInput("AUDIO_LENGTH", lengths.shape, "INT32")
     ]
     inputs[0].set_data_from_numpy(audio)
+    inputs[1].set_data_from_numpy(lengths)
     
     # Prepare Output
     outputs = [
@@ -24,7 +27,7 @@ def test_inference():
     results = client.infer(model_name="whisper", inputs=inputs, outputs=outputs)
     end = time.time()
     
-    response = results.as_numpy("TRANSCRIPT")[0].decode('utf-8')
+    response = results.as_numpy("TRANSCRIPT")[0][0].decode('utf-8')
     print(f"Response: '{response}'")
     print(f"Latency: {(end-start)*1000:.2f}ms")
 
@@ -2,8 +2,12 @@ import json
 import triton_python_backend_utils as pb_utils
 import numpy as np
 from faster_whisper import WhisperModel
+from faster_whisper.tokenizer import Tokenizer
 import logging
 
+# Whisper always attends over a 30s window (3000 mel frames)
+N_FRAMES = 3000
+
 class TritonPythonModel:
     def initialize(self, args):
         """
@@ -15,6 +19,8 @@ class TritonPythonModel:
         params = self.model_config.get('parameters', {})
         model_size = params.get('model_size', {}).get('string_value', 'base')
         device = params.get('device', {}).get('string_value', 'cpu')
+        # Empty (default): detect each utterance's language, as transcribe() does
+        language = params.get('language', {}).get('string_value', '')
         
         # Determine compute type based on device
         compute_type = "float16" if device == "cuda" else "int8"
@@ -27,56 +33,111 @@ class TritonPythonModel:
             device=device, 
             compute_type=compute_type
         )
+        self.language = language or None
+        self.tokenizers = {}
         logging.info("Model Loaded Successfully.")
 
+    def _tokenizer(self, language):
+        tokenizer = self.tokenizers.get(language)
+        if tokenizer is None:
+            tokenizer = self.tokenizers[language] = Tokenizer(
+                self.model.hf_tokenizer,
+                self.model.model.is_multilingual,
+                task="transcribe",
+                language=language
+            )
+        return tokenizer
+
     def execute(self, requests):
         """
-        Receives a list of requests (a batch).
-        Returns a list of responses.
+        Receives a list of requests (a batch), each carrying one or more
+        padded utterances. All utterances are decoded in ONE batched
+        encoder/decoder pass, then split back into per-request responses.
         """
-        responses = []
+        audios = []
+        counts = []
 
-        # Iterate over the batch
+        # 1. Unpack every row of every request
         for request in requests:
-            # 1. Get Input Tensor
-            input_tensor = pb_utils.get_input_tensor_by_name(request, "AUDIO_DATA")
-            
-            # Convert to numpy (Float32)
-            # Input shape is [length], but batching might make it [1, length] inside the request object
-            audio_data = input_tensor.as_numpy()
-            
-            # Flatten if necessary
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.flatten()
-
-            # 2. Inference
-            # Note: faster-whisper is optimized for single-stream processing.
-            # Running a loop here inside 'execute' is sequential within this batch.
-            # However, because we used 'instance_group count: 2', we have parallelism at the process level.
-            try:
-                segments, info = self.model.transcribe(
-                    audio_data,
-                    beam_size=1,
-                    temperature=0.0,
-                    condition_on_previous_text=False
-                )
-                
-                text = " ".join([segment.text for segment in segments]).strip()
-            except Exception as e:
-                logging.error(f"Inference failed: {e}")
-                text = ""
-
-            # 3. Create Output Tensor
-            # String output must be numpy object array
-            output_np = np.array([text.encode('utf-8')], dtype=object)
-            
+            audio_data = pb_utils.get_input_tensor_by_name(request, "AUDIO_DATA").as_numpy()
+            if audio_data.ndim == 1:
+                audio_data = audio_data[np.newaxis, :]
+
+            length_tensor = pb_utils.get_input_tensor_by_name(request, "AUDIO_LENGTH")
+            if length_tensor is not None:
+                lengths = length_tensor.as_numpy().reshape(-1)
+            else:
+                lengths = [audio_data.shape[1]] * audio_data.shape[0]
+
+            for row, length in zip(audio_data, lengths):
+                audios.append(row[:int(length)])
+            counts.append(audio_data.shape[0])
+
+        # 2. Batched Inference
+        try:
+            texts = self._transcribe_batch(audios)
+        except Exception as e:
+            logging.error(f"Batched inference failed ({len(audios)} utterances): {e}")
+            texts = [""] * len(audios)
+
+        # 3. Create one response per request, in request order
+        responses = []
+        offset = 0
+        for count in counts:
+            chunk = texts[offset:offset + count]
+            offset += count
+
+            # String output must be numpy object array, shape [rows, 1]
+            output_np = np.array([[t.encode('utf-8')] for t in chunk], dtype=object)
             output_tensor = pb_utils.Tensor("TRANSCRIPT", output_np)
-            
-            # 4. Append Response
             responses.append(pb_utils.InferenceResponse(output_tensors=[output_tensor]))
 
         return responses
 
+    def _transcribe_batch(self, audios):
+        """
+        Greedy decode of up to 30s per utterance.
+        faster-whisper's transcribe() handles a single stream, so we go one
+        level down: log-mel features for each row, padded to 30s, encoded
+        and decoded by CTranslate2 as a single batch.
+        """
+        if not audios:
+            return []
+
+        features = []
+        for audio in audios:
+            mel = self.model.feature_extractor(audio)[:, :N_FRAMES]
+            if mel.shape[1] < N_FRAMES:
+                mel = np.pad(mel, ((0, 0), (0, N_FRAMES - mel.shape[1])))
+            features.append(mel)
+
+        encoder_output = self.model.encode(np.stack(features).astype(np.float32))
+
+        if self.language or not self.model.model.is_multilingual:
+            languages = [self.language or "en"] * len(audios)
+        else:
+            # Detection reuses the batch's encoder output; each row then gets
+            # its own prompt, e.g. <|startoftranscript|><|de|><|transcribe|><|notimestamps|>
+            languages = [
+                probs[0][0][2:-2]  # Most likely language token, "<|de|>" -> "de"
+                for probs in self.model.model.detect_language(encoder_output)
+            ]
+        tokenizers = [self._tokenizer(language) for language in languages]
+
+        results = self.model.model.generate(
+            encoder_output,
+            [list(t.sot_sequence) + [t.no_timestamps] for t in tokenizers],
+            beam_size=1,
+            max_length=self.model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1]
+        )
+
+        return [
+            tokenizer.decode(result.sequences_ids[0]).strip()
+            for tokenizer, result in zip(tokenizers, results)
+        ]
+
     def finalize(self):
         """Cleanup"""
         print('Cleaning up Whisper Model...')
\ No newline at end of file
@@ -1,14 +1,46 @@
 # sentinel_client/src/core/audio_engine.py
 import sounddevice as sd
 import queue
+from time import time_ns
 import numpy as np
+from sentinel_shared.schemas.events import AudioConfig, PCM_S16LE, OPUS
+from sentinel_shared.utils.audio import frame_opus_packets
 from sentinel_shared.utils.logger import setup_logger
-import numpy as np
+
+try:
+    import opuslib
+except Exception:  # libopus not installed: the client sends PCM
+    opuslib = None
 
 logger = setup_logger("client.audio")
 
+# A capture block carries a whole number of Opus packets
+OPUS_PACKET_MS = 20
+OPUS_PACKETS_PER_BLOCK = 3
+# Speech-tuned VoIP bitrate; raw 16kHz PCM is 256 kbit/s
+OPUS_BITRATE = 24000
+
+
+class OpusEncoder:
+    """Encodes capture blocks into frame payloads of length-prefixed Opus packets."""
+
+    def __init__(self, sample_rate, channels, bitrate=OPUS_BITRATE):
+        if opuslib is None:
+            raise RuntimeError("libopus is not installed")
+        self.encoder = opuslib.Encoder(sample_rate, channels, opuslib.APPLICATION_VOIP)
+        self.encoder.bitrate = bitrate
+        self.packet_samples = sample_rate * OPUS_PACKET_MS // 1000
+        self.packet_bytes = self.packet_samples * 2 * channels
+
+    def encode(self, pcm: bytes) -> bytes:
+        return frame_opus_packets(
+            self.encoder.encode(pcm[i:i + self.packet_bytes], self.packet_samples)
+            for i in range(0, len(pcm), self.packet_bytes)
+        )
+
+
 class AudioEngine:
-    def __init__(self, sample_rate=16000, channels=1):
+    def __init__(self, sample_rate=16000, channels=1, encoding=OPUS):
         self.sample_rate = sample_rate
         self.channels = channels
         self.audio_queue = queue.Queue()
@@ -16,9 +48,38 @@ class AudioEngine:
         self.is_running = False
         self.silence_threshold = 200
 
+        # OPTIMIZATION: Opus cuts uplink and NATS bandwidth ~10x. Blocks are
+        # encoded on the network thread, not in the audio callback.
+        self.encoder = None
+        if encoding == OPUS:
+            try:
+                self.encoder = OpusEncoder(sample_rate, channels)
+            except Exception as e:
+                logger.warning(f"Opus encoder unavailable ({e}); sending PCM")
+        # 60ms for Opus (three 20ms packets), 64ms for PCM
+        self.blocksize = OPUS_PACKETS_PER_BLOCK * self.encoder.packet_samples if self.encoder else 1024
+
+    @property
+    def audio_config(self) -> AudioConfig:
+        """Format of the payloads encode() returns, for the handshake."""
+        return AudioConfig(
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            encoding=OPUS if self.encoder else PCM_S16LE
+        )
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Frame payload for a captured block in the current encoding."""
+        return self.encoder.encode(pcm) if self.encoder else pcm
+
+    def fallback_to_pcm(self):
+        self.encoder = None
+
     def _callback(self, indata, frames, time, status):
         if status:
             logger.warning(f"Audio status: {status}")
+        # Capture time of the block's first sample (wall clock, microseconds)
+        capture_us = time_ns() // 1000 - frames * 1_000_000 // self.sample_rate
         
         # OPTIMIZATION: Calculate Volume (RMS) quickly using NumPy
         # Convert bytes back to numpy array for calculation (Zero-Copy view)
@@ -27,9 +88,10 @@ class AudioEngine:
         # Calculate amplitude
         volume = np.sqrt(np.mean(audio_data**2))
         
-        # Only queue if volume exceeds threshold
+        # Only queue if volume exceeds threshold. The capture timestamp lets
+        # the server re-insert the skipped silence at the right place.
         if volume > self.silence_threshold:
-            self.audio_queue.put(bytes(indata))
+            self.audio_queue.put((capture_us, bytes(indata)))
         else:
             # Optional: Log silence or send heartbeat counter
             pass
@@ -38,7 +100,7 @@ class AudioEngine:
         logger.info("Starting Audio Stream...")
         self.stream = sd.RawInputStream(
             samplerate=self.sample_rate,
-            blocksize=1024,
+            blocksize=self.blocksize,
             device=None, # Uses default mic
             channels=self.channels,
             dtype='int16',
@@ -54,7 +116,7 @@ class AudioEngine:
         self.is_running = False
 
     def get_chunk(self):
-        """Non-blocking retrieval."""
+        """Non-blocking retrieval of (capture_us, pcm)."""
         try:
             return self.audio_queue.get_nowait()
         except queue.Empty:
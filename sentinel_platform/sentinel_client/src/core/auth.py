@@ -0,0 +1,46 @@
+# sentinel_client/src/core/auth.py
+import os
+from pathlib import Path
+
+from sentinel_shared.utils.crypto import sign_jwt
+from sentinel_shared.utils.logger import setup_logger
+
+logger = setup_logger("client.auth")
+
+# Access token (JWT) from the identity provider's login, in order of precedence
+TOKEN_ENV = "SENTINEL_TOKEN"
+TOKEN_FILE = Path(os.environ.get("SENTINEL_TOKEN_FILE", Path.home() / ".sentinel" / "token"))
+
+# Local development only: mint an HS256 token with the Gateway's JWT_SECRET
+DEV_SECRET_ENV = "SENTINEL_DEV_JWT_SECRET"
+DEV_TOKEN_TTL = 12 * 3600
+
+
+class NoTokenError(Exception):
+    """No access token is configured."""
+
+
+def load_token() -> str:
+    """
+    The handshake JWT. Read on every connection attempt, so a token renewed
+    by the login step (rewriting TOKEN_FILE) is picked up on reconnect.
+    """
+    token = os.environ.get(TOKEN_ENV, "").strip()
+    if token:
+        return token
+    if TOKEN_FILE.is_file():
+        token = TOKEN_FILE.read_text().strip()
+        if token:
+            return token
+
+    secret = os.environ.get(DEV_SECRET_ENV)
+    if secret:
+        logger.warning("Using a self-signed development token")
+        claims = {
+            "sub": os.environ.get("SENTINEL_DEV_USER", "dev-user"),
+            "org_id": os.environ.get("SENTINEL_DEV_ORG", "dev-org"),
+            "roles": ["agent"],
+        }
+        return sign_jwt(claims, secret, DEV_TOKEN_TTL)
+
+    raise NoTokenError(f"No access token: set {TOKEN_ENV} or log in to write {TOKEN_FILE}")
@@ -3,14 +3,20 @@ from PyQt6.QtCore import QThread, pyqtSignal
 import asyncio
 import websockets
 import json
+from collections import deque
 from sentinel_shared.schemas.events import (
-    HandshakePayload, AudioConfig, OverlayTriggerPayload, EventType
+    HandshakePayload, AudioConfigPayload, OverlayTriggerPayload, EventType
 )
+from sentinel_shared.utils.audio import pack_frame, CODEC_IDS
 from sentinel_shared.utils.logger import setup_logger
+from src.core.auth import NoTokenError, load_token
 import ssl
 
 logger = setup_logger("client.network")
 
+# Sent but not yet acked frames, replayed after a reconnect (~16s of 64ms blocks)
+REPLAY_WINDOW = 256
+
 class NetworkWorker(QThread):
     # Signals to communicate back to Main UI Thread
     sig_connected = pyqtSignal(str) # session_id
@@ -23,6 +29,13 @@ class NetworkWorker(QThread):
         self.gateway_url = gateway_url
         self.running = True
 
+        # Session resume: a dropped link picks up the same session where the
+        # server's last received frame left off
+        self.session_id = None
+        self.reconnect_token = None
+        self.next_seq = 0
+        self.window = deque(maxlen=REPLAY_WINDOW)  # (seq, enveloped frame)
+
     def run(self):
         """Entry point for QThread."""
         asyncio.run(self._async_run())
@@ -38,15 +51,18 @@ class NetworkWorker(QThread):
                 # OPTIMIZATION: Allow self-signed certs for localhost dev
                 ssl_context.check_hostname = False
                 ssl_context.verify_mode = ssl.CERT_NONE
+                token = load_token()
                 async with websockets.connect(self.gateway_url, ssl=ssl_context) as ws:
                     logger.info("Socket Connected.")
                     retry_delay = 1 # Reset on success
                     
                     # 1. Handshake
                     handshake = HandshakePayload(
-                        token="phase1-demo-token",
+                        token=token,
                         client_version="0.1.0",
-                        audio_config=AudioConfig()
+                        audio_config=self.audio_engine.audio_config,
+                        sequenced=True,
+                        reconnect_token=self.reconnect_token
                     )
                     await ws.send(handshake.model_dump_json())
                     
@@ -55,7 +71,11 @@ class NetworkWorker(QThread):
                     ack_data = json.loads(ack_raw)
                     
                     if ack_data.get("type") == "handshake_ack":
-                        self.sig_connected.emit(ack_data.get("session_id"))
+                        if ack_data.get("session_id") != self.session_id:
+                            self.session_id = ack_data.get("session_id")
+                            self.sig_connected.emit(self.session_id)
+                        self.reconnect_token = ack_data.get("reconnect_token")
+                        await self._replay(ws, ack_data.get("resume_from", 0))
                     else:
                         logger.error("Handshake rejected")
                         await asyncio.sleep(5)
@@ -74,9 +94,21 @@ class NetworkWorker(QThread):
                     for task in pending:
                         task.cancel()
 
-            except (websockets.exceptions.ConnectionClosed, ConnectionRefusedError) as e:
-                logger.warning(f"Connection lost: {e}. Retrying in {retry_delay}s...")
-                self.sig_error.emit(f"Reconnecting in {retry_delay}s...")
+            except NoTokenError as e:
+                logger.error(str(e))
+                self.sig_error.emit("Not signed in")
+                await asyncio.sleep(max_delay)
+
+            except (websockets.exceptions.ConnectionClosed, OSError) as e:
+                rcvd = getattr(e, "rcvd", None)
+                if rcvd is not None and rcvd.code == 1008:
+                    # Token rejected: retrying at once won't help, wait for a renewed one
+                    logger.error(f"Handshake rejected: {rcvd.reason}")
+                    self.sig_error.emit("Sign-in rejected")
+                    retry_delay = max_delay
+                else:
+                    logger.warning(f"Connection lost: {e}. Retrying in {retry_delay}s...")
+                    self.sig_error.emit(f"Reconnecting in {retry_delay}s...")
                 
                 await asyncio.sleep(retry_delay)
                 # OPTIMIZATION: Exponential Backoff (1s, 2s, 4s, 8s...)
@@ -86,15 +118,43 @@ class NetworkWorker(QThread):
                 logger.error(f"Critical Network Error: {e}")
                 await asyncio.sleep(5)
 
+    async def _replay(self, ws, resume_from: int):
+        """Re-sends the frames the server had not received when the link dropped."""
+        while self.window and self.window[0][0] < resume_from:
+            self.window.popleft()
+        if self.window:
+            logger.info(f"Replaying {len(self.window)} frames from #{self.window[0][0]}")
+        for _, frame in list(self.window):
+            await ws.send(frame)
+
     async def _send_loop(self, ws):
         """Drains audio queue and sends binary frames."""
         while self.running:
             chunk = self.audio_engine.get_chunk()
             if chunk:
-                await ws.send(chunk)
+                capture_us, pcm = chunk
+                payload = await self._encode(ws, pcm)
+                codec = CODEC_IDS[self.audio_engine.audio_config.encoding]
+                # Kept until acked, so a frame lost with the link is replayed
+                seq = self.next_seq
+                self.next_seq += 1
+                frame = pack_frame(seq, payload, codec=codec, capture_us=capture_us)
+                self.window.append((seq, frame))
+                await ws.send(frame)
             else:
                 await asyncio.sleep(0.01) # Small sleep to prevent CPU burn
 
+    async def _encode(self, ws, pcm: bytes) -> bytes:
+        """Payload for one block; if the Opus encoder fails, the rest of the call is PCM."""
+        try:
+            return self.audio_engine.encode(pcm)
+        except Exception as e:
+            logger.error(f"Opus encoding failed: {e}. Falling back to PCM")
+            self.audio_engine.fallback_to_pcm()
+            # Tell the Gateway before the first PCM frame goes out
+            await ws.send(AudioConfigPayload(audio_config=self.audio_engine.audio_config).model_dump_json())
+            return pcm
+
     async def _recv_loop(self, ws):
         """Listens for AI triggers from Server."""
         while self.running:
@@ -103,7 +163,12 @@ class NetworkWorker(QThread):
                 # Parse JSON
                 data = json.loads(msg)
                 
-                if data.get("type") == EventType.OVERLAY_TRIGGER:
+                if data.get("type") == EventType.AUDIO_ACK:
+                    acked = data["seq"]
+                    while self.window and self.window[0][0] <= acked:
+                        self.window.popleft()
+
+                elif data.get("type") == EventType.OVERLAY_TRIGGER:
                     # Convert to Pydantic and emit to UI
                     payload = OverlayTriggerPayload(**data)
                     self.sig_trigger.emit(payload)
@@ -0,0 +1,22 @@
+import pytest
+
+from src.core import auth
+
+
+def test_token_precedence(monkeypatch, tmp_path):
+    token_file = tmp_path / "token"
+    monkeypatch.setattr(auth, "TOKEN_FILE", token_file)
+    monkeypatch.delenv(auth.TOKEN_ENV, raising=False)
+    monkeypatch.delenv(auth.DEV_SECRET_ENV, raising=False)
+
+    with pytest.raises(auth.NoTokenError):
+        auth.load_token()
+
+    monkeypatch.setenv(auth.DEV_SECRET_ENV, "dev-secret")
+    assert auth.load_token().count(".") == 2  # Self-signed JWT
+
+    token_file.write_text("from-login\n")
+    assert auth.load_token() == "from-login"
+
+    monkeypatch.setenv(auth.TOKEN_ENV, "from-env")
+    assert auth.load_token() == "from-env"
@@ -1,6 +1,6 @@
 # sentinel_gateway/app/adapters/bus_interface.py
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 class BusAdapter(ABC):
     @abstractmethod
@@ -9,10 +9,15 @@ class BusAdapter(ABC):
         pass
 
     @abstractmethod
-    async def publish(self, subject: str, payload: bytes):
+    async def publish(self, subject: str, payload: bytes, headers: Optional[Dict[str, str]] = None):
         """Fire and forget message."""
         pass
 
+    @abstractmethod
+    async def subscribe(self, subject: str, cb: Callable[[Any], Awaitable[None]]):
+        """Subscribes `cb` to a subject (wildcards allowed). Returns the subscription."""
+        pass
+
     @abstractmethod
     async def close(self):
         """Graceful shutdown."""
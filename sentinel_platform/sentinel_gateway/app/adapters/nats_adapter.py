@@ -1,4 +1,6 @@
 # sentinel_gateway/app/adapters/nats_adapter.py
+from typing import Dict, Optional
+
 import nats
 from nats.aio.client import Client as NATS
 from app.core.config import settings
@@ -17,11 +19,14 @@ class NatsAdapter(BusAdapter):
             logger.error(f"Failed to connect to NATS: {e}")
             raise e
 
-    async def publish(self, subject: str, payload: bytes):
+    async def publish(self, subject: str, payload: bytes, headers: Optional[Dict[str, str]] = None):
         if self.nc.is_connected:
-            await self.nc.publish(subject, payload)
+            await self.nc.publish(subject, payload, headers=headers)
         else:
             logger.warning("NATS not connected, dropping message")
 
+    async def subscribe(self, subject: str, cb):
+        return await self.nc.subscribe(subject, cb=cb)
+
     async def close(self):
         await self.nc.close()
\ No newline at end of file
@@ -10,10 +10,17 @@ from sentinel_shared.schemas.events import (
     HandshakePayload,
     HandshakeAckPayload,
     EventType,
-    OverlayTriggerPayload
+    OverlayTriggerPayload,
+    AudioConfig
 )
 from sentinel_shared.utils.logger import setup_logger
+from sentinel_shared.utils.audio import parse_frame, pack_frame, CODEC_IDS
 from app.adapters.nats_adapter import NatsAdapter
+from app.core.config import settings
+from app.core.security import JWKSCache, TokenVerifier
+from app.core.sessions import SessionManager, GatewaySession
+from app.core.coalescer import FrameCoalescer
+from app.core.outbox import Outbox
 
 # --- Configuration & Metrics ---
 router = APIRouter()
@@ -25,28 +32,43 @@ ACTIVE_CONNECTIONS = Gauge('ws_active_connections', 'Number of active WebSocket
 # Initialize NATS Adapter (Singleton behavior via module import)
 # In a larger app, use Dependency Injection (Depends(get_bus))
 bus = NatsAdapter()
+jwks = JWKSCache() if settings.JWKS_URL else None
+verifier = TokenVerifier(jwks)
+sessions = SessionManager(bus)
+coalescer = FrameCoalescer(bus)
+
+# Close codes of a deliberate hang-up; anything else may be a network drop
+_CLEAN_CLOSE = (1000, 1001)
 
 @router.on_event("startup")
 async def startup_event():
     """Ensure NATS is connected when API starts."""
     try:
         await bus.connect()
+        await sessions.start()
     except Exception as e:
         logger.error(f"Failed to connect to NATS on startup: {e}")
+    if jwks:
+        # Keys are fetched before the first handshake and kept warm from then on
+        asyncio.create_task(jwks.watch())
+    asyncio.create_task(coalescer.run())
 
 @router.websocket("/ws/stream")
 async def websocket_endpoint(websocket: WebSocket):
     """
     Main Ingress Endpoint.
     1. Handshake (Auth)
-    2. NATS Subscription (Backend -> Client)
+    2. Return Channel (Backend -> Client)
     3. Audio Stream Loop (Client -> Backend)
     """
     await websocket.accept()
     ACTIVE_CONNECTIONS.inc()
     
     session_id: Optional[str] = None
-    nats_sub = None
+    session: Optional[GatewaySession] = None
+    outbox: Optional[Outbox] = None
+    send = None
+    clean_close = False
 
     try:
         # ==================================================================
@@ -58,14 +80,33 @@ async def websocket_endpoint(websocket: WebSocket):
             # Fast parsing with orjson
             handshake_dict = orjson.loads(data)
             handshake = HandshakePayload(**handshake_dict)
+            if not handshake.audio_config.is_supported():
+                raise ValueError(f"Unsupported audio config {handshake.audio_config}")
             
-            # TODO: Validate handshake.token (JWT) using app.core.security
-            
-            # Generate Session ID (In prod, use UUID or extract from JWT)
-            session_id = f"session_{handshake.client_version}"
+            # OPTIMIZATION: Verified tokens are cached until expiry, so a
+            # reconnecting client skips signature verification entirely
+            tenant = await verifier.verify(handshake.token)
+
+            # A new session bound to the caller's org and user, or the one
+            # the reconnect token names if the link just dropped
+            session = await sessions.open(tenant, handshake.reconnect_token)
+            session_id = session.session_id
+            sequenced = handshake.sequenced
+
+            # Frames are forwarded as-is; the format travels in NATS headers
+            # (none for default 16kHz mono PCM)
+            session.audio_config = handshake.audio_config
+            session.audio_headers = handshake.audio_config.to_headers()
+            session.codec = CODEC_IDS[handshake.audio_config.encoding]
+            session.coalesce_window = coalescer.window_for(tenant)
             
-            # Send Acknowledgment
-            ack = HandshakeAckPayload(session_id=session_id)
+            # Send Acknowledgment: the client replays its window from resume_from
+            ack = HandshakeAckPayload(
+                session_id=session_id,
+                reconnect_token=sessions.issue_token(session),
+                resume_from=session.resume_from(),
+                resume_channels={channel: seq + 1 for channel, seq in session.last_seq.items()}
+            )
             await websocket.send_text(ack.model_dump_json())
             
             logger.info(f"Session established: {session_id}")
@@ -78,41 +119,59 @@ async def websocket_endpoint(websocket: WebSocket):
         # ==================================================================
         # PHASE 2: REVERSE CHANNEL (Backend -> Client)
         # ==================================================================
-        # Subscribe to 'ui.commands.{session_id}' to receive triggers from Speech Service
-        
-        async def ui_command_handler(msg):
-            """Callback for NATS messages destined for this client."""
-            try:
-                # Payload is already JSON bytes from the Speech Service
-                # We forward it directly to the WebSocket
-                await websocket.send_text(msg.data.decode())
-            except Exception as e:
-                logger.error(f"[{session_id}] Error forwarding UI command: {e}")
-
-        # Subscribe dynamically using the session_id
-        if bus.nc and bus.nc.is_connected:
-            nats_sub = await bus.nc.subscribe(
-                f"ui.commands.{session_id}", 
-                cb=ui_command_handler
-            )
-            logger.debug(f"[{session_id}] Subscribed to NATS return channel")
-        else:
-            logger.warning("NATS not connected! AI Triggers will not work.")
+        # OPTIMIZATION: No per-connection subscription. The pod-wide
+        # 'ui.commands.>' subscription (SessionManager) dispatches to the
+        # session's current connection; commands held while the client was
+        # away are flushed here.
+        # OPTIMIZATION: Everything sent to the client goes through a bounded
+        # outbox drained by its own writer task, so dispatch never waits on a
+        # slow socket (see core/outbox.py for the overflow policy).
+        outbox = Outbox(websocket)
+        outbox.start()
+        send = outbox.put
+        for text in sessions.attach(session, send):
+            send(text)
 
         # ==================================================================
         # PHASE 3: STREAMING LOOP (Client -> Backend)
         # ==================================================================
+        acked = dict(session.published_seq)
         while True:
             # Await next frame from Client
             message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
 
             if "bytes" in message and message["bytes"]:
                 # --- AUDIO FRAME ---
                 audio_chunk = message["bytes"]
-                
+                if not sequenced:
+                    # Legacy client sending bare audio: wrap it so the workers
+                    # see one format. Arrival time is not capture time, so no timestamp.
+                    audio_chunk = pack_frame(session.resume_from(), audio_chunk, codec=session.codec, capture_us=0)
+
+                # Header only: the payload is a view, forwarded untouched
+                try:
+                    header, payload = parse_frame(audio_chunk)
+                except ValueError as e:
+                    logger.warning(f"[{session_id}] Malformed audio frame dropped: {e}")
+                    continue
+                # Each envelope channel numbers its frames independently
+                if header.seq < session.resume_from(header.channel):
+                    continue  # Replayed after a reconnect, already forwarded
+                session.last_seq[header.channel] = header.seq + header.frames - 1
+
                 # Push to NATS Topic: audio.raw.{session_id}
-                # This is "Fire and Forget" for speed
-                await bus.publish(f"audio.raw.{session_id}", audio_chunk)
+                # This is "Fire and Forget" for speed. Opus packets are
+                # passed through untouched; the workers decode/store them.
+                # OPTIMIZATION: With a coalescing window, consecutive frames
+                # go out as one message (NATS cost is per message, not per byte)
+                await coalescer.add(session, audio_chunk, header, payload)
+
+                # Let the client trim its replay window every few frames
+                if sequenced and session.published_seq - acked >= settings.AUDIO_ACK_EVERY:
+                    acked = dict(session.published_seq)
+                    send(orjson.dumps({"type": EventType.AUDIO_ACK, "seq": acked}).decode())
 
             elif "text" in message and message["text"]:
                 # --- CONTROL FRAME ---
@@ -121,11 +180,21 @@ async def websocket_endpoint(websocket: WebSocket):
                     payload = orjson.loads(message["text"])
                     if payload.get("type") == EventType.HEARTBEAT:
                         pass # Keep-alive logic if needed
-                except orjson.JSONDecodeError:
+                    elif payload.get("type") == EventType.AUDIO_CONFIG:
+                        # Mid-call format change (e.g. client fell back to PCM)
+                        config = AudioConfig(**payload.get("audio_config", {}))
+                        if config.is_supported():
+                            # Frames buffered so far were sent in the old format
+                            await coalescer.flush(session)
+                            session.audio_config = config
+                            session.audio_headers = config.to_headers()
+                            session.codec = CODEC_IDS[config.encoding]
+                except (orjson.JSONDecodeError, ValueError):
                     pass
 
-    except WebSocketDisconnect:
-        logger.info(f"[{session_id}] Client disconnected")
+    except WebSocketDisconnect as e:
+        clean_close = e.code in _CLEAN_CLOSE
+        logger.info(f"[{session_id}] Client disconnected ({e.code})")
         
     except Exception as e:
         logger.error(f"[{session_id}] Connection Error: {e}")
@@ -140,10 +209,16 @@ async def websocket_endpoint(websocket: WebSocket):
         # ==================================================================
         ACTIVE_CONNECTIONS.dec()
         
-        # Unsubscribe from NATS to stop receiving events for this dead session
-        if nats_sub:
+        # A hang-up ends the call; a dropped link keeps it resumable for
+        # RESUME_GRACE seconds (the workers keep their buffers and context)
+        if session:
             try:
-                await nats_sub.unsubscribe()
-                logger.debug(f"[{session_id}] Unsubscribed from NATS")
+                await coalescer.flush(session)
+                if clean_close:
+                    await sessions.end(session)
+                else:
+                    sessions.detach(session, send)
             except Exception as e:
-                logger.warning(f"Error unsubscribing: {e}")
\ No newline at end of file
+                logger.warning(f"[{session_id}] Failed to release session: {e}")
+        if outbox:
+            await outbox.close()
@@ -0,0 +1,156 @@
+# sentinel_gateway/app/core/coalescer.py
+import asyncio
+import time
+from typing import Dict, List
+
+from prometheus_client import Counter
+
+from sentinel_shared.schemas.auth import TenantContext
+from sentinel_shared.utils.audio import FrameHeader, CODEC_PCM_S16LE, pack_frame, payload_samples
+from sentinel_shared.utils.logger import setup_logger
+from app.core.config import settings
+
+logger = setup_logger("gateway.coalescer")
+
+AUDIO_FRAMES = Counter('ws_audio_frames_total', 'Audio frames received from clients')
+AUDIO_PUBLISHES = Counter('ws_audio_publishes_total', 'Audio messages published to NATS')
+
+# The envelope's frame count is one byte
+_MAX_FRAMES = 255
+
+
+class _Run:
+    """Consecutive frames of one session waiting to go out as a single message."""
+
+    __slots__ = ("session", "first", "frame", "frames", "payloads", "nbytes", "samples",
+                 "next_seq", "next_capture_us", "started", "rate", "channels", "limit")
+
+    def __init__(self, session, first: FrameHeader, frame: bytes):
+        self.session = session
+        self.first = first
+        self.frame = frame  # Sent as-is if nothing joins it
+        self.frames = 0
+        self.payloads: List = []
+        self.nbytes = 0
+        self.samples = 0
+        self.next_seq = first.seq
+        self.next_capture_us = first.capture_us
+        self.started = time.monotonic()
+        # Format is fixed for the run's lifetime (a change flushes it)
+        self.rate = session.audio_config.sample_rate
+        self.channels = session.audio_config.channels
+        self.limit = session.coalesce_window * self.rate
+
+
+class FrameCoalescer:
+    """
+    Merges each session's audio frames into one `audio.raw` publish per
+    COALESCE_WINDOW_MS of audio (per-tenant override in COALESCE_TENANT_WINDOWS).
+
+    NATS cost and every consumer's callback overhead are per message, so
+    64 ms client blocks sent 3-4 to a message cut the message rate by as
+    much. A run is only extended by the next frame of the same stream:
+    a sequence gap, a capture-time jump (silence the client did not send),
+    or a codec/channel change flushes it first, so the merged envelope
+    (first seq, first capture time, frame count) describes its payload
+    exactly. Runs also flush on size, on age (a background sweep, so a
+    frame waits at most one window plus COALESCE_SWEEP_MS), and when the
+    session detaches, ends or changes audio format.
+
+    A window of 0 publishes every frame as it arrives.
+    """
+
+    def __init__(
+        self,
+        bus,
+        window_ms: float = settings.COALESCE_WINDOW_MS,
+        tenant_windows: Dict[str, float] = settings.COALESCE_TENANT_WINDOWS,
+        max_bytes: int = settings.COALESCE_MAX_BYTES,
+        tolerance_ms: float = settings.COALESCE_GAP_TOLERANCE_MS
+    ):
+        self.bus = bus
+        self.window_ms = window_ms
+        self.tenant_windows = tenant_windows
+        self.max_bytes = max_bytes
+        self.tolerance_us = int(tolerance_ms * 1000)
+        self._runs: Dict[str, _Run] = {}
+
+    def window_for(self, tenant: TenantContext) -> float:
+        """Coalescing window for the tenant's sessions, in seconds."""
+        return self.tenant_windows.get(tenant.org_id, self.window_ms) / 1000.0
+
+    async def add(self, session, frame: bytes, header: FrameHeader, payload: memoryview):
+        AUDIO_FRAMES.inc()
+        if not session.coalesce_window:
+            await self._publish(session, frame, header.channel, header.seq + header.frames - 1)
+            return
+
+        run = self._runs.get(session.session_id)
+        if run is not None and not self._continues(run, header):
+            await self._flush(run)
+            run = None
+        if run is None:
+            run = self._runs[session.session_id] = _Run(session, header, frame)
+
+        if header.codec == CODEC_PCM_S16LE:
+            samples = len(payload) // (2 * run.channels)
+        else:
+            samples = payload_samples(payload, header.codec, run.rate, run.channels)
+        run.payloads.append(payload)
+        run.frames += header.frames
+        run.nbytes += len(payload)
+        run.samples += samples
+        run.next_seq = header.seq + header.frames
+        if header.capture_us:
+            run.next_capture_us = header.capture_us + samples * 1_000_000 // run.rate
+
+        # Full window of audio or too big; runs that fill slower are flushed by run()
+        if run.samples >= run.limit or run.nbytes >= self.max_bytes:
+            await self._flush(run)
+
+    def _continues(self, run: _Run, header: FrameHeader) -> bool:
+        first = run.first
+        if header.seq != run.next_seq or header.codec != first.codec or header.channel != first.channel:
+            return False
+        if run.frames + header.frames > _MAX_FRAMES:
+            return False
+        if header.capture_us and run.next_capture_us:
+            return abs(header.capture_us - run.next_capture_us) <= self.tolerance_us
+        return True
+
+    async def flush(self, session):
+        """Publishes whatever the session has buffered (detach, end, format change)."""
+        run = self._runs.get(session.session_id)
+        if run is not None:
+            await self._flush(run)
+
+    async def _flush(self, run: _Run):
+        session = run.session
+        if self._runs.get(session.session_id) is run:
+            del self._runs[session.session_id]
+        if len(run.payloads) == 1:
+            frame = run.frame
+        else:
+            first = run.first
+            frame = pack_frame(first.seq, b"".join(run.payloads), codec=first.codec, channel=first.channel,
+                               capture_us=first.capture_us, frames=run.frames)
+        await self._publish(session, frame, run.first.channel, run.next_seq - 1)
+
+    async def _publish(self, session, frame: bytes, channel: int, last_seq: int):
+        await self.bus.publish(f"audio.raw.{session.session_id}", frame, headers=session.audio_headers)
+        session.published_seq[channel] = last_seq
+        AUDIO_PUBLISHES.inc()
+
+    async def run(self, interval_ms: float = settings.COALESCE_SWEEP_MS):
+        """Flushes runs that have waited a full window (the last words before a pause)."""
+        while True:
+            await asyncio.sleep(interval_ms / 1000.0)
+            now = time.monotonic()
+            for run in [r for r in self._runs.values() if now - r.started >= r.session.coalesce_window]:
+                # add() may have flushed it (on size) while an earlier publish was awaited
+                if self._runs.get(run.session.session_id) is not run:
+                    continue
+                try:
+                    await self._flush(run)
+                except Exception as e:
+                    logger.error(f"[{run.session.session_id}] Coalesced publish failed: {e}")
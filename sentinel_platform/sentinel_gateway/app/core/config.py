@@ -1,4 +1,6 @@
 # sentinel_gateway/app/core/config.py
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,6 +13,34 @@ class Settings(BaseSettings):
     # Security (For Phase 1, we accept this dummy secret)
     JWT_SECRET: str = "phase1-secret-key-change-me"
     JWT_ALGORITHM: str = "HS256"
+    # Identity provider keys. When set, tokens are verified against it
+    # (RS256/ES256 by kid) instead of JWT_SECRET.
+    JWKS_URL: str = ""
+    JWKS_REFRESH_INTERVAL: float = 300.0 # Background re-fetch (seconds)
+    JWKS_MIN_REFRESH_INTERVAL: float = 10.0 # Unknown kid re-fetches at most this often
+    JWT_AUDIENCE: str = ""
+    JWT_ISSUER: str = ""
+    JWT_LEEWAY: int = 30 # Clock skew allowed on exp/nbf (seconds)
+    # Verified tokens kept until they expire; reconnects skip verification
+    TOKEN_CACHE_SIZE: int = 50000
+
+    # Session resume
+    RECONNECT_SECRET: str = "" # HMAC key for reconnect tokens (empty = JWT_SECRET)
+    RECONNECT_TOKEN_TTL: float = 3600.0
+    RESUME_GRACE: float = 15.0 # A dropped session is kept (session.end deferred) this long
+    DETACHED_COMMAND_BUFFER: int = 32 # UI commands held for a dropped session
+    AUDIO_ACK_EVERY: int = 8 # Ack sequenced audio every N frames (~0.5s of 64ms frames)
+
+    # Audio coalescing: a session's frames are merged into one NATS message
+    # per window (100-250ms suits most tenants; each frame waits up to the window)
+    COALESCE_WINDOW_MS: float = 0.0 # 0 = publish every frame as it arrives
+    COALESCE_TENANT_WINDOWS: Dict[str, float] = {} # org_id -> window (ms), e.g. '{"acme": 192}'
+    COALESCE_MAX_BYTES: int = 65536 # Flush early past this much payload
+    COALESCE_GAP_TOLERANCE_MS: float = 20.0 # Capture-time jitter still treated as contiguous
+    COALESCE_SWEEP_MS: float = 20.0 # How often runs that reached their window are flushed
+
+    # Outbound (Gateway -> client) queue per connection
+    OUTBOX_MAX_MESSAGES: int = 64 # Past this (after coalescing/stale drops) the client is disconnected
 
     class Config:
         env_file = ".env"
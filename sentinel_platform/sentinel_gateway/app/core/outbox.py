@@ -0,0 +1,153 @@
+# sentinel_gateway/app/core/outbox.py
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+from prometheus_client import Counter, Gauge, Histogram
+
+from sentinel_shared.schemas.events import EventType
+from sentinel_shared.utils.logger import setup_logger
+from app.core.config import settings
+
+logger = setup_logger("gateway.outbox")
+
+OUTBOX_QUEUED = Gauge('ws_outbox_queued_messages', 'Messages waiting in connection outboxes')
+OUTBOX_DEPTH = Histogram(
+    'ws_outbox_depth', 'Outbox depth seen by each new message',
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128)
+)
+OUTBOX_DROPPED = Counter(
+    'ws_outbox_dropped_total', 'Outbound messages not delivered', ['reason']  # coalesced/stale/overflow
+)
+SLOW_CLIENT_DISCONNECTS = Counter(
+    'ws_slow_client_disconnects_total', 'Connections closed because their outbox overflowed'
+)
+
+# "Try again later": the client reconnects and resumes its session
+SLOW_CLIENT_CLOSE = 1013
+
+# Only the newest of these is worth sending: the overlay shows one hint at a time
+_LATEST_WINS = (EventType.OVERLAY_TRIGGER, EventType.AUDIO_ACK)
+
+
+def _expiry(message: dict) -> Optional[float]:
+    """Wall-clock time after which an overlay hint is no longer worth showing."""
+    if message.get("type") != EventType.OVERLAY_TRIGGER:
+        return None
+    try:
+        created = datetime.fromisoformat(message["timestamp"])
+        if created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
+        created = created.timestamp()
+    except (KeyError, TypeError, ValueError):
+        created = time.time()
+    return created + message.get("display_duration_ms", 5000) / 1000.0
+
+
+class Outbox:
+    """
+    Bounded outbound queue of one WebSocket, drained by its own writer task.
+
+    put() never blocks, so a NATS callback dispatching to thousands of
+    connections is never held up by one slow client. When a client falls
+    behind, the queue absorbs it by policy: a queued overlay trigger (or
+    audio ack) is replaced by a newer one, since only the latest is shown;
+    hints older than their display_duration_ms are dropped unsent. If it
+    still overflows OUTBOX_MAX_MESSAGES the client is disconnected; it
+    reconnects and resumes its session.
+    """
+
+    def __init__(self, websocket, max_messages: int = settings.OUTBOX_MAX_MESSAGES):
+        self.websocket = websocket
+        self.max_messages = max_messages
+        self.queue = deque()  # [kind, text, expires_at]
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._drain())
+
+    def __len__(self):
+        return len(self.queue)
+
+    def put(self, text: str):
+        if self.closed:
+            return
+        try:
+            message = orjson.loads(text)
+            kind = message.get("type")
+        except (orjson.JSONDecodeError, AttributeError):
+            message, kind = {}, None
+        OUTBOX_DEPTH.observe(len(self.queue))
+
+        if kind in _LATEST_WINS:
+            for entry in self.queue:
+                if entry[0] == kind:
+                    entry[1], entry[2] = text, _expiry(message)
+                    OUTBOX_DROPPED.labels(reason="coalesced").inc()
+                    return
+
+        self.queue.append([kind, text, _expiry(message)])
+        OUTBOX_QUEUED.inc()
+        if len(self.queue) > self.max_messages:
+            self._overflow()
+        else:
+            self._wakeup.set()
+
+    def _overflow(self):
+        # Stale hints go first; if that is not enough the client is too slow
+        now = time.time()
+        fresh = deque(e for e in self.queue if e[2] is None or e[2] > now)
+        OUTBOX_DROPPED.labels(reason="stale").inc(len(self.queue) - len(fresh))
+        OUTBOX_QUEUED.dec(len(self.queue) - len(fresh))
+        self.queue = fresh
+        if len(self.queue) <= self.max_messages:
+            self._wakeup.set()
+            return
+
+        logger.warning(f"Outbox overflow ({len(self.queue)} messages); disconnecting slow client")
+        SLOW_CLIENT_DISCONNECTS.inc()
+        OUTBOX_DROPPED.labels(reason="overflow").inc(len(self.queue))
+        self._discard()
+        asyncio.create_task(self._close(SLOW_CLIENT_CLOSE))
+
+    async def _drain(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                kind, text, expires_at = self.queue.popleft()
+                OUTBOX_QUEUED.dec()
+                if expires_at is not None and expires_at <= time.time():
+                    OUTBOX_DROPPED.labels(reason="stale").inc()
+                    continue
+                await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Socket gone: the receive loop sees the disconnect and cleans up
+            logger.debug(f"Outbox writer stopped: {e}")
+            self._discard()
+
+    def _discard(self):
+        self.closed = True
+        OUTBOX_QUEUED.dec(len(self.queue))
+        self.queue.clear()
+
+    async def _close(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def close(self):
+        """Stops the writer; anything still queued is dropped."""
+        if not self.closed:
+            self._discard()
+        if self._writer:
+            self._writer.cancel()
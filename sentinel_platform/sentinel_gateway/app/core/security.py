@@ -1 +1,169 @@
-# JWT Validation logic
\ No newline at end of file
+# sentinel_gateway/app/core/security.py
+# JWT Validation logic
+import asyncio
+import hashlib
+import json
+import time
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from jose import jwk, jwt
+from jose.exceptions import JOSEError
+from prometheus_client import Counter
+
+from sentinel_shared.schemas.auth import TenantContext
+from sentinel_shared.utils.logger import setup_logger
+from app.core.config import settings
+
+logger = setup_logger("gateway.security")
+
+TOKEN_VERIFICATIONS = Counter(
+    'ws_token_verifications_total', 'Handshake token checks', ['result']  # cached/verified/rejected
+)
+
+
+class AuthError(Exception):
+    """The handshake token was rejected."""
+
+
+class JWKSCache:
+    """
+    Identity provider signing keys, parsed once and kept by kid.
+
+    Refreshed in the background every JWKS_REFRESH_INTERVAL. A token signed
+    with an unknown kid (key rotation) forces a re-fetch, at most once per
+    JWKS_MIN_REFRESH_INTERVAL; concurrent handshakes share that one fetch.
+    """
+
+    def __init__(
+        self,
+        url: str = settings.JWKS_URL,
+        refresh_interval: float = settings.JWKS_REFRESH_INTERVAL,
+        min_refresh_interval: float = settings.JWKS_MIN_REFRESH_INTERVAL
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.keys: Dict[str, Tuple[Any, str]] = {}  # kid -> (key, alg)
+        self._inflight: Optional[asyncio.Task] = None
+        self._last_fetch = float("-inf")
+
+    def _fetch(self) -> dict:
+        with urllib.request.urlopen(self.url, timeout=5) as resp:
+            return json.loads(resp.read())
+
+    async def _load(self):
+        self._last_fetch = time.monotonic()
+        data = await asyncio.to_thread(self._fetch)
+        keys = {}
+        for entry in data.get("keys", []):
+            if entry.get("use", "sig") != "sig" or "kid" not in entry:
+                continue
+            alg = entry.get("alg") or ("ES256" if entry.get("kty") == "EC" else "RS256")
+            try:
+                keys[entry["kid"]] = (jwk.construct(entry, alg), alg)
+            except JOSEError as e:
+                logger.warning(f"Skipping JWKS key {entry['kid']}: {e}")
+        self.keys = keys
+        logger.info(f"Loaded {len(keys)} signing keys from JWKS")
+
+    async def refresh(self):
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._load())
+        await asyncio.shield(self._inflight)
+
+    async def get(self, kid: str) -> Optional[Tuple[Any, str]]:
+        key = self.keys.get(kid)
+        if key is None and time.monotonic() - self._last_fetch >= self.min_refresh_interval:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"JWKS refresh failed: {e}")
+            key = self.keys.get(kid)
+        return key
+
+    async def watch(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"JWKS refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+def context_from_claims(claims: Dict[str, Any]) -> TenantContext:
+    org_id = claims.get("org_id") or claims.get("tenant")
+    if not claims.get("sub") or not org_id:
+        raise AuthError("token has no subject or organisation")
+    return TenantContext(
+        user_id=str(claims["sub"]),
+        org_id=str(org_id),
+        roles=list(claims.get("roles", [])),
+        tier=claims.get("tier", "standard")
+    )
+
+
+class TokenVerifier:
+    """
+    Verifies handshake JWTs: against the JWKS when one is configured,
+    else HS256 with JWT_SECRET.
+
+    Verified tokens are cached (bounded LRU, by SHA-256 of the token) until
+    they expire, so the reconnect storm after a deploy, which presents the
+    same tokens again, costs one hash and a dict lookup per handshake.
+    """
+
+    def __init__(self, jwks: Optional[JWKSCache] = None, cache_size: int = settings.TOKEN_CACHE_SIZE):
+        self.jwks = jwks
+        self.cache_size = cache_size
+        self._verified: "OrderedDict[bytes, Tuple[TenantContext, float]]" = OrderedDict()
+
+    async def verify(self, token: str) -> TenantContext:
+        digest = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        hit = self._verified.get(digest)
+        if hit is not None:
+            if hit[1] > now:
+                self._verified.move_to_end(digest)
+                TOKEN_VERIFICATIONS.labels(result="cached").inc()
+                return hit[0]
+            del self._verified[digest]
+
+        try:
+            claims = await self._decode(token)
+            context = context_from_claims(claims)
+        except (JOSEError, AuthError) as e:
+            TOKEN_VERIFICATIONS.labels(result="rejected").inc()
+            raise AuthError(str(e)) from e
+
+        self._verified[digest] = (context, float(claims["exp"]))
+        if len(self._verified) > self.cache_size:
+            self._verified.popitem(last=False)
+        TOKEN_VERIFICATIONS.labels(result="verified").inc()
+        return context
+
+    async def _decode(self, token: str) -> Dict[str, Any]:
+        if self.jwks is None:
+            key, algorithms = settings.JWT_SECRET, [settings.JWT_ALGORITHM]
+        else:
+            kid = jwt.get_unverified_header(token).get("kid")
+            found = await self.jwks.get(kid)
+            if found is None:
+                raise AuthError(f"unknown signing key '{kid}'")
+            # The key's own algorithm, never the one the token claims
+            key, alg = found
+            algorithms = [alg]
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            audience=settings.JWT_AUDIENCE or None,
+            issuer=settings.JWT_ISSUER or None,
+            options={
+                "verify_aud": bool(settings.JWT_AUDIENCE),
+                "require_exp": True,
+                "leeway": settings.JWT_LEEWAY,
+            }
+        )
@@ -0,0 +1,153 @@
+# sentinel_gateway/app/core/sessions.py
+import asyncio
+from collections import deque
+from uuid import uuid4
+from typing import Any, Callable, Dict, List, Optional
+
+from sentinel_shared.schemas.auth import TenantContext
+from sentinel_shared.schemas.events import AudioConfig
+from sentinel_shared.utils.audio import CHANNEL_MAIN, CODEC_PCM_S16LE
+from sentinel_shared.utils.crypto import sign_token, verify_token
+from sentinel_shared.utils.ids import new_session_id
+from sentinel_shared.utils.logger import setup_logger
+from app.core.config import settings
+
+logger = setup_logger("gateway.sessions")
+
+# Queues one text frame on a connection (non-blocking, see core/outbox.py)
+Sender = Callable[[str], Any]
+
+
+class GatewaySession:
+    """What the Gateway keeps for one call, across reconnects of its WebSocket."""
+
+    def __init__(self, session_id: str, tenant: TenantContext):
+        self.session_id = session_id
+        self.tenant = tenant
+        self.audio_config = AudioConfig()
+        self.audio_headers: Optional[Dict[str, str]] = None
+        self.codec = CODEC_PCM_S16LE  # Envelope codec for frames of legacy (unsequenced) clients
+        # Sequence numbers count per envelope channel (two-stream sessions send two)
+        self.last_seq: Dict[int, int] = {}  # Newest frame sequence number received, per channel
+        self.published_seq: Dict[int, int] = {}  # Newest one published to NATS (acked to the client)
+        self.coalesce_window = 0.0  # Seconds of audio per NATS message (0 = one per frame)
+        self.send: Optional[Sender] = None  # None while detached
+        # UI commands that arrived while detached, replayed on resume
+        self.pending = deque(maxlen=settings.DETACHED_COMMAND_BUFFER)
+        self.end_timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def attached(self) -> bool:
+        return self.send is not None
+
+    def resume_from(self, channel: int = CHANNEL_MAIN) -> int:
+        """Next frame sequence number expected on the channel."""
+        return self.last_seq.get(channel, -1) + 1
+
+
+class SessionManager:
+    """
+    Live sessions on this Gateway pod, attached or waiting to be resumed.
+
+    UI commands for every session arrive on one `ui.commands.>`
+    subscription per pod and are dispatched by session ID from this map,
+    so opening or closing a session costs a dict operation, not a NATS
+    subscription round trip.
+
+    A dropped WebSocket only detaches its session: its UI commands are
+    buffered while it is away, and `session.end` is deferred
+    for RESUME_GRACE seconds, so the speech worker keeps its buffer and
+    context. A client that reconnects with its reconnect token, to this
+    pod or any other, picks the session up again; the resuming pod
+    announces it on `session.resume.<id>` so the original pod stands down.
+    """
+
+    def __init__(self, bus, grace: float = settings.RESUME_GRACE):
+        self.bus = bus
+        self.grace = grace
+        self.secret = settings.RECONNECT_SECRET or settings.JWT_SECRET
+        self.sessions: Dict[str, GatewaySession] = {}
+        self.pod_id = uuid4().hex.encode()  # Tells our own resume announcements apart
+
+    async def start(self):
+        await self.bus.subscribe("ui.commands.>", self._on_ui_command)
+        await self.bus.subscribe("session.resume.>", self._on_resumed_elsewhere)
+
+    def issue_token(self, session: GatewaySession) -> str:
+        claims = {"sid": session.session_id, "org": session.tenant.org_id, "usr": session.tenant.user_id}
+        return sign_token(claims, self.secret, settings.RECONNECT_TOKEN_TTL)
+
+    async def open(self, tenant: TenantContext, reconnect_token: Optional[str] = None) -> GatewaySession:
+        """Resumes the token's session if it is valid for this caller, else starts a new one."""
+        claims = verify_token(reconnect_token, self.secret) if reconnect_token else None
+        if claims and (claims["org"], claims["usr"]) == (tenant.org_id, tenant.user_id):
+            session = self.sessions.get(claims["sid"])
+            if session is None:
+                # Dropped on another pod: same ID, so the workers' state carries on
+                session = self.sessions[claims["sid"]] = GatewaySession(claims["sid"], tenant)
+            elif session.attached:
+                logger.warning(f"[{session.session_id}] Resumed while still attached; taking over")
+            if session.end_timer:
+                session.end_timer.cancel()
+                session.end_timer = None
+            await self.bus.publish(f"session.resume.{session.session_id}", self.pod_id)
+            logger.info(f"[{session.session_id}] Resumed from frame {session.resume_from()}")
+            return session
+
+        if reconnect_token:
+            logger.info("Reconnect token rejected; starting a new session")
+        session = GatewaySession(new_session_id(tenant.org_id, tenant.user_id), tenant)
+        self.sessions[session.session_id] = session
+        return session
+
+    def attach(self, session: GatewaySession, send: Sender) -> List[str]:
+        """Binds the session to a connection. Returns the commands buffered while detached."""
+        session.send = send
+        pending = list(session.pending)
+        session.pending.clear()
+        return pending
+
+    def detach(self, session: GatewaySession, send: Sender):
+        """The WebSocket dropped (or its handshake failed): keep the session for RESUME_GRACE seconds."""
+        if self.sessions.get(session.session_id) is not session or session.end_timer is not None:
+            return  # Taken over by another pod, or already counting down
+        if session.send is not None and session.send is not send:
+            return  # A newer connection took the session over
+        session.send = None
+        loop = asyncio.get_running_loop()
+        session.end_timer = loop.call_later(
+            self.grace, lambda: asyncio.create_task(self.end(session))
+        )
+
+    async def end(self, session: GatewaySession, notify: bool = True):
+        session_id = session.session_id
+        if self.sessions.get(session_id) is not session:
+            return
+        del self.sessions[session_id]
+        if session.end_timer:
+            session.end_timer.cancel()
+        if notify:
+            # Tell the workers the call is over so they can release its memory
+            await self.bus.publish(f"session.end.{session_id}", b"")
+            logger.info(f"[{session_id}] Session ended")
+
+    async def _on_ui_command(self, msg):
+        # Every pod sees every session's commands; only the one holding it forwards
+        session = self.sessions.get(msg.subject.split(".")[-1])
+        if session is None:
+            return
+        # Payload is already JSON bytes from the Speech Service
+        text = msg.data.decode()
+        if not session.attached:
+            session.pending.append(text)
+            return
+        # Queued on the connection's outbox: a slow client never stalls this callback
+        session.send(text)
+
+    async def _on_resumed_elsewhere(self, msg):
+        if msg.data == self.pod_id:
+            return
+        # Another pod owns the session now: drop ours without ending the call
+        session = self.sessions.get(msg.subject.split(".")[-1])
+        if session is not None:
+            await self.end(session, notify=False)
@@ -0,0 +1,141 @@
+# sentinel_gateway/scripts/bench_coalescer.py
+"""
+NATS message rate and Gateway CPU with and without audio coalescing.
+
+Pushes client-sized frames (64ms, 16kHz mono PCM, enveloped) for many
+sessions through FrameCoalescer into a real nats-py client. The client
+talks to a minimal sink server in a child process that speaks just
+enough of the NATS protocol to accept and count publishes, so the
+numbers include the client's per-message serialisation and socket
+writes, but not the sink's work.
+
+    python scripts/bench_coalescer.py
+    python scripts/bench_coalescer.py --sessions 2000 --seconds 10 --windows 0 128 192 256
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so we can import app
+sys.path.append(str(Path(__file__).parent.parent))
+
+import nats
+
+from sentinel_shared.schemas.auth import TenantContext
+from sentinel_shared.utils.audio import pack_frame, parse_frame
+from app.core.coalescer import FrameCoalescer
+from app.core.sessions import GatewaySession
+
+FRAME_SAMPLES = 1024  # Client block (sentinel_client AudioEngine)
+SAMPLE_RATE = 16000
+
+INFO = (b'INFO {"server_id":"bench","version":"2.10.0","proto":1,"headers":true,'
+        b'"max_payload":8388608}\r\n')
+
+
+def run_sink(port: int, ready, counts):
+    """Accepts one client and discards everything but PING/PUB counting."""
+
+    async def handle(reader, writer):
+        writer.write(INFO)
+        published = 0
+        tail = b""
+        while True:
+            data = await reader.read(1 << 20)
+            if not data:
+                break
+            chunk = tail + data
+            # Matches wholly inside the tail were counted with the previous read
+            published += chunk.count(b"PUB audio.raw.") - tail.count(b"PUB audio.raw.")
+            if b"PING\r\n" in chunk:
+                writer.write(b"PONG\r\n")
+            tail = chunk[-32:]
+            counts.value = published
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+class Bus:
+    def __init__(self, nc):
+        self.nc = nc
+
+    async def publish(self, subject, payload, headers=None):
+        await self.nc.publish(subject, payload, headers=headers)
+
+
+async def bench(port: int, sessions: int, seconds: float, window_ms: float) -> dict:
+    nc = await nats.connect(f"nats://127.0.0.1:{port}", pending_size=64 * 1024 * 1024)
+    coalescer = FrameCoalescer(Bus(nc), window_ms=window_ms)
+    tenant = TenantContext(user_id="bench", org_id="bench", roles=[])
+    live = []
+    for i in range(sessions):
+        session = GatewaySession(f"bench_user_{i}", tenant)
+        session.coalesce_window = coalescer.window_for(tenant)
+        live.append(session)
+
+    block = bytes(FRAME_SAMPLES * 2)
+    frame_us = FRAME_SAMPLES * 1_000_000 // SAMPLE_RATE
+    n_frames = int(seconds * SAMPLE_RATE / FRAME_SAMPLES)
+    # Client-side work (enveloping) is done up front so only Gateway work is timed
+    frames = [pack_frame(seq, block, capture_us=1 + seq * frame_us) for seq in range(n_frames)]
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for seq in range(n_frames):
+        frame = frames[seq]
+        for session in live:
+            # The Gateway parses each frame once on receipt
+            header, payload = parse_frame(frame)
+            await coalescer.add(session, frame, header, payload)
+    for session in live:
+        await coalescer.flush(session)
+    await nc.flush()
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - wall0
+    await nc.close()
+
+    audio_seconds = n_frames * FRAME_SAMPLES / SAMPLE_RATE
+    return {
+        "window_ms": window_ms,
+        "frames": n_frames * sessions,
+        "cpu_seconds": round(cpu, 3),
+        "wall_seconds": round(wall, 3),
+        # Per pod at real time, for this many concurrent sessions
+        "cpu_ms_per_session_second": round(1000 * cpu / (audio_seconds * sessions), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Audio per session")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 128, 192, 256])
+    parser.add_argument("--port", type=int, default=14222)
+    args = parser.parse_args()
+
+    for i, window in enumerate(args.windows):
+        port = args.port + i
+        ready, counts = multiprocessing.Event(), multiprocessing.Value("q", 0)
+        sink = multiprocessing.Process(target=run_sink, args=(port, ready, counts), daemon=True)
+        sink.start()
+        ready.wait()
+        result = asyncio.run(bench(port, args.sessions, args.seconds, window))
+        time.sleep(0.2)  # Let the sink read the tail
+        sink.terminate()
+
+        result["nats_messages"] = counts.value
+        # Message rate this many sessions put on NATS at real time
+        result["nats_messages_per_second"] = round(counts.value / args.seconds)
+        print("  ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import asyncio
+
+from sentinel_shared.schemas.auth import TenantContext
+from sentinel_shared.utils.audio import CHANNEL_AGENT, CHANNEL_CUSTOMER, pack_frame, parse_frame
+from app.core.coalescer import FrameCoalescer
+from app.core.sessions import GatewaySession
+
+ACME = TenantContext(user_id="alice", org_id="acme", roles=[])
+
+# 64ms of 16kHz mono PCM
+BLOCK = b"\x01\x00" * 1024
+BLOCK_US = 64000
+
+class FakeBus:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, subject, payload, headers=None):
+        self.published.append((subject, payload))
+
+def frames(bus):
+    return [parse_frame(payload) for _, payload in bus.published]
+
+def feed(coalescer, session, seqs, start_us=1_000_000):
+    async def run():
+        for seq in seqs:
+            frame = pack_frame(seq, BLOCK, capture_us=start_us + seq * BLOCK_US)
+            header, payload = parse_frame(frame)
+            await coalescer.add(session, frame, header, payload)
+    asyncio.run(run())
+
+def make_session(coalescer, tenant=ACME):
+    session = GatewaySession("acme_alice_1", tenant)
+    session.coalesce_window = coalescer.window_for(tenant)
+    return session
+
+def test_contiguous_frames_are_merged_per_window():
+    bus = FakeBus()
+    coalescer = FrameCoalescer(bus, window_ms=192)
+    session = make_session(coalescer)
+
+    feed(coalescer, session, range(6))
+
+    published = frames(bus)
+    assert [(h.seq, h.frames) for h, _ in published] == [(0, 3), (3, 3)]
+    assert published[1][0].capture_us == 1_000_000 + 3 * BLOCK_US
+    assert bytes(published[0][1]) == BLOCK * 3
+    assert session.published_seq == {0: 5}
+
+def test_two_stream_sessions_count_frames_per_channel():
+    bus = FakeBus()
+    coalescer = FrameCoalescer(bus, window_ms=0)
+    session = make_session(coalescer)
+
+    async def run():
+        # Each speaker's stream numbers its frames from 0
+        for seq in range(3):
+            for channel in (CHANNEL_AGENT, CHANNEL_CUSTOMER):
+                frame = pack_frame(seq, BLOCK, channel=channel, capture_us=1_000_000 + seq * BLOCK_US)
+                header, payload = parse_frame(frame)
+                await coalescer.add(session, frame, header, payload)
+    asyncio.run(run())
+
+    assert len(bus.published) == 6
+    assert session.published_seq == {CHANNEL_AGENT: 2, CHANNEL_CUSTOMER: 2}
+
+def test_gaps_flush_the_run():
+    bus = FakeBus()
+    coalescer = FrameCoalescer(bus, window_ms=1000)
+    session = make_session(coalescer)
+
+    # 0-1, then a missing frame, then silence the client did not send
+    feed(coalescer, session, [0, 1, 3])
+    feed(coalescer, session, [4], start_us=5_000_000)
+    asyncio.run(coalescer.flush(session))
+
+    assert [(h.seq, h.frames) for h, _ in frames(bus)] == [(0, 2), (3, 1), (4, 1)]
+
+def test_window_is_per_tenant_and_zero_passes_through():
+    bus = FakeBus()
+    coalescer = FrameCoalescer(bus, window_ms=0, tenant_windows={"bigco": 128})
+    session = make_session(coalescer)
+
+    feed(coalescer, session, range(3))
+    assert len(bus.published) == 3
+    assert make_session(coalescer, TenantContext(user_id="u", org_id="bigco", roles=[])).coalesce_window == 0.128
+
+def test_sweep_skips_runs_flushed_while_it_publishes():
+    class HookedBus(FakeBus):
+        def __init__(self):
+            super().__init__()
+            self.during_publish = None
+
+        async def publish(self, subject, payload, headers=None):
+            await super().publish(subject, payload, headers)
+            hook, self.during_publish = self.during_publish, None
+            if hook:
+                await hook()
+
+    bus = HookedBus()
+    coalescer = FrameCoalescer(bus, window_ms=192)
+    first = make_session(coalescer)
+    second = GatewaySession("acme_bob_1", ACME)
+    second.coalesce_window = first.coalesce_window
+
+    async def add(session, seq):
+        frame = pack_frame(seq, BLOCK, capture_us=1_000_000 + seq * BLOCK_US)
+        header, payload = parse_frame(frame)
+        await coalescer.add(session, frame, header, payload)
+
+    async def run():
+        await add(first, 0)
+        await add(second, 0)
+        await add(second, 1)
+        for r in coalescer._runs.values():
+            r.started -= 1.0  # Both runs are due
+        # While the sweep publishes the first run, the second fills up and flushes on size
+        bus.during_publish = lambda: add(second, 2)
+        sweep = asyncio.create_task(coalescer.run(interval_ms=1))
+        await asyncio.sleep(0.05)
+        sweep.cancel()
+
+    asyncio.run(run())
+    subjects = [subject for subject, _ in bus.published]
+    assert subjects == ["audio.raw.acme_alice_1", "audio.raw.acme_bob_1"]
+    assert (frames(bus)[1][0].seq, frames(bus)[1][0].frames) == (0, 3)
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from app.core.outbox import Outbox, SLOW_CLIENT_CLOSE
+
+class SlowSocket:
+    """Sends only when released, like a client whose TCP window is full."""
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+def trigger(title, age_ms=0, duration_ms=5000):
+    created = datetime.utcnow() - timedelta(milliseconds=age_ms)
+    return json.dumps({
+        "type": "overlay_trigger", "timestamp": created.isoformat(),
+        "content": {"title": title}, "display_duration_ms": duration_ms
+    })
+
+def test_queued_triggers_and_acks_coalesce_latest_wins():
+    async def run():
+        ws = SlowSocket()
+        outbox = Outbox(ws, max_messages=8)
+        outbox.start()
+        outbox.put(json.dumps({"type": "data_persisted"}))
+        await asyncio.sleep(0)  # Writer takes the first message and blocks on the socket
+        for i in range(5):
+            outbox.put(trigger(f"hint {i}"))
+            outbox.put(json.dumps({"type": "audio_ack", "seq": i}))
+        assert len(outbox) == 2
+        ws.release.set()
+        await asyncio.sleep(0.01)
+        await outbox.close()
+        return ws.sent
+
+    sent = asyncio.run(run())
+    assert [m.get("content", {}).get("title") or m["type"] for m in sent] == ["data_persisted", "hint 4", "audio_ack"]
+    assert sent[2]["seq"] == 4
+
+def test_stale_hints_are_dropped():
+    async def run():
+        ws = SlowSocket()
+        outbox = Outbox(ws, max_messages=8)
+        outbox.start()
+        outbox.put(trigger("old", age_ms=6000))
+        outbox.put(json.dumps({"type": "data_persisted"}))
+        ws.release.set()
+        await asyncio.sleep(0.01)
+        await outbox.close()
+        return ws.sent
+
+    assert [m["type"] for m in asyncio.run(run())] == ["data_persisted"]
+
+def test_overflow_disconnects_the_client():
+    async def run():
+        ws = SlowSocket()
+        outbox = Outbox(ws, max_messages=3)
+        outbox.start()
+        for i in range(5):
+            outbox.put(json.dumps({"type": "data_persisted", "n": i}))
+        await asyncio.sleep(0.01)
+        outbox.put(json.dumps({"type": "data_persisted"}))  # Ignored once closed
+        return ws, outbox
+
+    ws, outbox = asyncio.run(run())
+    assert ws.closed_with == SLOW_CLIENT_CLOSE
+    assert outbox.closed and len(outbox) == 0
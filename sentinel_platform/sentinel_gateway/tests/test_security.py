@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from sentinel_shared.utils.crypto import sign_jwt
+from app.core.config import settings
+from app.core.security import AuthError, JWKSCache, TokenVerifier
+
+def make_token(exp_in=300, **claims):
+    claims = {"sub": "u1", "org_id": "acme", "exp": int(time.time()) + exp_in, **claims}
+    return jwt.encode(claims, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+def test_verified_tokens_are_cached_until_expiry():
+    verifier = TokenVerifier()
+    token = make_token(roles=["agent"])
+
+    async def run():
+        first = await verifier.verify(token)
+        second = await verifier.verify(token)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second  # Served from the cache
+    assert (first.org_id, first.user_id, first.roles) == ("acme", "u1", ["agent"])
+
+def test_rejects_bad_tokens():
+    verifier = TokenVerifier()
+    for token in ["not-a-jwt", make_token(exp_in=-3600), make_token(org_id=None)]:
+        with pytest.raises(AuthError):
+            asyncio.run(verifier.verify(token))
+
+def test_client_issued_tokens_are_accepted():
+    # What sentinel_client's load_token() mints with SENTINEL_DEV_JWT_SECRET
+    token = sign_jwt({"sub": "dev-user", "org_id": "dev-org", "roles": ["agent"]}, settings.JWT_SECRET, ttl=60)
+    context = asyncio.run(TokenVerifier().verify(token))
+    assert (context.org_id, context.user_id, context.roles) == ("dev-org", "dev-user", ["agent"])
+    # The placeholder the client used to send
+    with pytest.raises(AuthError):
+        asyncio.run(TokenVerifier().verify("phase1-demo-token"))
+
+class FakeJWKS(JWKSCache):
+    def __init__(self, jwks):
+        super().__init__(url="http://idp/jwks", min_refresh_interval=0)
+        self.jwks = jwks
+        self.fetches = 0
+
+    def _fetch(self):
+        self.fetches += 1
+        return self.jwks
+
+def test_jwks_key_rotation_refetches_once():
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    claims = {"sub": "u1", "org_id": "acme", "exp": int(time.time()) + 300}
+    token = jwt.encode(claims, pem, algorithm="RS256", headers={"kid": "k2"})
+
+    jwks = FakeJWKS({"keys": [{**public, "kid": "k1", "use": "sig"}]})
+
+    async def run():
+        await jwks.refresh()
+        # Provider rotates to k2 after our last fetch
+        jwks.jwks = {"keys": [{**public, "kid": "k2", "use": "sig"}]}
+        verifier = TokenVerifier(jwks)
+        results = await asyncio.gather(*(verifier.verify(token) for _ in range(20)))
+        return results
+
+    results = asyncio.run(run())
+    assert all(r.org_id == "acme" for r in results)
+    assert jwks.fetches == 2  # Initial load + one shared re-fetch for the new kid
@@ -0,0 +1,121 @@
+import asyncio
+
+from sentinel_shared.schemas.auth import TenantContext
+from app.core.sessions import SessionManager
+
+ALICE = TenantContext(user_id="alice", org_id="acme", roles=[])
+BOB = TenantContext(user_id="bob", org_id="acme", roles=[])
+
+class Msg:
+    def __init__(self, subject, data=b""):
+        self.subject = subject
+        self.data = data
+
+class FakeBus:
+    def __init__(self):
+        self.published = []
+        self.subscriptions = {}
+
+    async def publish(self, subject, payload, headers=None):
+        self.published.append((subject, payload))
+
+    async def subscribe(self, subject, cb):
+        self.subscriptions[subject] = cb
+
+def ended(bus):
+    return [s for s, _ in bus.published if s.startswith("session.end.")]
+
+def test_dropped_session_resumes_within_grace():
+    bus = FakeBus()
+    sent = []
+
+    async def run():
+        manager = SessionManager(bus, grace=0.05)
+        session = await manager.open(ALICE)
+        token = manager.issue_token(session)
+        manager.attach(session, sent.append)
+        session.last_seq[0] = 41
+
+        manager.detach(session, sent.append)
+        session.pending.append("trigger while away")
+        resumed = await manager.open(ALICE, token)
+        replayed = manager.attach(resumed, sent.append)
+        await asyncio.sleep(0.1)  # Past the grace period: must not end
+        return session, resumed, replayed
+
+    session, resumed, replayed = asyncio.run(run())
+    assert resumed is session and resumed.resume_from() == 42
+    assert replayed == ["trigger while away"]
+    assert ended(bus) == []
+
+def test_grace_expiry_ends_session():
+    bus = FakeBus()
+
+    async def run():
+        manager = SessionManager(bus, grace=0.01)
+        session = await manager.open(ALICE)
+        manager.attach(session, print)
+        manager.detach(session, print)
+        await asyncio.sleep(0.05)
+        return session, manager
+
+    session, manager = asyncio.run(run())
+    assert ended(bus) == [f"session.end.{session.session_id}"]
+    assert not manager.sessions
+
+def test_token_is_bound_to_its_user():
+    bus = FakeBus()
+
+    async def run():
+        manager = SessionManager(bus)
+        session = await manager.open(ALICE)
+        other = await manager.open(BOB, manager.issue_token(session))
+        forged = await manager.open(ALICE, "eyJzaWQiOiJ4In0.AAAA")
+        return session, other, forged
+
+    session, other, forged = asyncio.run(run())
+    assert other.session_id != session.session_id
+    assert forged.session_id != session.session_id
+
+def test_resume_on_another_pod_stands_down_without_ending():
+    bus = FakeBus()
+
+    async def run():
+        pod_a, pod_b = SessionManager(bus, grace=0.05), SessionManager(bus, grace=0.05)
+        await pod_a.start()
+        session = await pod_a.open(ALICE)
+        pod_a.attach(session, print)
+        pod_a.detach(session, print)
+
+        resumed = await pod_b.open(ALICE, pod_a.issue_token(session))
+        subject, pod_id = bus.published[-1]
+        await bus.subscriptions["session.resume.>"](Msg(subject, pod_id))
+        await asyncio.sleep(0.1)
+        return session, resumed, pod_a
+
+    session, resumed, pod_a = asyncio.run(run())
+    assert resumed.session_id == session.session_id
+    assert not pod_a.sessions
+    assert ended(bus) == []
+
+def test_ui_commands_are_dispatched_by_session_id():
+    bus = FakeBus()
+    sent = []
+
+    async def run():
+        manager = SessionManager(bus)
+        await manager.start()
+        dispatch = bus.subscriptions["ui.commands.>"]
+        session = await manager.open(ALICE)
+
+        # Before the connection attaches: held, then handed over on attach
+        await dispatch(Msg(f"ui.commands.{session.session_id}", b'{"n": 1}'))
+        replayed = manager.attach(session, sent.append)
+        await dispatch(Msg(f"ui.commands.{session.session_id}", b'{"n": 2}'))
+        # Another pod's session
+        await dispatch(Msg("ui.commands.other_user_abc", b'{"n": 3}'))
+        return replayed
+
+    replayed = asyncio.run(run())
+    assert replayed == ['{"n": 1}']
+    assert sent == ['{"n": 2}']
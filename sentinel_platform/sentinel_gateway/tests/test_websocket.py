@@ -1,9 +1,17 @@
+import time
+
 from fastapi.testclient import TestClient
+from jose import jwt
 from app.main import app
+from app.core.config import settings
 from sentinel_shared.schemas.events import HandshakePayload, AudioConfig, EventType
 
 client = TestClient(app)
 
+def make_token():
+    claims = {"sub": "user-1", "org_id": "org-1", "exp": int(time.time()) + 300}
+    return jwt.encode(claims, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
 def test_websocket_handshake():
     """
     Simulates a client connecting, sending a handshake, 
@@ -12,7 +20,7 @@ def test_websocket_handshake():
     with client.websocket_connect("/ws/stream") as websocket:
         # Create valid handshake
         handshake = HandshakePayload(
-            token="test-token",
+            token=make_token(),
             client_version="1.0.0",
             audio_config=AudioConfig()
         )
@@ -23,7 +31,7 @@ def test_websocket_handshake():
         # Expect ACK
         response = websocket.receive_json()
         assert response["type"] == "handshake_ack"
-        assert "session_id" in response
+        assert response["session_id"].startswith("org-1_user-1_")
 
 def test_websocket_audio_echo():
     """
@@ -33,7 +41,7 @@ def test_websocket_audio_echo():
     with client.websocket_connect("/ws/stream") as websocket:
         # Handshake first
         handshake = HandshakePayload(
-            token="test-token",
+            token=make_token(),
             client_version="1.0.0",
             audio_config=AudioConfig()
         )
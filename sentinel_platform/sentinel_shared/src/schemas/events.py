@@ -1,6 +1,6 @@
 # sentinel_shared/src/schemas/events.py
 from enum import Enum
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Mapping
 from uuid import UUID, uuid4
 from datetime import datetime
 from pydantic import BaseModel, Field
@@ -13,9 +13,13 @@ class EventType(str, Enum):
     
     # Server -> Client
     HANDSHAKE_ACK = "handshake_ack"
+    AUDIO_ACK = "audio_ack"
     ERROR = "error"
     OVERLAY_TRIGGER = "overlay_trigger"
 
+    # Worker -> Worker
+    TRANSCRIPT = "transcript"
+
 class BaseMessage(BaseModel):
     """Base envelope for all WebSocket control messages."""
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -24,25 +28,98 @@ class BaseMessage(BaseModel):
 
 # --- payloads ---
 
+# NATS headers that describe the audio on audio.raw.<session_id>.
+# Frames without them are the default format (16kHz mono pcm_s16le).
+AUDIO_ENCODING_HEADER = "Audio-Encoding"
+AUDIO_RATE_HEADER = "Audio-Rate"
+AUDIO_CHANNELS_HEADER = "Audio-Channels"
+AUDIO_LAYOUT_HEADER = "Audio-Layout"
+
+PCM_S16LE = "pcm_s16le"
+OPUS = "opus"
+SUPPORTED_ENCODINGS = (PCM_S16LE, OPUS)
+
+# Speakers on a transcript segment
+AGENT = "agent"
+CUSTOMER = "customer"
+MIXED = "mixed"  # Both parties on one channel (mono call audio)
+
+# Channel layouts: who is on which channel of a stream
+DUAL = "dual"  # Stereo: channel 0 = mic (agent), channel 1 = system audio (customer)
+LAYOUT_SPEAKERS = {
+    MIXED: (MIXED,),  # Any channel count, downmixed
+    DUAL: (AGENT, CUSTOMER),
+    AGENT: (AGENT,),  # Two-stream sessions: one stream per speaker
+    CUSTOMER: (CUSTOMER,),
+}
+
 class AudioConfig(BaseModel):
     """Negotiates audio format. Default: 16kHz, Mono, PCM Int16"""
     sample_rate: int = 16000
     channels: int = 1
-    encoding: str = "pcm_s16le" # or 'opus'
+    encoding: str = PCM_S16LE # or 'opus' (length-prefixed packets, see utils/audio.py)
+    layout: str = MIXED # see LAYOUT_SPEAKERS
     chunk_size: int = 4096
 
+    def is_supported(self) -> bool:
+        return (self.encoding in SUPPORTED_ENCODINGS
+                and self.layout in LAYOUT_SPEAKERS
+                and (self.layout != DUAL or self.channels == 2))
+
+    def to_headers(self) -> Optional[Dict[str, str]]:
+        """NATS headers for this format; None for the default, which needs none."""
+        if self == AudioConfig(chunk_size=self.chunk_size):
+            return None
+        headers = {
+            AUDIO_ENCODING_HEADER: self.encoding,
+            AUDIO_RATE_HEADER: str(self.sample_rate),
+            AUDIO_CHANNELS_HEADER: str(self.channels),
+        }
+        if self.layout != MIXED:
+            headers[AUDIO_LAYOUT_HEADER] = self.layout
+        return headers
+
+    @classmethod
+    def from_headers(cls, headers: Optional[Mapping[str, str]]) -> "AudioConfig":
+        if not headers or AUDIO_ENCODING_HEADER not in headers:
+            return cls()
+        return cls(
+            encoding=headers[AUDIO_ENCODING_HEADER],
+            sample_rate=int(headers.get(AUDIO_RATE_HEADER, 16000)),
+            channels=int(headers.get(AUDIO_CHANNELS_HEADER, 1)),
+            layout=headers.get(AUDIO_LAYOUT_HEADER, MIXED),
+        )
+
 class HandshakePayload(BaseMessage):
     """First message sent by client to authenticate."""
     type: EventType = EventType.HANDSHAKE
     token: str # JWT
     client_version: str
     audio_config: AudioConfig
+    # Frames are sent in the binary envelope (see utils/audio.py pack_frame) and are acked;
+    # otherwise they are bare audio and the Gateway wraps them
+    sequenced: bool = False
+    # From a previous HandshakeAck: resume that session instead of starting a new one
+    reconnect_token: Optional[str] = None
 
 class HandshakeAckPayload(BaseMessage):
     """Server response to handshake."""
     type: EventType = EventType.HANDSHAKE_ACK
     session_id: str
     reconnect_token: Optional[str] = None
+    resume_from: int = 0 # Next frame sequence number the server expects (main channel)
+    resume_channels: Dict[int, int] = {} # Same, per envelope channel (two-stream sessions)
+
+class AudioConfigPayload(BaseMessage):
+    """Mid-call audio format change; frames after it use the new format (e.g. Opus -> PCM fallback)."""
+    type: EventType = EventType.AUDIO_CONFIG
+    audio_config: AudioConfig
+
+class AudioAckPayload(BaseMessage):
+    """Frames up to `seq` reached the backend; the client can drop them from its replay window."""
+    type: EventType = EventType.AUDIO_ACK
+    seq: int
+    channel: int = 0 # Envelope channel the sequence number counts on
 
 class OverlayContent(BaseModel):
     """Data to be rendered on the Desktop UI."""
@@ -56,4 +133,18 @@ class OverlayTriggerPayload(BaseMessage):
     """Instruction for Client to show UI."""
     type: EventType = EventType.OVERLAY_TRIGGER
     content: OverlayContent
-    display_duration_ms: int = 5000
\ No newline at end of file
+    display_duration_ms: int = 5000
+
+class TranscriptPayload(BaseMessage):
+    """
+    Transcript words published by the Speech Service.
+    Partial payloads carry only newly committed (stable) words; the final
+    payload carries the full utterance text.
+    """
+    type: EventType = EventType.TRANSCRIPT
+    session_id: str
+    text: str
+    is_final: bool = False
+    speaker: str = MIXED # agent / customer on dual-channel sessions
+    start_offset: float = 0.0 # Seconds from start of the session
+    end_offset: float = 0.0
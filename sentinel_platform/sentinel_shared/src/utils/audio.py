@@ -0,0 +1,145 @@
+# sentinel_shared/src/utils/audio.py
+"""
+Wire format helpers for audio frames on `audio.raw.<session_id>`.
+
+PCM payloads are raw little-endian int16. Opus payloads carry one or more
+Opus packets, each prefixed with its length as a little-endian uint16,
+so packet boundaries survive the WebSocket -> NATS hop untouched.
+
+Every frame travels in a fixed 16-byte envelope (see pack_frame), from
+the client's WebSocket all the way to the workers:
+
+    u8  version     FRAME_VERSION
+    u8  codec       CODEC_PCM_S16LE / CODEC_OPUS
+    u8  channel     CHANNEL_MAIN, or CHANNEL_AGENT / CHANNEL_CUSTOMER for two-stream sessions
+    u8  frames      Client frames coalesced into this one (the Gateway may merge a run)
+    u32 seq         Per-stream frame counter, for gap/duplicate/reorder detection; the first one's if merged
+    u64 capture_us  Client capture time, microseconds since the epoch (0: unknown)
+
+Little-endian; the payload follows the header.
+"""
+import struct
+import time
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from sentinel_shared.schemas.events import PCM_S16LE, OPUS, AGENT, CUSTOMER
+
+_LEN = struct.Struct("<H")
+
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<BBBBIQ")
+HEADER_SIZE = FRAME_HEADER.size
+
+CODEC_PCM_S16LE = 0
+CODEC_OPUS = 1
+CODECS = {CODEC_PCM_S16LE: PCM_S16LE, CODEC_OPUS: OPUS}
+CODEC_IDS = {name: codec for codec, name in CODECS.items()}
+
+CHANNEL_MAIN = 0  # The stream's own layout (AudioConfig.layout)
+CHANNEL_AGENT = 1
+CHANNEL_CUSTOMER = 2
+CHANNEL_LAYOUTS = {CHANNEL_AGENT: AGENT, CHANNEL_CUSTOMER: CUSTOMER}
+
+
+class FrameHeader(NamedTuple):
+    version: int
+    codec: int
+    channel: int
+    frames: int
+    seq: int
+    capture_us: int
+
+
+def pack_frame(seq: int, payload: bytes, codec: int = CODEC_PCM_S16LE, channel: int = CHANNEL_MAIN,
+               capture_us: Optional[int] = None, frames: int = 1) -> bytes:
+    if capture_us is None:
+        capture_us = time.time_ns() // 1000
+    return FRAME_HEADER.pack(FRAME_VERSION, codec, channel, frames, seq & 0xFFFFFFFF, capture_us) + payload
+
+
+def parse_frame(data) -> Tuple[FrameHeader, memoryview]:
+    """Header fields and a zero-copy view of the payload. ValueError if not a v1 frame."""
+    view = memoryview(data)
+    if len(view) < HEADER_SIZE:
+        raise ValueError(f"frame of {len(view)} bytes has no header")
+    header = FrameHeader(*FRAME_HEADER.unpack_from(view))
+    if header.version != FRAME_VERSION:
+        raise ValueError(f"unsupported frame version {header.version}")
+    if header.frames == 0:
+        raise ValueError("frame claims to merge no frames")
+    return header, view[HEADER_SIZE:]
+
+
+# Opus TOC config -> frame duration in 48kHz samples (RFC 6716, section 3.1)
+_OPUS_FRAME_48K = (
+    [480, 960, 1920, 2880] * 3      # SILK NB/MB/WB: 10/20/40/60 ms
+    + [480, 960] * 2                # Hybrid SWB/FB: 10/20 ms
+    + [120, 240, 480, 960] * 4      # CELT NB/WB/SWB/FB: 2.5/5/10/20 ms
+)
+
+
+def frame_opus_packets(packets: Iterable[bytes]) -> bytes:
+    """Builds one audio frame from Opus packets (client side)."""
+    out = bytearray()
+    for packet in packets:
+        out += _LEN.pack(len(packet))
+        out += packet
+    return bytes(out)
+
+
+def iter_opus_packets(frame: bytes) -> Iterator[memoryview]:
+    """Zero-copy views of the packets in a frame. Truncated tails are dropped."""
+    view = memoryview(frame)
+    pos, end = 0, len(view)
+    while pos + 2 <= end:
+        (length,) = _LEN.unpack_from(view, pos)
+        pos += 2
+        if pos + length > end:
+            break
+        yield view[pos:pos + length]
+        pos += length
+
+
+def opus_packet_samples(packet: bytes) -> int:
+    """Duration of an Opus packet in 48kHz samples, from its TOC byte."""
+    if not packet:
+        return 0
+    toc = packet[0]
+    per_frame = _OPUS_FRAME_48K[toc >> 3]
+    code = toc & 0x03
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = (packet[1] & 0x3F) if len(packet) > 1 else 0
+    return per_frame * frames
+
+
+def payload_samples(payload, codec: int, sample_rate: int, channels: int) -> int:
+    """Duration of a frame payload in samples at `sample_rate` (Opus from its TOC bytes)."""
+    if codec == CODEC_OPUS:
+        samples_48k = sum(opus_packet_samples(p) for p in iter_opus_packets(payload))
+        return samples_48k * sample_rate // 48000
+    return len(payload) // (2 * channels)
+
+
+def skip_frames(header: FrameHeader, payload, skip: int, sample_rate: int,
+                channels: int) -> Tuple[FrameHeader, memoryview]:
+    """
+    Drops the first `skip` client frames of a merged frame (a replay that
+    partly overlaps audio already played). Client frames are taken to be
+    equal-sized: PCM is cut by bytes, Opus by whole packets.
+    """
+    payload = memoryview(payload)
+    if header.codec == CODEC_OPUS:
+        packets = list(iter_opus_packets(payload))
+        cut = sum(2 + len(p) for p in packets[:len(packets) * skip // header.frames])
+    else:
+        frame_samples = len(payload) // (2 * channels) // header.frames
+        cut = frame_samples * skip * 2 * channels
+    capture_us = header.capture_us
+    if capture_us:
+        capture_us += payload_samples(payload[:cut], header.codec, sample_rate, channels) * 1_000_000 // sample_rate
+    header = header._replace(seq=header.seq + skip, frames=header.frames - skip, capture_us=capture_us)
+    return header, payload[cut:]
@@ -1 +1,47 @@
-# Encryption helpers
\ No newline at end of file
+# sentinel_shared/src/utils/crypto.py
+# Encryption helpers
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def sign_token(claims: Dict[str, Any], secret: str, ttl: float) -> str:
+    """Compact HMAC-SHA256 token: <base64 json>.<base64 mac>. Adds `exp`."""
+    body = _b64(json.dumps({**claims, "exp": int(time.time() + ttl)}, separators=(",", ":")).encode())
+    mac = hmac.new(secret.encode(), body.encode(), hashlib.sha256).digest()
+    return f"{body}.{_b64(mac)}"
+
+
+def sign_jwt(claims: Dict[str, Any], secret: str, ttl: float) -> str:
+    """HS256 JWT (RFC 7519) with `iat`/`exp`: dev and service tokens the Gateway's TokenVerifier accepts."""
+    now = int(time.time())
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = _b64(json.dumps({**claims, "iat": now, "exp": int(now + ttl)}, separators=(",", ":")).encode())
+    mac = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64(mac)}"
+
+
+def verify_token(token: str, secret: str) -> Optional[Dict[str, Any]]:
+    """Claims of a token made by sign_token, or None if forged, malformed or expired."""
+    try:
+        body, mac = token.split(".")
+        expected = hmac.new(secret.encode(), body.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _unb64(mac)):
+            return None
+        claims = json.loads(_unb64(body))
+    except (ValueError, TypeError):
+        return None
+    if claims.get("exp", 0) < time.time():
+        return None
+    return claims
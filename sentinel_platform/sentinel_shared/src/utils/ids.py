@@ -0,0 +1,31 @@
+# sentinel_shared/src/utils/ids.py
+import re
+from typing import Optional
+from uuid import uuid4
+
+# Session IDs end NATS subjects (audio.raw.<session_id>): no dots, spaces or wildcards
+_UNSAFE = re.compile(r"[^A-Za-z0-9-]")
+# The org part must map back to the exact org ID (tenant rules are keyed by it),
+# so anything but letters and digits is escaped as -xx per UTF-8 byte
+_ORG_UNSAFE = re.compile(r"[^A-Za-z0-9]")
+_ORG_ESCAPE = re.compile(rb"-([0-9a-f]{2})")
+
+
+def _encode_org(org_id: str) -> str:
+    return _ORG_UNSAFE.sub(lambda m: "".join(f"-{b:02x}" for b in m.group().encode()), org_id)
+
+
+def new_session_id(org_id: str, user_id: str) -> str:
+    """Unique per connection and bound to its tenant: <org>_<user>_<random>."""
+    return f"{_encode_org(org_id)}_{_UNSAFE.sub('-', user_id)}_{uuid4().hex}"
+
+
+def session_tenant(session_id: str) -> Optional[str]:
+    """Org ID a session belongs to; None for IDs not made by new_session_id."""
+    parts = session_id.split("_")
+    if len(parts) != 3:
+        return None
+    try:
+        return _ORG_ESCAPE.sub(lambda m: bytes.fromhex(m.group(1).decode()), parts[0].encode()).decode()
+    except UnicodeDecodeError:
+        return None
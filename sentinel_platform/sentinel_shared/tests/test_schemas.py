@@ -2,6 +2,12 @@ import pytest
 from sentinel_shared.schemas.events import (
     HandshakePayload, AudioConfig, EventType, OverlayTriggerPayload
 )
+from sentinel_shared.utils.ids import new_session_id, session_tenant
+from sentinel_shared.utils.audio import (
+    frame_opus_packets, iter_opus_packets, opus_packet_samples,
+    pack_frame, parse_frame, payload_samples, skip_frames, HEADER_SIZE, CODEC_OPUS, CODEC_PCM_S16LE, CHANNEL_CUSTOMER
+)
+from sentinel_shared.utils.crypto import sign_token, verify_token
 
 def test_handshake_serialization():
     """Ensure handshake model serializes/deserializes correctly."""
@@ -25,4 +31,80 @@ def test_overlay_trigger_structure():
         }
     )
     assert trigger.content.title == "Objection"
-    assert trigger.type == EventType.OVERLAY_TRIGGER
\ No newline at end of file
+    assert trigger.type == EventType.OVERLAY_TRIGGER
+def test_audio_config_headers_round_trip():
+    """Default PCM needs no headers; anything else is described per frame."""
+    assert AudioConfig().to_headers() is None
+    assert AudioConfig.from_headers(None) == AudioConfig()
+
+    opus = AudioConfig(encoding="opus", sample_rate=48000)
+    headers = opus.to_headers()
+    assert headers["Audio-Encoding"] == "opus"
+    assert AudioConfig.from_headers(headers) == opus
+
+def test_dual_channel_layout():
+    dual = AudioConfig(sample_rate=48000, channels=2, layout="dual")
+    assert dual.is_supported()
+    assert AudioConfig.from_headers(dual.to_headers()) == dual
+    # Dual needs exactly one channel per speaker
+    assert not AudioConfig(channels=1, layout="dual").is_supported()
+    assert not AudioConfig(layout="surround").is_supported()
+
+def test_opus_packet_framing():
+    packets = [bytes([0x78, 1, 2, 3]), b"", bytes([0xFB, 9])]
+    frame = frame_opus_packets(packets)
+    assert [bytes(p) for p in iter_opus_packets(frame)] == packets
+    assert [bytes(p) for p in iter_opus_packets(frame[:-1])] == packets[:2]  # Truncated tail
+    # TOC 0x78: hybrid FB 20ms, one frame; 0xFB: CELT FB 20ms, code 3 with two frames
+    assert opus_packet_samples(bytes([0x78])) == 960
+    assert opus_packet_samples(bytes([0xFB, 0x02])) == 1920
+
+def test_session_ids_are_unique_and_subject_safe():
+    a, b = new_session_id("org.1", "jane doe"), new_session_id("org.1", "jane doe")
+    assert a != b
+    assert "." not in a and " " not in a
+    assert session_tenant(a) == "org.1"
+    assert session_tenant("session_1.0.0") is None
+
+def test_session_tenant_is_the_exact_org_id():
+    orgs = ["acme_corp", "acme.io", "acme-io", "acme io", "Ünïcode"]
+    tenants = [session_tenant(new_session_id(org, "u")) for org in orgs]
+    assert tenants == orgs
+
+def test_reconnect_tokens():
+    token = sign_token({"sid": "s1"}, "secret", ttl=60)
+    assert verify_token(token, "secret")["sid"] == "s1"
+    assert verify_token(token, "other-secret") is None
+    assert verify_token(sign_token({"sid": "s1"}, "secret", ttl=-1), "secret") is None
+
+
+def test_frame_envelope():
+    frame = pack_frame(7, b"\x01\x02", codec=CODEC_OPUS, channel=CHANNEL_CUSTOMER, capture_us=123456)
+    assert len(frame) == HEADER_SIZE + 2
+    header, payload = parse_frame(frame)
+    assert (header.seq, header.codec, header.channel, header.capture_us) == (7, CODEC_OPUS, CHANNEL_CUSTOMER, 123456)
+    assert bytes(payload) == b"\x01\x02"
+
+    # A Gateway-merged run of three 1024-sample stereo blocks
+    header, payload = parse_frame(pack_frame(9, bytes(3 * 4096), frames=3))
+    assert (header.seq, header.frames) == (9, 3)
+    assert payload_samples(payload, CODEC_PCM_S16LE, 16000, channels=2) == 3072
+
+    with pytest.raises(ValueError):
+        parse_frame(b"\x01\x02")
+    with pytest.raises(ValueError):
+        parse_frame(b"\x09" + frame[1:])
+
+def test_skip_frames_of_a_merged_frame():
+    # Five 1024-sample mono blocks from seq 3, the first two already played
+    pcm = b"".join(bytes([i]) * 2048 for i in range(5))
+    header, payload = parse_frame(pack_frame(3, pcm, capture_us=1_000_000, frames=5))
+    header, payload = skip_frames(header, payload, 2, 16000, 1)
+    assert (header.seq, header.frames, header.capture_us) == (5, 3, 1_128_000)
+    assert bytes(payload) == pcm[2 * 2048:]
+
+    packets = [bytes([0xF8, i]) for i in range(4)]  # CELT FB 20ms each, one per frame
+    header, payload = parse_frame(pack_frame(0, frame_opus_packets(packets), codec=CODEC_OPUS, capture_us=0, frames=4))
+    header, payload = skip_frames(header, payload, 3, 16000, 1)
+    assert (header.seq, header.frames, header.capture_us) == (3, 1, 0)
+    assert [bytes(p) for p in iter_opus_packets(payload)] == packets[3:]
@@ -0,0 +1,54 @@
+# sentinel_speech/scripts/bench_resampler.py
+"""
+Cost of normalising client audio to 16kHz mono (StreamingResampler),
+per second of audio, for common capture formats.
+
+    python scripts/bench_resampler.py
+    python scripts/bench_resampler.py --chunk-ms 20 --seconds 30
+
+The frame size matches what a Gateway forwards per bus message; the
+resampler is fed frame by frame exactly as StreamProcessor does.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.core.resampler import StreamingResampler
+
+FORMATS = [(48000, 2), (48000, 1), (44100, 2), (44100, 1), (22050, 1), (8000, 1)]
+
+
+def bench(rate: int, channels: int, seconds: float, chunk_ms: float, taps: int) -> float:
+    """Milliseconds of CPU per second of audio."""
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    pcm = np.repeat(tone, channels)
+    step = int(rate * chunk_ms / 1000) * channels
+
+    resampler = StreamingResampler(rate, settings.SAMPLE_RATE, channels, taps=taps)
+    t0 = time.process_time()
+    for start in range(0, len(pcm), step):
+        resampler.process(pcm[start:start + step])
+    return 1000 * (time.process_time() - t0) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0, help="Audio per format")
+    parser.add_argument("--chunk-ms", type=float, default=64, help="Audio per frame")
+    parser.add_argument("--taps", type=int, default=16, help="Filter taps per phase")
+    args = parser.parse_args()
+
+    for rate, channels in FORMATS:
+        cost = bench(rate, channels, args.seconds, args.chunk_ms, args.taps)
+        print(f"{rate:>6}Hz x{channels}: {cost:7.3f} ms CPU per audio second")
+
+
+if __name__ == "__main__":
+    main()
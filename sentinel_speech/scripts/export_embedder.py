@@ -0,0 +1,49 @@
+# sentinel_speech/scripts/export_embedder.py
+import sys
+from pathlib import Path
+
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModel, AutoTokenizer
+
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+OUT_DIR = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "models"
+
+def export():
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    fp32_path = OUT_DIR / "minilm-l6-v2.onnx"
+    int8_path = OUT_DIR / "minilm-l6-v2-int8.onnx"
+
+    print(f"Loading {MODEL_ID}...")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    model = AutoModel.from_pretrained(MODEL_ID).eval()
+
+    # Fast tokenizer JSON is all the worker needs (no transformers at runtime)
+    tokenizer.backend_tokenizer.save(str(OUT_DIR / "minilm-l6-v2-tokenizer.json"))
+
+    print("Exporting to ONNX...")
+    sample = tokenizer(["the price is too high"], return_tensors="pt")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        str(fp32_path),
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "tokens"},
+            "attention_mask": {0: "batch", 1: "tokens"},
+            "token_type_ids": {0: "batch", 1: "tokens"},
+            "last_hidden_state": {0: "batch", 1: "tokens"},
+        },
+        opset_version=17,
+    )
+
+    # OPTIMIZATION: Dynamic int8 quantisation of the MatMul weights.
+    # ~4x smaller and ~2-3x faster on CPU; cosine scores move by < 0.01.
+    print("Quantising to int8...")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+    print(f"✅ Wrote {int8_path}")
+
+if __name__ == "__main__":
+    export()
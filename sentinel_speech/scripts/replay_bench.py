@@ -0,0 +1,333 @@
+# sentinel_speech/scripts/replay_bench.py
+"""
+Offline replay benchmark for the speech pipeline.
+
+Feeds WAV/PCM recordings through the real StreamProcessor path (NATS
+handler -> batched VAD -> endpointer -> admission -> batcher -> NLP ->
+publish) across many simulated concurrent sessions, with an in-memory bus
+and a stand-in transcriber instead of NATS and Triton.
+
+    python scripts/replay_bench.py ../sentinel_ops/load_tests/data --sessions 200 --speed 0
+    python scripts/replay_bench.py call.wav --sessions 50 --speed 1 --json
+    python scripts/replay_bench.py ../sentinel_ops/load_tests/data --sessions 100 --dual
+
+--speed 1 is real time, N is N x real time, 0 is as fast as possible.
+--coalesce N merges N client chunks per message, as the Gateway's
+COALESCE_WINDOW_MS does (3 x 64ms = 192ms).
+--dual sends stereo sessions (agent mic left, customer right, each side a
+different recording) so both speaker channels are exercised.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+import wave
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Add project root to path so we can import src
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.core import tracing
+from src.adapters.bus import InMemoryBus
+from src.workers.stream_processor import StreamProcessor
+from sentinel_shared.schemas.events import AudioConfig, DUAL
+from sentinel_shared.utils.audio import pack_frame
+
+# Stand-in transcripts, cycled per utterance; some hit the default rules
+DEFAULT_SCRIPT = [
+    "thanks for taking the time today",
+    "honestly the price is a bit high for our budget",
+    "we are currently using jira for this",
+    "can you walk me through the dashboard",
+    "what would the implementation timeline look like",
+    "that makes sense",
+]
+
+
+def load_recording(path: Path) -> np.ndarray:
+    """Mono int16 at SAMPLE_RATE from a 16-bit WAV or raw 16kHz int16 PCM file."""
+    if path.suffix.lower() == ".pcm":
+        return np.fromfile(path, dtype=np.int16)
+
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("only 16-bit PCM WAV is supported")
+        channels, rate = wav.getnchannels(), wav.getframerate()
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != settings.SAMPLE_RATE:
+        # Linear interpolation is good enough for a load benchmark
+        n_out = int(len(pcm) * settings.SAMPLE_RATE / rate)
+        positions = np.linspace(0, len(pcm) - 1, n_out)
+        pcm = np.interp(positions, np.arange(len(pcm)), pcm).astype(np.int16)
+    return pcm
+
+
+def load_recordings(paths: List[str]) -> List[Tuple[str, np.ndarray]]:
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(f for f in p.rglob("*") if f.suffix.lower() in (".wav", ".pcm")))
+        else:
+            files.append(p)
+
+    recordings = []
+    for f in files:
+        try:
+            pcm = load_recording(f)
+        except Exception as e:
+            print(f"skipping {f}: {e}", file=sys.stderr)
+            continue
+        if len(pcm) >= settings.SAMPLE_RATE:
+            recordings.append((f.name, pcm))
+        else:
+            print(f"skipping {f}: shorter than 1s", file=sys.stderr)
+    return recordings
+
+
+class EnergyVAD:
+    """RMS stand-in for Silero when the ONNX model is not available."""
+
+    def infer_batch(self, frames: np.ndarray, streams) -> np.ndarray:
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return np.clip(rms / 0.02, 0.0, 1.0)
+
+
+class StandInTranscriber:
+    """
+    Replaces Triton: sleeps for a modelled GPU time per batch and returns
+    scripted text, so the rest of the pipeline does real work.
+    """
+
+    def __init__(self, script: List[str], base_ms: float, rtf: float):
+        self.script = script
+        self.base = base_ms / 1000.0
+        self.rtf = rtf
+        self.calls = 0
+        self.utterances = 0
+
+    async def connect(self):
+        pass
+
+    async def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        longest = max(len(a) for a in audios) / settings.SAMPLE_RATE
+        await asyncio.sleep(self.base + self.rtf * longest)
+        texts = []
+        for _ in audios:
+            texts.append(self.script[self.utterances % len(self.script)])
+            self.utterances += 1
+        self.calls += 1
+        return texts
+
+    async def close(self):
+        pass
+
+
+class InMemoryState:
+    def __init__(self):
+        self.segments = 0
+        self.by_speaker = {}
+
+    def append_transcript(self, session_id: str, text: str, start_offset: float = 0.0,
+                          end_offset: float = 0.0, speaker: str = "mixed"):
+        self.segments += 1
+        self.by_speaker[speaker] = self.by_speaker.get(speaker, 0) + 1
+
+    async def close(self):
+        pass
+
+
+class BuiltinRules:
+    """Keeps NLPRouter's built-in rules; no Redis."""
+
+    async def load_all(self):
+        pass
+
+    async def watch(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def dual_channel(agent: np.ndarray, customer: np.ndarray) -> np.ndarray:
+    """Interleaved stereo of two recordings, the shorter one padded with silence."""
+    stereo = np.zeros((max(len(agent), len(customer)), 2), dtype=np.int16)
+    stereo[:len(agent), 0] = agent
+    stereo[:len(customer), 1] = customer
+    return stereo.reshape(-1)
+
+
+async def feed_session(bus: InMemoryBus, session_id: str, pcm: np.ndarray, chunk: int,
+                       speed: float, delay: float, headers: dict = None, coalesce: int = 1):
+    """`coalesce` client chunks go out per message, merged as the Gateway does."""
+    await asyncio.sleep(delay)
+    chunk_seconds = chunk * coalesce / settings.SAMPLE_RATE
+    if headers:
+        chunk *= int(headers.get("Audio-Channels", 1))
+    t0 = time.perf_counter()
+    # Capture clock of the recording, as the client would stamp it
+    capture0 = time.time_ns() // 1000
+    chunk_us = int(chunk_seconds * 1_000_000)
+    chunk *= coalesce
+    for i, start in enumerate(range(0, len(pcm), chunk)):
+        if speed > 0:
+            due = t0 + i * chunk_seconds / speed
+            wait = due - time.perf_counter()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        else:
+            await asyncio.sleep(0)
+        frame = pack_frame(i * coalesce, pcm[start:start + chunk].tobytes(),
+                           capture_us=capture0 + i * chunk_us, frames=coalesce)
+        await bus.publish(f"audio.raw.{session_id}", frame, headers)
+    await bus.publish(f"session.end.{session_id}", b"")
+
+
+async def run(args) -> dict:
+    recordings = load_recordings(args.inputs)
+    if not recordings:
+        raise SystemExit("no usable recordings")
+
+    settings.METRICS_PORT = 0
+    script = DEFAULT_SCRIPT
+    if args.script:
+        script = [line.strip() for line in Path(args.script).read_text().splitlines() if line.strip()]
+
+    vad = None
+    if args.vad == "energy" or (args.vad == "auto" and not Path(settings.VAD_MODEL_PATH).exists()):
+        print("using energy VAD stand-in", file=sys.stderr)
+        vad = EnergyVAD()
+
+    triggers = []
+    bus_messages = 0
+
+    def on_publish(msg):
+        nonlocal bus_messages
+        if msg.subject.startswith("ui.commands."):
+            triggers.append(msg.subject)
+        elif msg.subject.startswith("audio.raw."):
+            bus_messages += 1
+
+    bus = InMemoryBus(on_publish=on_publish)
+    transcriber = StandInTranscriber(script, args.asr_base_ms, args.asr_rtf)
+    state_db = InMemoryState()
+    processor = StreamProcessor(
+        bus=bus, vad=vad, transcriber=transcriber, state_db=state_db,
+        rule_store=BuiltinRules(), semantic_matching=False
+    )
+
+    latencies: List[float] = []
+    listener = lambda trace, seconds: latencies.append(seconds)
+    tracing.add_listener(listener)
+
+    worker = asyncio.create_task(processor.start())
+    await asyncio.sleep(0.05)  # Let subscriptions register
+
+    chunk = int(settings.SAMPLE_RATE * args.chunk_ms / 1000)
+    headers = AudioConfig(channels=2, layout=DUAL).to_headers() if args.dual else None
+    audio_seconds = 0.0
+    feeds = []
+    for i in range(args.sessions):
+        name, pcm = recordings[i % len(recordings)]
+        if args.dual:
+            pcm = dual_channel(pcm, recordings[(i + 1) % len(recordings)][1])
+        audio_seconds += len(pcm) / settings.SAMPLE_RATE / (2 if args.dual else 1)
+        # Stagger starts so sessions do not all speak in lockstep
+        delay = (i / args.sessions) * args.ramp
+        feeds.append(feed_session(bus, f"bench{i}", pcm, chunk, args.speed, delay, headers, args.coalesce))
+
+    peak_buffer_bytes = 0
+
+    async def sample_memory():
+        nonlocal peak_buffer_bytes
+        while True:
+            peak_buffer_bytes = max(peak_buffer_bytes, processor.sessions.buffer_bytes())
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.create_task(sample_memory())
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+
+    await asyncio.gather(*feeds)
+    # Drain: wait for held and in-flight utterances to finish
+    deadline = time.perf_counter() + args.drain_timeout
+    while (processor.admission.inflight or processor.admission.waiting) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    sampler.cancel()
+    worker.cancel()
+    tracing.remove_listener(listener)
+    await processor.shutdown()
+
+    per_session_audio = audio_seconds / args.sessions
+    return {
+        "sessions": args.sessions,
+        "bus_messages": bus_messages,
+        "speed": args.speed,
+        "audio_seconds": round(audio_seconds, 1),
+        "wall_seconds": round(wall, 2),
+        # Wall time per second of audio fed (all sessions together)
+        "real_time_factor": round(wall / audio_seconds, 4),
+        "cpu_seconds": round(cpu, 2),
+        "cpu_ms_per_session_second": round(1000 * cpu / audio_seconds, 3),
+        "cpu_seconds_per_session": round(cpu / args.sessions, 3),
+        "rss_growth_kb_per_session": round((rss_after - rss_before) / args.sessions, 1),
+        "peak_buffer_kb_per_session": round(peak_buffer_bytes / 1024 / args.sessions, 1),
+        "transcriptions": transcriber.utterances,  # Finals and partials
+        "triton_calls": transcriber.calls,
+        "triggers": len(triggers),
+        "segments_by_speaker": state_db.by_speaker,
+        "trigger_latency_ms": {
+            "p50": round(1000 * percentile(latencies, 50), 1),
+            "p90": round(1000 * percentile(latencies, 90), 1),
+            "p99": round(1000 * percentile(latencies, 99), 1),
+            "max": round(1000 * max(latencies), 1) if latencies else float("nan"),
+        },
+        "session_audio_seconds": round(per_session_audio, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="WAV/PCM files or directories")
+    parser.add_argument("--sessions", type=int, default=50, help="Concurrent simulated sessions")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N x, 0 = max")
+    parser.add_argument("--chunk-ms", type=float, default=64, help="Audio per bus message (Gateway sends 64ms)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="Seconds over which sessions start")
+    parser.add_argument("--vad", choices=["auto", "silero", "energy"], default="auto")
+    parser.add_argument("--asr-base-ms", type=float, default=40.0, help="Stand-in Triton latency per batch")
+    parser.add_argument("--asr-rtf", type=float, default=0.01, help="Stand-in Triton seconds per audio second")
+    parser.add_argument("--coalesce", type=int, default=1, help="Chunks per bus message (Gateway coalescing)")
+    parser.add_argument("--dual", action="store_true", help="Stereo agent/customer sessions")
+    parser.add_argument("--script", help="Text file of stand-in transcripts, one per line")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Print a single JSON object")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+    for key, value in result.items():
+        print(f"{key:>30}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,70 @@
-# NATS Consumer Wrapper
\ No newline at end of file
+# sentinel_speech/src/adapters/bus.py
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+
+def subject_matches(pattern: str, subject: str) -> bool:
+    """NATS wildcard semantics: '*' matches one token, '>' the rest (one or more)."""
+    pattern_tokens = pattern.split(".")
+    subject_tokens = subject.split(".")
+    for i, token in enumerate(pattern_tokens):
+        if token == ">":
+            return len(subject_tokens) > i
+        if i >= len(subject_tokens) or (token != "*" and token != subject_tokens[i]):
+            return False
+    return len(pattern_tokens) == len(subject_tokens)
+
+
+class BusMessage:
+    __slots__ = ("subject", "data", "headers")
+
+    def __init__(self, subject: str, data: bytes, headers: Optional[dict] = None):
+        self.subject = subject
+        self.data = data
+        self.headers = headers
+
+
+class InMemorySubscription:
+    def __init__(self, bus: "InMemoryBus", subject: str, cb):
+        self.bus = bus
+        self.subject = subject
+        self.cb = cb
+        self.pending_msgs = 0
+
+    async def unsubscribe(self):
+        self.bus.subscriptions.remove(self)
+
+
+class InMemoryBus:
+    """
+    In-process stand-in for the NATS client (publish/subscribe only).
+
+    Used by the replay benchmark to drive StreamProcessor without a server.
+    Callbacks run inline on publish, in subscription order; queue groups
+    are ignored since there is only one consumer. `on_publish` sees every
+    message, e.g. to timestamp outgoing triggers.
+    """
+
+    def __init__(self, on_publish: Callable[[BusMessage], None] = None):
+        self.subscriptions: List[InMemorySubscription] = []
+        self.on_publish = on_publish
+
+    async def subscribe(self, subject: str, queue: str = "", cb: Callable[[BusMessage], Awaitable] = None,
+                        **kwargs) -> InMemorySubscription:
+        sub = InMemorySubscription(self, subject, cb)
+        self.subscriptions.append(sub)
+        return sub
+
+    async def publish(self, subject: str, payload: bytes = b"", headers: Optional[dict] = None):
+        msg = BusMessage(subject, payload, headers)
+        if self.on_publish:
+            self.on_publish(msg)
+        for sub in list(self.subscriptions):
+            if sub.cb and subject_matches(sub.subject, subject):
+                await sub.cb(msg)
+
+    async def flush(self):
+        await asyncio.sleep(0)
+
+    async def close(self):
+        self.subscriptions.clear()
@@ -0,0 +1,106 @@
+# sentinel_speech/src/adapters/embedding_cache.py
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional
+
+import numpy as np
+import redis.asyncio as redis
+from src.core.config import settings
+from src.core.metrics import EMBEDDING_CACHE_LOOKUPS
+from src.core.ttl_cache import TTLCache
+
+logger = logging.getLogger("speech.embedding_cache")
+
+def normalize_text(text: str) -> str:
+    # MiniLM is uncased: case and spacing do not change the vector
+    return " ".join(text.lower().split())
+
+class EmbeddingCache:
+    """
+    Two-tier sentence embedding cache.
+
+    L1: per-process TTL LRU (no network).
+    L2: Redis, shared by every speech worker and surviving restarts.
+      emb:<model version>:<sha1 of normalised text>   raw float32 bytes, EX EMBEDDING_REDIS_TTL
+
+    Keys include the model version, so swapping the encoder never serves
+    stale vectors. Redis errors degrade to misses, never to failures.
+    """
+    KEY_PREFIX = "emb:"
+    normalize = staticmethod(normalize_text)
+
+    def __init__(
+        self,
+        model_version: str = settings.EMBEDDER_MODEL_VERSION,
+        redis_url: str = settings.REDIS_URL,
+        client=None
+    ):
+        self.model_version = model_version
+        self.local = TTLCache(settings.EMBEDDING_CACHE_SIZE, settings.EMBEDDING_CACHE_TTL)
+        # Vectors are binary: no decode_responses here
+        self.redis = client if client is not None else redis.from_url(redis_url)
+        self.redis_ttl = settings.EMBEDDING_REDIS_TTL
+        self._writes = set()
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"{self.KEY_PREFIX}{self.model_version}:{digest}"
+
+    async def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        normalized = [normalize_text(t) for t in texts]
+        results: List[Optional[np.ndarray]] = [self.local.get(n) for n in normalized]
+
+        local_hits = sum(r is not None for r in results)
+        EMBEDDING_CACHE_LOOKUPS.labels(tier="local", result="hit").inc(local_hits)
+        EMBEDDING_CACHE_LOOKUPS.labels(tier="local", result="miss").inc(len(texts) - local_hits)
+
+        missing = [i for i, r in enumerate(results) if r is None]
+        if not missing:
+            return results
+
+        try:
+            raw = await self.redis.mget([self._key(normalized[i]) for i in missing])
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            raw = [None] * len(missing)
+
+        redis_hits = 0
+        for i, blob in zip(missing, raw):
+            if blob is None:
+                continue
+            vector = np.frombuffer(blob, dtype=np.float32)
+            self.local.put(normalized[i], vector)
+            results[i] = vector
+            redis_hits += 1
+        EMBEDDING_CACHE_LOOKUPS.labels(tier="redis", result="hit").inc(redis_hits)
+        EMBEDDING_CACHE_LOOKUPS.labels(tier="redis", result="miss").inc(len(missing) - redis_hits)
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Stores fresh vectors locally now and in Redis in the background."""
+        items = []
+        for text, vector in zip(texts, vectors):
+            normalized = normalize_text(text)
+            vector = np.ascontiguousarray(vector, dtype=np.float32)
+            self.local.put(normalized, vector)
+            items.append((self._key(normalized), vector.tobytes()))
+        if items:
+            # Keep the Redis round trip off the trigger path
+            task = asyncio.create_task(self._write(items))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, items):
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, blob in items:
+                pipe.set(key, blob, ex=self.redis_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    async def close(self):
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        await self.redis.close()
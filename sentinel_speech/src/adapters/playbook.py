@@ -0,0 +1,115 @@
+# sentinel_speech/src/adapters/playbook.py
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from src.core.config import settings
+from src.core.semantic import PLAYBOOK_ORG_FIELD, PlaybookIndex
+
+logger = logging.getLogger("speech.playbook")
+
+class PlaybookMirror:
+    """
+    Keeps an in-process copy of the Qdrant `sales_playbook` collection so
+    semantic matching needs no network hop per sentence.
+
+    The collection is re-scrolled every PLAYBOOK_REFRESH_INTERVAL seconds
+    and the local index is swapped only if its content fingerprint
+    changed. Collections larger than PLAYBOOK_MIRROR_MAX_POINTS are not
+    mirrored; those fall back to one Qdrant search_batch call per batch.
+    """
+
+    def __init__(
+        self,
+        url: str = settings.QDRANT_URL,
+        collection: str = settings.PLAYBOOK_COLLECTION
+    ):
+        # OPTIMIZATION: prefer_grpc=True uses Port 6334
+        self.client = AsyncQdrantClient(url=url, prefer_grpc=True)
+        self.collection = collection
+        self.index: Optional[PlaybookIndex] = None
+        self.remote_only = False
+
+    async def refresh(self):
+        info = await self.client.get_collection(self.collection)
+        if (info.points_count or 0) > settings.PLAYBOOK_MIRROR_MAX_POINTS:
+            if not self.remote_only:
+                logger.info(f"Playbook has {info.points_count} points; using Qdrant search_batch")
+            self.remote_only = True
+            self.index = None
+            return
+
+        ids, vectors, payloads = [], [], []
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=self.collection,
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            for point in points:
+                ids.append(str(point.id))
+                vectors.append(point.vector)
+                payloads.append(point.payload or {})
+            if offset is None:
+                break
+
+        digest = hashlib.sha1()
+        for point_id, vector, payload in zip(ids, vectors, payloads):
+            digest.update(point_id.encode())
+            digest.update(np.asarray(vector, dtype=np.float32).tobytes())
+            digest.update(json.dumps(payload, sort_keys=True).encode())
+        fingerprint = digest.hexdigest()
+
+        self.remote_only = False
+        if self.index is not None and self.index.fingerprint == fingerprint:
+            return
+
+        vectors = np.array(vectors, dtype=np.float32).reshape(len(ids), -1)
+        self.index = PlaybookIndex(vectors, payloads, fingerprint)
+        logger.info(f"Mirrored {len(ids)} playbook entries from Qdrant")
+
+    async def watch(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Playbook refresh failed: {e}")
+            await asyncio.sleep(settings.PLAYBOOK_REFRESH_INTERVAL)
+
+    async def search(self, queries: np.ndarray, tenants: Optional[List[str]] = None) -> List[Optional[Tuple[float, Dict]]]:
+        """Best hit per query among its tenant's entries and the shared ones."""
+        if self.index is not None:
+            return self.index.search(queries, tenants)
+        if not self.remote_only:
+            # Not loaded yet: no hits rather than blocking on Qdrant
+            return [None] * len(queries)
+
+        results = await self.client.search_batch(
+            collection_name=self.collection,
+            requests=[
+                models.SearchRequest(vector=q.tolist(), filter=self._tenant_filter(tenant),
+                                     limit=1, with_payload=True)
+                for q, tenant in zip(queries, tenants or [None] * len(queries))
+            ]
+        )
+        return [(hits[0].score, hits[0].payload or {}) if hits else None for hits in results]
+
+    @staticmethod
+    def _tenant_filter(tenant: Optional[str]) -> models.Filter:
+        shared = models.IsEmptyCondition(is_empty=models.PayloadField(key=PLAYBOOK_ORG_FIELD))
+        if tenant is None:
+            return models.Filter(must=[shared])
+        owned = models.FieldCondition(key=PLAYBOOK_ORG_FIELD, match=models.MatchValue(value=tenant))
+        return models.Filter(should=[shared, owned])
+
+    async def close(self):
+        await self.client.close()
@@ -0,0 +1,123 @@
+# sentinel_speech/src/adapters/rules.py
+import asyncio
+import json
+import logging
+from typing import Optional
+
+import redis.asyncio as redis
+from src.core.config import settings
+
+logger = logging.getLogger("speech.rules")
+
+# Fields the overlay needs from a rule's trigger (see OverlayContent)
+TRIGGER_FIELDS = ("title", "message", "color_hex")
+
+# Backoff between attempts to resubscribe to the update channel
+WATCH_RETRY_SECONDS = 1
+WATCH_RETRY_MAX_SECONDS = 30
+
+
+def rule_problem(rule) -> Optional[str]:
+    """Why a rule cannot be served, or None if it is well-formed."""
+    if not isinstance(rule, dict):
+        return "not an object"
+    keywords = rule.get("keywords")
+    if not isinstance(keywords, list) or not keywords:
+        return "'keywords' must be a non-empty list"
+    if not all(isinstance(k, str) and k.strip() for k in keywords):
+        return "'keywords' must be non-empty strings"
+    trigger = rule.get("trigger")
+    if not isinstance(trigger, dict):
+        return "missing 'trigger'"
+    for field in TRIGGER_FIELDS:
+        if not isinstance(trigger.get(field), str):
+            return f"trigger has no '{field}'"
+    return None
+
+class RuleStore:
+    """
+    Loads per-tenant playbook rules from Redis and hot-swaps them into the
+    NLPRouter without a restart.
+
+    Layout:
+      nlp:rules:<tenant>   JSON {"version": "...", "rules": [{"keywords": [...], "trigger": {...}}]}
+      nlp:rules:updated    Pub/Sub channel; message body is the tenant id to reload
+    """
+    KEY_PREFIX = "nlp:rules:"
+    CHANNEL = "nlp:rules:updated"
+
+    def __init__(self, router, redis_url: str = settings.REDIS_URL):
+        self.router = router
+        self.redis = redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+
+    async def load_all(self):
+        async for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*"):
+            await self.load(key[len(self.KEY_PREFIX):])
+
+    async def load(self, tenant: str):
+        raw = await self.redis.get(f"{self.KEY_PREFIX}{tenant}")
+        if raw is None:
+            self.router.remove_rules(tenant)
+            logger.info(f"Rules removed for tenant '{tenant}'")
+            return
+
+        try:
+            doc = json.loads(raw)
+            rules = self._valid_rules(tenant, doc["rules"])
+            version = str(doc.get("version", ""))
+            self.router.set_rules(tenant, rules, version)
+        except Exception as e:
+            # Keep serving the previous rule set rather than none at all
+            logger.error(f"Invalid rule set for tenant '{tenant}': {e}")
+            return
+        logger.info(f"Loaded {len(rules)} rules for tenant '{tenant}' (version {version})")
+
+    def _valid_rules(self, tenant: str, rules) -> list:
+        # A malformed rule would fail on every match it makes: skip it, keep the rest
+        valid = []
+        for i, rule in enumerate(rules):
+            problem = rule_problem(rule)
+            if problem:
+                logger.warning(f"Rule {i} of tenant '{tenant}' skipped: {problem}")
+            else:
+                valid.append(rule)
+        return valid
+
+    async def watch(self):
+        """
+        Reloads a tenant whenever its id is published on the update channel.
+        If the subscription fails it is re-established with backoff, and all
+        tenants are reloaded, since updates published meanwhile were missed.
+        """
+        delay = WATCH_RETRY_SECONDS
+        resubscribing = False
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                if resubscribing:
+                    await self.load_all()
+                    logger.info("Rule updates resubscribed")
+                delay = WATCH_RETRY_SECONDS
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        await self.load(message["data"])
+                    except Exception as e:
+                        logger.error(f"Rule reload failed: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Rule updates lost ({e}); resubscribing in {delay}s")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            resubscribing = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WATCH_RETRY_MAX_SECONDS)
+
+    async def close(self):
+        await self.redis.close()
@@ -1,20 +1,146 @@
-# Redis Client Wrapper# sentinel_speech/src/adapters/state.py
+# sentinel_speech/src/adapters/state.py
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
 import redis.asyncio as redis
 from src.core.config import settings
+from src.core.tracing import observe
+from sentinel_shared.schemas.events import MIXED
+
+logger = logging.getLogger("speech.state")
+
+# XADD with the entry ID at the segment's start offset (ms), so range reads
+# are selected by XRANGE. Stream IDs must increase, and finals are written
+# in completion order, not start order (two channels, concurrent requests):
+# a segment starting before the newest entry takes that entry's ms instead.
+# ARGV: start ms, MAXLEN, field/value pairs.
+_XADD_AT_START = """
+local top = redis.call('XREVRANGE', KEYS[1], '+', '-', 'COUNT', 1)
+local ms, seq = tonumber(ARGV[1]), 0
+if top[1] then
+    local last_ms, last_seq = string.match(top[1][1], '^(%d+)-(%d+)$')
+    last_ms = tonumber(last_ms)
+    if last_ms >= ms then
+        ms, seq = last_ms, tonumber(last_seq) + 1
+    end
+elseif ms == 0 then
+    seq = 1  -- 0-0 is not a valid entry ID
+end
+return redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], string.format('%d-%d', ms, seq), unpack(ARGV, 3))
+"""
 
 class StateManager:
-    def __init__(self):
-        # We assume localhost for Phase 2 dev, typically passed via Env in Prod
-        redis_url = "redis://localhost:6379" 
-        self.redis = redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
-
-    async def append_transcript(self, session_id: str, text: str):
-        """Appends new text to the session's running transcript."""
-        key = f"transcript:{session_id}"
-        # Append text with a space
-        await self.redis.append(key, f" {text}")
-        # Set expiry (1 day) to clean up old keys
-        await self.redis.expire(key, 86400)
+    """
+    Transcript store (Redis Streams).
+
+    Layout:
+      transcript:<session_id>   Stream; one entry per final utterance
+                                {text, start, end, speaker} (offsets in seconds),
+                                ID <start ms>-<n> (see _XADD_AT_START)
+
+    Writes never wait on Redis: append_transcript() queues the segment and
+    a flush every TRANSCRIPT_FLUSH_MS sends the segments of all sessions in
+    one pipelined round trip (XADD per segment, EXPIRE per key).
+    """
+    KEY_PREFIX = "transcript:"
+
+    def __init__(
+        self,
+        redis_url: str = settings.REDIS_URL,
+        flush_interval_ms: float = settings.TRANSCRIPT_FLUSH_MS,
+        max_batch: int = settings.TRANSCRIPT_MAX_BATCH,
+        client=None
+    ):
+        if client is None:
+            pool = redis.ConnectionPool.from_url(
+                redis_url,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                encoding="utf-8",
+                decode_responses=True
+            )
+            client = redis.Redis(connection_pool=pool)
+        self.redis = client
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self.ttl = settings.TRANSCRIPT_TTL
+        self.max_segments = settings.TRANSCRIPT_MAX_SEGMENTS
+        self._pending: List[Tuple[str, Dict[str, str]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes = set()
+        self._xadd = self.redis.register_script(_XADD_AT_START)
+        # How far an entry's ID can sit from its segment's offsets: a segment
+        # spans at most the ring (MAX_AUDIO_DURATION), and one written late is
+        # at most that plus a request deadline behind the newest entry
+        self.range_slack_ms = int((settings.MAX_AUDIO_DURATION + settings.TRITON_TIMEOUT) * 1000)
+
+    def append_transcript(self, session_id: str, text: str, start_offset: float = 0.0,
+                          end_offset: float = 0.0, speaker: str = MIXED):
+        """Queues a final segment for the next pipelined flush."""
+        self._pending.append((
+            f"{self.KEY_PREFIX}{session_id}",
+            {"text": text, "start": f"{start_offset:.3f}", "end": f"{end_offset:.3f}", "speaker": speaker}
+        ))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+
+    def _flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            task = asyncio.create_task(self._write(items))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, items: List[Tuple[str, Dict[str, str]]]):
+        pipe = self.redis.pipeline(transaction=False)
+        for key, fields in items:
+            start_ms = int(float(fields["start"]) * 1000)
+            args = [start_ms, self.max_segments]
+            for field, value in fields.items():
+                args += (field, value)
+            await self._xadd(keys=[key], args=args, client=pipe)
+        for key in dict.fromkeys(key for key, _ in items):
+            pipe.expire(key, self.ttl)
+        t0 = time.perf_counter()
+        try:
+            # Errors come back per command: one bad segment doesn't hide the rest
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.error(f"Transcript flush of {len(items)} segments failed: {e}")
+            return
+        observe("redis_flush", time.perf_counter() - t0)
+        for (key, fields), result in zip(items, results):
+            if isinstance(result, Exception):
+                logger.error(f"[{key}] Segment at {fields['start']}s not stored: {result}")
+
+    async def get_segments(self, session_id: str, start_offset: float = 0.0,
+                           end_offset: float = float("inf")) -> List[Dict]:
+        """Segments overlapping [start_offset, end_offset], in write order."""
+        # Only entries whose ID could belong to an overlapping segment are read
+        low = max(0, int(start_offset * 1000) - self.range_slack_ms)
+        high = "+" if end_offset == float("inf") else int(end_offset * 1000) + self.range_slack_ms
+        entries = await self.redis.xrange(f"{self.KEY_PREFIX}{session_id}", min=low, max=high)
+        segments = []
+        for _, fields in entries:
+            start, end = float(fields["start"]), float(fields["end"])
+            if end >= start_offset and start <= end_offset:
+                segments.append({
+                    "text": fields["text"], "start_offset": start, "end_offset": end,
+                    "speaker": fields.get("speaker", MIXED)
+                })
+        return segments
+
+    async def get_transcript(self, session_id: str) -> str:
+        return " ".join(s["text"] for s in await self.get_segments(session_id))
 
     async def close(self):
-        await self.redis.close()
\ No newline at end of file
+        self._flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        await self.redis.close()
@@ -0,0 +1,133 @@
+# sentinel_speech/src/core/admission.py
+import logging
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.endpointer import Utterance
+from src.core import metrics
+
+logger = logging.getLogger("speech.admission")
+
+COALESCE = "coalesce"
+DROP_OLDEST = "drop_oldest"
+
+
+class AdmissionController:
+    """
+    Bounds transcription work in flight, per session and across the worker.
+
+    An utterance is admitted while its session has fewer than
+    `max_per_session` and the worker fewer than `max_inflight` requests
+    outstanding. Otherwise it waits as the session's single pending span;
+    a second overflow either merges into that span (COALESCE: one later,
+    longer request, nothing lost) or replaces it (DROP_OLDEST). Only sample
+    positions are held while waiting: the audio stays in the ring buffer
+    and is copied when the span is finally released.
+
+    A merged span never grows past `max_span_seconds` (the ring and the
+    model window only hold so much): past it, COALESCE falls back to
+    DROP_OLDEST for that overflow. Nothing is ever admitted past the limits.
+
+    Partials are best-effort and are shed once the worker is past
+    `partial_watermark`. Past `degrade_watermark` finals should go to the
+    fallback model, if one is configured (see `degraded`).
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = settings.MAX_INFLIGHT_UTTERANCES,
+        max_per_session: int = settings.SESSION_MAX_INFLIGHT,
+        policy: str = settings.OVERLOAD_POLICY,
+        partial_watermark: float = settings.PARTIALS_SHED_WATERMARK,
+        degrade_watermark: float = settings.DEGRADE_WATERMARK,
+        max_span_seconds: float = settings.MAX_UTTERANCE_DURATION
+    ):
+        if policy not in (COALESCE, DROP_OLDEST):
+            raise ValueError(f"Unknown overload policy '{policy}'")
+        self.max_inflight = max_inflight
+        self.max_per_session = max_per_session
+        self.policy = policy
+        self.partial_limit = int(max_inflight * partial_watermark)
+        self.degrade_limit = int(max_inflight * degrade_watermark)
+        self.max_span_seconds = max_span_seconds
+        self.inflight = 0
+        self._per_session: Dict[str, int] = {}
+        # Sessions with a held span, oldest first (FIFO wake-up)
+        self._waiting: "OrderedDict[str, Utterance]" = OrderedDict()
+
+    @property
+    def degraded(self) -> bool:
+        return self.inflight >= self.degrade_limit
+
+    def _can_admit(self, session_id: str) -> bool:
+        return (self.inflight < self.max_inflight
+                and self._per_session.get(session_id, 0) < self.max_per_session)
+
+    def _acquire(self, session_id: str):
+        self.inflight += 1
+        self._per_session[session_id] = self._per_session.get(session_id, 0) + 1
+
+    def offer(self, session_id: str, utterance: Utterance) -> Optional[Utterance]:
+        """Returns the utterance if it may be sent now, else holds it and returns None."""
+        if session_id not in self._waiting and self._can_admit(session_id):
+            self._acquire(session_id)
+            return utterance
+
+        held = self._waiting.get(session_id)
+        if held is None:
+            self._waiting[session_id] = utterance
+        elif self.policy == COALESCE and \
+                utterance.end_sample - held.start_sample <= self.max_span_seconds * held.sample_rate:
+            self._waiting[session_id] = replace(
+                held, end_sample=utterance.end_sample, forced=utterance.forced
+            )
+            metrics.UTTERANCES_SHED.labels(reason="coalesced").inc()
+        else:
+            self._waiting[session_id] = utterance
+            metrics.UTTERANCES_SHED.labels(reason="dropped").inc()
+        return None
+
+    def release(self, session_id: str) -> List[Tuple[str, Utterance]]:
+        """Frees a slot. Returns held spans that may now be sent (already admitted)."""
+        self.inflight -= 1
+        count = self._per_session.get(session_id, 0) - 1
+        if count > 0:
+            self._per_session[session_id] = count
+        else:
+            self._per_session.pop(session_id, None)
+        return self._drain()
+
+    def _drain(self) -> List[Tuple[str, Utterance]]:
+        ready = []
+        for waiting_id in list(self._waiting):
+            if self.inflight >= self.max_inflight:
+                break
+            if self._can_admit(waiting_id):
+                self._acquire(waiting_id)
+                ready.append((waiting_id, self._waiting.pop(waiting_id)))
+        return ready
+
+    def force(self, session_id: str):
+        """Admits one request regardless of the limits (final flush of an evicted session)."""
+        self._acquire(session_id)
+
+    def take(self, session_id: str) -> Optional[Utterance]:
+        """Removes a session's held span (e.g. on eviction) without admitting it."""
+        return self._waiting.pop(session_id, None)
+
+    def try_partial(self) -> bool:
+        if self.inflight >= self.partial_limit:
+            metrics.UTTERANCES_SHED.labels(reason="partial").inc()
+            return False
+        self.inflight += 1
+        return True
+
+    def release_partial(self) -> List[Tuple[str, Utterance]]:
+        self.inflight -= 1
+        return self._drain()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
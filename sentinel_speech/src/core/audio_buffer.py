@@ -1,34 +1,125 @@
+from typing import List, Tuple
+
 import numpy as np
+from src.core.config import settings
+
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
 
 class AudioBuffer:
-    def __init__(self, sample_rate=16000, max_duration=30):
+    """
+    Wrap-around ring buffer of raw int16 PCM.
+    Audio stays int16 (half the RAM of float32) and is only converted to
+    float32 when a segment is handed to the transcriber.
+    """
+
+    def __init__(self, sample_rate=settings.SAMPLE_RATE, max_duration=settings.MAX_AUDIO_DURATION):
         self.sample_rate = sample_rate
-        self.capacity = sample_rate * max_duration
-        # OPTIMIZATION: Pre-allocate memory once. No dynamic resizing.
-        self.buffer = np.zeros(self.capacity, dtype=np.float32)
+        self.capacity = int(sample_rate * max_duration)
+        # OPTIMIZATION: Storage is allocated on first write, so idle sessions cost nothing
+        self.buffer = None
         self.write_ptr = 0
         self.count = 0
+        # Samples ever written (stream clock, never wraps)
+        self.total_samples = 0
+
+    def add_bytes(self, chunk) -> None:
+        # Zero-copy view of the incoming int16 data
+        self.add_samples(np.frombuffer(chunk, dtype=np.int16))
+
+    def add_samples(self, samples: np.ndarray) -> None:
+        if self.buffer is None:
+            self.buffer = np.empty(self.capacity, dtype=np.int16)
+
+        length = len(samples)
+        self.total_samples += length
+
+        # Only the newest `capacity` samples can survive the write
+        if length >= self.capacity:
+            self.buffer[:] = samples[-self.capacity:]
+            self.write_ptr = 0
+            self.count = self.capacity
+            return
+
+        # At most two slice copies, never a shift of the whole buffer
+        first = min(length, self.capacity - self.write_ptr)
+        self.buffer[self.write_ptr:self.write_ptr + first] = samples[:first]
+        if first < length:
+            self.buffer[:length - first] = samples[first:]
+
+        self.write_ptr = (self.write_ptr + length) % self.capacity
+        self.count = min(self.count + length, self.capacity)
+
+    def get_views(self, last_n: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the buffered int16 audio (oldest first) as two zero-copy
+        segments. The second segment is empty unless the data wraps.
+        """
+        n = self.count if last_n is None else min(last_n, self.count)
+        if n == 0:
+            empty = np.empty(0, dtype=np.int16)
+            return empty, empty
+
+        start = (self.write_ptr - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.buffer[start:start + n], self.buffer[:0]
+        return self.buffer[start:], self.buffer[:self.write_ptr]
+
+    def get_audio(self, last_n: int = None) -> np.ndarray:
+        """Float32 copy of the buffered audio, ready for the model."""
+        head, tail = self.get_views(last_n)
+        out = np.empty(len(head) + len(tail), dtype=np.float32)
+        np.multiply(head, _INT16_SCALE, out=out[:len(head)])
+        np.multiply(tail, _INT16_SCALE, out=out[len(head):])
+        return out
+
+    def get_range(self, start_sample: int, end_sample: int) -> np.ndarray:
+        """
+        Float32 copy of [start_sample, end_sample) on the stream clock
+        (see total_samples). Audio that has already been overwritten is
+        silently skipped.
+        """
+        last_n = self.total_samples - start_sample
+        audio = self.get_audio(last_n)
+        return audio[:max(0, len(audio) - (self.total_samples - end_sample))]
+
+    def get_duration(self) -> float:
+        return self.count / self.sample_rate
+
+    def is_ready(self, min_seconds: float) -> bool:
+        return self.count >= min_seconds * self.sample_rate
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.buffer is None else self.buffer.nbytes
 
-    def add_bytes(self, chunk: bytes):
-        # Zero-copy conversion where possible
-        float32_data = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
-        length = len(float32_data)
-
-        # Ring buffer logic (simplified for Phase 2: Just reset if full)
-        if self.write_ptr + length > self.capacity:
-            # In a real ring buffer, we'd wrap around. 
-            # For speech chunks, shifting is safer to keep context.
-            # Shift buffer left by length
-            self.buffer[:-length] = self.buffer[length:]
-            self.write_ptr -= length
-        
-        self.buffer[self.write_ptr : self.write_ptr + length] = float32_data
-        self.write_ptr += length
-
-    def get_audio(self) -> np.ndarray:
-        # Return a view, not a copy
-        return self.buffer[:self.write_ptr]
-    
     def clear(self):
-        # Soft reset (instant)
-        self.write_ptr = 0
\ No newline at end of file
+        # Soft reset (instant). Storage is kept for reuse.
+        self.write_ptr = 0
+        self.count = 0
+
+
+class AudioBufferPool:
+    """
+    Shared free-list of buffers. Sessions take one on start and give it back
+    on end, so the allocator is not hit on every new call.
+    """
+
+    def __init__(self, max_free: int = settings.BUFFER_POOL_SIZE, **buffer_kwargs):
+        self.max_free = max_free
+        self.buffer_kwargs = buffer_kwargs
+        self._free: List[AudioBuffer] = []
+
+    def acquire(self) -> AudioBuffer:
+        if self._free:
+            return self._free.pop()
+        return AudioBuffer(**self.buffer_kwargs)
+
+    def release(self, buffer: AudioBuffer):
+        buffer.clear()
+        buffer.total_samples = 0
+        if len(self._free) < self.max_free:
+            self._free.append(buffer)
+
+    def __len__(self):
+        return len(self._free)
@@ -0,0 +1,95 @@
+# sentinel_speech/src/core/batcher.py
+import asyncio
+import bisect
+import logging
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from src.core.config import settings
+from src.core.tracing import observe
+
+logger = logging.getLogger("speech.batcher")
+
+
+class TranscriptionBatcher:
+    """
+    Cross-session micro-batching for Whisper.
+
+    Ready utterances are put in a length bucket (so a 1s utterance is not
+    padded to 15s). A bucket is sent to Triton as one batched request as
+    soon as it holds `max_batch` utterances, or `max_wait_ms` after its
+    first utterance arrived, whichever is first.
+    """
+
+    def __init__(
+        self,
+        transcriber,
+        max_batch: int = settings.WHISPER_MAX_BATCH,
+        max_wait_ms: float = settings.WHISPER_MAX_WAIT_MS,
+        bucket_edges: List[float] = settings.WHISPER_BUCKET_EDGES,
+        sample_rate: int = settings.SAMPLE_RATE
+    ):
+        self.transcriber = transcriber
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.edges = [int(e * sample_rate) for e in bucket_edges]
+        self._buckets: Dict[int, List[Tuple[np.ndarray, asyncio.Future, float]]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._sends = set()  # Batches in flight (held so they are not collected; drained on close)
+
+    def _bucket_for(self, n_samples: int) -> int:
+        return bisect.bisect_left(self.edges, n_samples)
+
+    async def submit(self, audio: np.ndarray) -> str:
+        """Queues one utterance and waits for its transcript."""
+        if len(audio) == 0:
+            return ""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        bucket = self._bucket_for(len(audio))
+        items = self._buckets.setdefault(bucket, [])
+        items.append((audio, future, time.perf_counter()))
+
+        if len(items) >= self.max_batch:
+            self._flush(bucket)
+        elif len(items) == 1:
+            self._timers[bucket] = loop.call_later(self.max_wait, self._flush, bucket)
+
+        return await future
+
+    def _flush(self, bucket: int):
+        timer = self._timers.pop(bucket, None)
+        if timer:
+            timer.cancel()
+        items = self._buckets.pop(bucket, None)
+        if items:
+            task = asyncio.create_task(self._send(items))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, items: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        t0 = time.perf_counter()
+        for _, _, queued_at in items:
+            observe("batch_wait", t0 - queued_at)
+        try:
+            texts = await self.transcriber.transcribe_batch([audio for audio, _, _ in items])
+        except Exception as e:
+            logger.error(f"Batch of {len(items)} failed: {e}")
+            texts = [""] * len(items)
+        observe("triton", time.perf_counter() - t0)
+
+        for (_, future, _), text in zip(items, texts):
+            if not future.done():
+                future.set_result(text)
+
+    def flush_all(self):
+        for bucket in list(self._buckets):
+            self._flush(bucket)
+
+    async def close(self):
+        """Sends whatever is queued and waits for the batches in flight."""
+        self.flush_all()
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
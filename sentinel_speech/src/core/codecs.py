@@ -0,0 +1,118 @@
+# sentinel_speech/src/core/codecs.py
+import logging
+from typing import List, Mapping, Optional, Tuple
+
+import numpy as np
+from sentinel_shared.schemas.events import (
+    AUDIO_ENCODING_HEADER, AUDIO_RATE_HEADER, AUDIO_CHANNELS_HEADER, AUDIO_LAYOUT_HEADER,
+    PCM_S16LE, OPUS, MIXED, DUAL, LAYOUT_SPEAKERS
+)
+from sentinel_shared.utils.audio import iter_opus_packets
+
+from src.core.config import settings
+from src.core.resampler import StreamingResampler
+
+try:
+    import opuslib
+except Exception:  # libopus not installed: PCM sessions still work
+    opuslib = None
+
+logger = logging.getLogger("speech.codecs")
+
+# Longest Opus packet is 120 ms
+_MAX_PACKET_SECONDS = 0.12
+
+# (encoding, sample rate, channels, layout) of a stream's frames
+AudioFormat = Tuple[str, int, int, str]
+DEFAULT_FORMAT: AudioFormat = (PCM_S16LE, 16000, 1, MIXED)
+
+
+def format_from_headers(headers: Optional[Mapping[str, str]]) -> AudioFormat:
+    """Per-message hot path: plain dict lookups, no model validation."""
+    if not headers or AUDIO_ENCODING_HEADER not in headers:
+        return DEFAULT_FORMAT
+    return (
+        headers[AUDIO_ENCODING_HEADER],
+        int(headers.get(AUDIO_RATE_HEADER, 16000)),
+        int(headers.get(AUDIO_CHANNELS_HEADER, 1)),
+        headers.get(AUDIO_LAYOUT_HEADER, MIXED),
+    )
+
+
+def encode_format(fmt: AudioFormat) -> bytes:
+    return ";".join(map(str, fmt)).encode()
+
+
+def decode_format(data: bytes) -> AudioFormat:
+    encoding, rate, channels, layout = data.decode().split(";")
+    return encoding, int(rate), int(channels), layout
+
+
+class OpusStreamDecoder:
+    """
+    Per-session Opus decoder (libopus keeps inter-packet state).
+
+    libopus resamples and downmixes internally, so whatever rate and channel
+    count the client encoded at, it decodes straight to the pipeline's
+    16kHz mono int16 with no separate resampling pass.
+    """
+
+    def __init__(self, sample_rate: int = settings.SAMPLE_RATE, channels: int = 1):
+        if opuslib is None:
+            raise RuntimeError("Opus audio received but libopus is not installed")
+        self.decoder = opuslib.Decoder(sample_rate, channels)
+        self.max_frame = int(sample_rate * _MAX_PACKET_SECONDS)
+
+    def decode(self, frame: bytes) -> np.ndarray:
+        """Decodes every packet of one audio frame into a single int16 array."""
+        pcm = []
+        for packet in iter_opus_packets(frame):
+            try:
+                pcm.append(self.decoder.decode(bytes(packet), self.max_frame))
+            except opuslib.OpusError as e:
+                # Corrupt packet: skip it, the decoder state recovers
+                logger.warning(f"Opus packet dropped: {e}")
+        return np.frombuffer(b"".join(pcm), dtype=np.int16)
+
+
+class AudioInput:
+    """
+    Converts one stream's frames to 16kHz mono int16, one array per
+    speaker in `speakers`: a dual-layout stereo stream is split into its
+    two channels, anything else is downmixed to a single channel.
+    """
+
+    def __init__(self, fmt: AudioFormat):
+        encoding, rate, channels, layout = fmt
+        self.format = fmt
+        split = layout == DUAL and channels == 2
+        if split:
+            self.speakers = LAYOUT_SPEAKERS[DUAL]
+        elif layout == DUAL:
+            self.speakers = (MIXED,)  # Not two channels: nothing to split
+        else:
+            self.speakers = LAYOUT_SPEAKERS.get(layout, (MIXED,))
+        outputs = len(self.speakers)
+
+        self.decoder = None
+        self.resamplers: List[StreamingResampler] = []
+        if encoding == OPUS:
+            # libopus decodes straight to 16kHz, interleaved if split
+            self.decoder = OpusStreamDecoder(channels=outputs)
+        elif split:
+            self.resamplers = [StreamingResampler(rate, settings.SAMPLE_RATE, 1) for _ in range(outputs)]
+        else:
+            self.resamplers = [StreamingResampler(rate, settings.SAMPLE_RATE, channels)]
+
+    def convert(self, data: bytes) -> List[np.ndarray]:
+        outputs = len(self.speakers)
+        if self.decoder is not None:
+            pcm = self.decoder.decode(data)
+            return [pcm] if outputs == 1 else [pcm[i::outputs] for i in range(outputs)]
+
+        pcm = np.frombuffer(data, dtype=np.int16)
+        if outputs == 1:
+            return [self.resamplers[0].process(pcm)]
+        # Strided views: each channel is resampled without a deinterleave copy
+        return [r.process(pcm[i::outputs]) for i, r in enumerate(self.resamplers)]
+
@@ -1,4 +1,5 @@
 # sentinel_speech/src/core/config.py
+from typing import List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,12 +10,106 @@ class Settings(BaseSettings):
     DEVICE: str = "cpu"  # Change to "cuda" if GPU is available
     COMPUTE_TYPE: str = "int8" # "float16" for GPU
 
+    # Process Model
+    SPEECH_WORKERS: int = 1  # Shard processes per pod; 0 = one per CPU of the container's quota
+    SHM_RING_BYTES: int = 8 * 1024 * 1024  # Supervisor -> shard audio ring (~4 min of 16kHz audio)
+
+    # Observability
+    METRICS_PORT: int = 9100  # /metrics (0 = off); shard N of a supervisor uses METRICS_PORT + 1 + N
+    TRACE_SAMPLE_RATE: float = 0.01  # Fraction of sessions whose utterances carry a trace ID
+
+    # Message Bus
+    NATS_URL: str = "nats://localhost:4222"
+    NATS_PENDING_MSGS: int = 20000  # Audio chunks buffered per subscription before NATS drops
+    NATS_PENDING_BYTES: int = 64 * 1024 * 1024
+
+    # Redis (transcripts, playbook rules)
+    REDIS_URL: str = "redis://localhost:6379"
+    REDIS_MAX_CONNECTIONS: int = 32
+    TRANSCRIPT_FLUSH_MS: float = 5.0  # Segments from all sessions are written together
+    TRANSCRIPT_MAX_BATCH: int = 256  # Flush early once this many segments are queued
+    TRANSCRIPT_TTL: int = 86400  # Seconds a session's transcript stream is kept
+    TRANSCRIPT_MAX_SEGMENTS: int = 10000  # Approximate MAXLEN per stream
+
+    # Triton Inference Server (gRPC)
+    TRITON_URL: str = "localhost:8001"
+    TRITON_MODEL_NAME: str = "whisper"
+    TRITON_TIMEOUT: float = 5.0  # Per-request deadline (seconds)
+    TRITON_MAX_INFLIGHT: int = 64  # Concurrent requests on the shared channel
+    TRITON_HEALTH_INTERVAL: float = 5.0  # Seconds between liveness probes
+    TRITON_FALLBACK_MODEL: str = ""  # Smaller model used under overload (e.g. "whisper_base")
+
+    # Whisper Micro-Batching (cross-session)
+    WHISPER_MAX_BATCH: int = 8  # Must not exceed max_batch_size in config.pbtxt
+    WHISPER_MAX_WAIT_MS: float = 20.0  # Max time an utterance waits for batch-mates
+    WHISPER_BUCKET_EDGES: List[float] = [2.0, 4.0, 8.0, 15.0]  # Length buckets (seconds)
+
+    # Audio Format (after ingest)
+    SAMPLE_RATE: int = 16000
+
+    # Frame envelope (sequence numbers, capture timestamps)
+    JITTER_DEPTH: int = 8  # Frames held past a gap before it is given up as lost
+    JITTER_MAX_MS: float = 200.0  # Longest a gap is waited for
+    GAP_TOLERANCE_MS: float = 20.0  # Capture-time gaps shorter than this are clock jitter, not missing audio
+    MAX_SILENCE_FILL_MS: float = 2000.0  # Cap on silence inserted for one gap
+
     # VAD Settings
+    VAD_MODEL_PATH: str = "models/silero_vad.onnx"
     VAD_THRESHOLD: float = 0.5  # Confidence level to trigger STT
+    VAD_FRAME_SAMPLES: int = 512  # 32ms frames (Silero accepts 512/1024/1536 @ 16kHz)
+    VAD_BATCH_INTERVAL_MS: float = 5.0  # How long frames wait to join a batch
+    VAD_MAX_BATCH: int = 512  # Flush early once this many frames are queued
     
+    # Endpointing (utterance segmentation on top of VAD)
+    SPEECH_START_FRAMES: int = 2  # Consecutive speech frames to open an utterance
+    HANGOVER_DURATION: float = 0.4  # Seconds of silence that end an utterance
+    SPEECH_PAD_DURATION: float = 0.2  # Audio kept before onset / after last speech
+    MIN_UTTERANCE_DURATION: float = 0.25  # Shorter blips are discarded
+    MAX_UTTERANCE_DURATION: float = 15.0  # Force flush for long monologues
+
+    # Streaming Partials (re-decode the growing utterance, commit stable prefix)
+    STREAMING_PARTIALS: bool = True
+    PARTIAL_INTERVAL: float = 0.5  # Seconds of new audio between re-decodes
+    NLP_CONTEXT_WORDS: int = 6  # Committed words kept as matching context
+
+    # Trigger Cooldowns (per session)
+    TRIGGER_COOLDOWN: float = 10.0  # Same rule, same session
+    SESSION_TRIGGER_COOLDOWN: float = 3.0  # Any rule, same session
+    TIMER_TICK: float = 0.1  # Timer wheel resolution (seconds)
+
+    # Semantic Matching (playbook similarity on final utterances)
+    SEMANTIC_MATCHING: bool = True  # Skipped (with a warning) if the exported embedder is missing
+    SEMANTIC_THRESHOLD: float = 0.55  # Min cosine similarity to fire a trigger
+    SEMANTIC_MAX_BATCH: int = 32  # Utterances per encoder call
+    SEMANTIC_MAX_WAIT_MS: float = 10.0
+    EMBEDDER_MODEL_PATH: str = "models/minilm-l6-v2-int8.onnx"
+    EMBEDDER_TOKENIZER_PATH: str = "models/minilm-l6-v2-tokenizer.json"
+    EMBEDDER_MODEL_VERSION: str = "all-MiniLM-L6-v2-int8"
+    EMBEDDER_THREADS: int = 1  # ORT threads per encoder call (runs on the CPU pool)
+    EMBEDDING_CACHE_SIZE: int = 10000  # In-process LRU entries (~1.5KB each)
+    EMBEDDING_CACHE_TTL: float = 3600.0  # In-process entry lifetime (seconds)
+    EMBEDDING_REDIS_TTL: int = 7 * 86400  # Shared Redis tier lifetime (seconds)
+
+    # Playbook Mirror (Qdrant)
+    QDRANT_URL: str = "http://localhost:6333"
+    PLAYBOOK_COLLECTION: str = "sales_playbook"
+    PLAYBOOK_REFRESH_INTERVAL: float = 30.0  # Seconds between change checks
+    PLAYBOOK_MIRROR_MAX_POINTS: int = 50000  # Bigger collections are searched in Qdrant
+
     # Buffer Settings
-    MIN_AUDIO_DURATION: float = 1.0  # Seconds of audio before transcribing
-    MAX_AUDIO_DURATION: float = 30.0 # Force transcribe limit
+    MAX_AUDIO_DURATION: float = 30.0 # Ring capacity (must exceed MAX_UTTERANCE_DURATION)
+    BUFFER_POOL_SIZE: int = 64  # Released buffers kept for reuse (~1 MB each)
+
+    # Session Lifecycle
+    SESSION_IDLE_TIMEOUT: float = 60.0  # Evict sessions with no audio for this long
+    MAX_SESSIONS: int = 5000  # Hard cap; least recently active session is evicted
+
+    # Backpressure (transcription requests in flight)
+    MAX_INFLIGHT_UTTERANCES: int = 256  # Worker-wide, finals + partials
+    SESSION_MAX_INFLIGHT: int = 2  # Finals per session; more are held
+    OVERLOAD_POLICY: str = "coalesce"  # Held spans: "coalesce" or "drop_oldest"
+    PARTIALS_SHED_WATERMARK: float = 0.5  # Fraction of MAX_INFLIGHT above which partials stop
+    DEGRADE_WATERMARK: float = 0.75  # Fraction above which finals use TRITON_FALLBACK_MODEL
 
     class Config:
         env_file = ".env"
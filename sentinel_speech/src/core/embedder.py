@@ -0,0 +1,62 @@
+# sentinel_speech/src/core/embedder.py
+import logging
+import os
+from typing import List
+
+import numpy as np
+import onnxruntime
+from tokenizers import Tokenizer
+from src.core.config import settings
+
+logger = logging.getLogger("speech.embedder")
+
+
+def embedder_available(
+    model_path: str = settings.EMBEDDER_MODEL_PATH,
+    tokenizer_path: str = settings.EMBEDDER_TOKENIZER_PATH
+) -> bool:
+    """True if the exported model and tokenizer are on disk."""
+    return os.path.isfile(model_path) and os.path.isfile(tokenizer_path)
+
+class OnnxEmbedder:
+    """
+    all-MiniLM-L6-v2 exported to ONNX and int8-quantised
+    (see scripts/export_embedder.py). Produces the same normalised
+    384-d vectors as SentenceTransformer, which seeded the playbook in
+    Qdrant, at a fraction of the CPU cost and without torch.
+    """
+
+    def __init__(
+        self,
+        model_path: str = settings.EMBEDDER_MODEL_PATH,
+        tokenizer_path: str = settings.EMBEDDER_TOKENIZER_PATH,
+        max_length: int = 128
+    ):
+        logger.info("Loading Embedding Model (ONNX int8)...")
+        opts = onnxruntime.SessionOptions()
+        opts.intra_op_num_threads = settings.EMBEDDER_THREADS
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=opts)
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self.version = settings.EMBEDDER_MODEL_VERSION
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encodes a batch of texts. Returns float32 [batch, 384], L2-normalised."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then normalise (cosine == dot product)
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
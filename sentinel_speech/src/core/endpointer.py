@@ -0,0 +1,116 @@
+# sentinel_speech/src/core/endpointer.py
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.config import settings
+
+
+@dataclass
+class Utterance:
+    """A span of the session's sample clock that should be transcribed."""
+    start_sample: int
+    end_sample: int
+    sample_rate: int
+    forced: bool = False  # True if cut by the max-length limit, not a pause
+    arrived_at: float = 0.0  # perf_counter() when the audio that closed it arrived (tracing)
+
+    @property
+    def start_offset(self) -> float:
+        return self.start_sample / self.sample_rate
+
+    @property
+    def end_offset(self) -> float:
+        return self.end_sample / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return (self.end_sample - self.start_sample) / self.sample_rate
+
+
+class Endpointer:
+    """
+    Turns the per-frame VAD decision into utterance boundaries.
+
+    SILENCE -> SPEECH after `start_frames` consecutive speech frames.
+    SPEECH -> SILENCE once silence has lasted `hangover` seconds; the
+    utterance is emitted right then, so we flush as soon as the speaker
+    pauses instead of on a fixed clock. Long monologues are force-flushed
+    every `max_duration` seconds.
+
+    Positions are absolute sample indices (AudioBuffer.total_samples).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = settings.SAMPLE_RATE,
+        start_frames: int = settings.SPEECH_START_FRAMES,
+        hangover: float = settings.HANGOVER_DURATION,
+        pad: float = settings.SPEECH_PAD_DURATION,
+        min_duration: float = settings.MIN_UTTERANCE_DURATION,
+        max_duration: float = settings.MAX_UTTERANCE_DURATION
+    ):
+        self.sample_rate = sample_rate
+        self.start_frames = start_frames
+        self.hangover = int(hangover * sample_rate)
+        self.pad = int(pad * sample_rate)
+        self.min_samples = int(min_duration * sample_rate)
+        self.max_samples = int(max_duration * sample_rate)
+
+        self.in_speech = False
+        self.start_sample = 0
+        self._speech_run = 0
+        self._candidate_start = 0
+        self._onset = 0
+        self._last_speech = 0
+
+    def process(self, is_speech: bool, frame_end: int, frame_len: int) -> Optional[Utterance]:
+        """Feeds one VAD frame ending at `frame_end`. Returns a finished utterance, if any."""
+        if not self.in_speech:
+            if not is_speech:
+                self._speech_run = 0
+                return None
+
+            if self._speech_run == 0:
+                self._candidate_start = frame_end - frame_len
+            self._speech_run += 1
+
+            if self._speech_run >= self.start_frames:
+                # Speech start: include a little audio before the onset
+                self.in_speech = True
+                self._onset = self._candidate_start
+                self.start_sample = max(0, self._onset - self.pad)
+                self._last_speech = frame_end
+            return None
+
+        if is_speech:
+            self._last_speech = frame_end
+            if frame_end - self.start_sample >= self.max_samples:
+                # Force flush: keep listening, next utterance starts here
+                utterance = Utterance(self.start_sample, frame_end, self.sample_rate, forced=True)
+                self.start_sample = self._onset = frame_end
+                return utterance
+            return None
+
+        # Silence inside speech: wait out the hangover before closing
+        if frame_end - self._last_speech < self.hangover:
+            return None
+
+        return self.flush(frame_end)
+
+    def flush(self, position: int) -> Optional[Utterance]:
+        """Closes the current utterance (end of pause or end of session)."""
+        if not self.in_speech:
+            return None
+
+        end = min(position, self._last_speech + self.pad)
+        start = self.start_sample
+        self.reset()
+
+        # Too short to be words (clicks, coughs)
+        if self._last_speech - self._onset < self.min_samples:
+            return None
+        return Utterance(start, end, self.sample_rate)
+
+    def reset(self):
+        self.in_speech = False
+        self._speech_run = 0
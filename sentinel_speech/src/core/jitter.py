@@ -0,0 +1,94 @@
+# sentinel_speech/src/core/jitter.py
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core import metrics
+
+
+class JitterBuffer:
+    """
+    Puts one stream's frames back in sequence order.
+
+    In-order frames pass straight through. A frame from the future is held
+    until the gap before it fills, or until JITTER_DEPTH frames are held or
+    the oldest has waited JITTER_MAX_MS; then the missing frames are given
+    up as lost and playout skips ahead. Duplicates and frames that arrive
+    after their slot was skipped are dropped.
+
+    Released frames come back as (item, lost) pairs, `lost` being the number
+    of frames missing right before the item, so the caller can fill silence.
+    An item may stand for `count` consecutive frames (merged by the Gateway).
+    A merged item that straddles audio already played (a client replaying
+    unacked frames after a resume) is released with a negative `lost`: the
+    number of its leading frames the caller must skip.
+    """
+
+    def __init__(self, depth: int = settings.JITTER_DEPTH, max_wait_ms: float = settings.JITTER_MAX_MS):
+        self.depth = depth
+        self.max_wait = max_wait_ms / 1000.0
+        self.next_seq: Optional[int] = None
+        self.held: Dict[int, Tuple[Any, int]] = {}  # seq -> (item, count)
+        self.held_since = 0.0  # monotonic() when the current gap opened
+
+    def __len__(self):
+        return len(self.held)
+
+    def push(self, seq: int, item: Any, now: float = None, count: int = 1) -> List[Tuple[Any, int]]:
+        now = time.monotonic() if now is None else now
+        if self.next_seq is None:
+            self.next_seq = seq
+        if seq + count <= self.next_seq or seq in self.held:
+            metrics.AUDIO_FRAME_EVENTS.labels(event="duplicate" if seq in self.held else "late").inc()
+            return []
+
+        if seq <= self.next_seq:
+            released = [(item, seq - self.next_seq)]
+            self.next_seq = seq + count
+            if self.held:
+                released += self._drain()
+            return released
+
+        # Ahead of a gap: wait for the missing frames
+        if not self.held:
+            self.held_since = now
+        self.held[seq] = (item, count)
+        metrics.AUDIO_FRAME_EVENTS.labels(event="reordered").inc()
+        if len(self.held) > self.depth:
+            return self._skip(now)
+        return []
+
+    def expire(self, now: float = None) -> List[Tuple[Any, int]]:
+        """Gives up on a gap that has been open longer than JITTER_MAX_MS."""
+        now = time.monotonic() if now is None else now
+        if not self.held or now - self.held_since < self.max_wait:
+            return []
+        return self._skip(now)
+
+    def _skip(self, now: float) -> List[Tuple[Any, int]]:
+        seq = min(self.held)
+        lost = max(0, seq - self.next_seq)
+        metrics.AUDIO_FRAME_EVENTS.labels(event="lost").inc(lost)
+        item, count = self.held.pop(seq)
+        self.next_seq = seq + count
+        released = [(item, lost)] + self._drain()
+        if self.held:
+            # A later gap starts waiting from now
+            self.held_since = now
+        return released
+
+    def _drain(self) -> List[Tuple[Any, int]]:
+        # Held entries may overlap what a merged frame just covered: those
+        # wholly covered are dropped, a partial one releases its remainder
+        released = []
+        while self.held:
+            seq = min(self.held)
+            if seq > self.next_seq:
+                break
+            item, count = self.held.pop(seq)
+            if seq + count <= self.next_seq:
+                metrics.AUDIO_FRAME_EVENTS.labels(event="duplicate").inc()
+                continue
+            released.append((item, seq - self.next_seq))
+            self.next_seq = seq + count
+        return released
@@ -0,0 +1,99 @@
+# sentinel_speech/src/core/keyword_matcher.py
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class KeywordMatch:
+    rule_index: int
+    keyword: str
+    start: int
+    end: int
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over every keyword of every rule.
+
+    One left-to-right pass over the text finds all occurrences of all
+    keywords, so matching stays O(len(text) + matches) however many rules a
+    tenant has. Matching is case-insensitive and respects word boundaries
+    (same semantics as the old per-rule r"\\b(...)\\b" regexes).
+    """
+
+    def __init__(self, rules: List[Dict]):
+        # Trie: goto[state][char] -> state; out[state] -> [(rule_index, keyword)]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for rule_index, rule in enumerate(rules):
+            for keyword in rule.get("keywords", []):
+                self._add(keyword.lower(), rule_index)
+        self._build()
+
+    def _add(self, keyword: str, rule_index: int):
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((rule_index, keyword))
+
+    def _build(self):
+        # BFS to compute failure links; outputs are merged along them so
+        # the search loop never has to walk the fail chain for matches.
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Returns every whole-word keyword occurrence, ordered by end position."""
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(text)
+        matches = []
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            if not out[state]:
+                continue
+            # Word boundary after the keyword
+            if i + 1 < n and _is_word_char(text[i + 1]):
+                continue
+            for rule_index, keyword in out[state]:
+                start = i + 1 - len(keyword)
+                # Word boundary before the keyword
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                matches.append(KeywordMatch(rule_index, keyword, start, i + 1))
+
+        return matches
+
+    def __bool__(self):
+        return len(self._goto) > 1
@@ -0,0 +1,53 @@
+# sentinel_speech/src/core/metrics.py
+# Prometheus metrics for the speech worker (module-level singletons).
+from prometheus_client import Counter, Gauge, Histogram
+
+RESIDENT_SESSIONS = Gauge(
+    'speech_resident_sessions', 'Sessions currently held in worker memory'
+)
+BUFFER_BYTES = Gauge(
+    'speech_buffer_bytes', 'Bytes of audio ring buffers held by resident sessions'
+)
+SESSIONS_EVICTED = Counter(
+    'speech_sessions_evicted_total', 'Sessions released from memory', ['reason']
+)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    'speech_embedding_cache_lookups_total', 'Embedding cache lookups', ['tier', 'result']
+)
+INFLIGHT_UTTERANCES = Gauge(
+    'speech_inflight_utterances', 'Transcription requests (finals and partials) in flight'
+)
+WAITING_SESSIONS = Gauge(
+    'speech_waiting_sessions', 'Sessions holding an utterance until a slot frees'
+)
+VAD_QUEUE_DEPTH = Gauge(
+    'speech_vad_queue_frames', 'Frames queued for the next VAD batch'
+)
+NATS_PENDING_MSGS = Gauge(
+    'speech_nats_pending_messages', 'Audio chunks received but not yet handled'
+)
+UTTERANCES_SHED = Counter(
+    'speech_utterances_shed_total', 'Work shed under overload', ['reason']
+)
+AUDIO_CHUNKS_DROPPED = Counter(
+    'speech_audio_slow_consumer_total', 'Slow-consumer events (NATS dropped audio)'
+)
+SHARD_RING_DROPPED = Counter(
+    'speech_shard_ring_dropped_total', 'Audio chunks dropped because a shard ring was full'
+)
+AUDIO_FRAME_EVENTS = Counter(
+    'speech_audio_frame_events_total', 'Out-of-order audio frames by outcome', ['event']  # reordered/lost/late/duplicate
+)
+SILENCE_FILLED_SECONDS = Counter(
+    'speech_silence_filled_seconds_total', 'Silence inserted for missing or suppressed audio'
+)
+
+# Pipeline stages (see src/core/tracing.py). Sampled sessions attach their
+# trace ID as an exemplar (visible via the OpenMetrics exposition format).
+STAGE_SECONDS = Histogram(
+    'speech_stage_seconds', 'Time spent in each pipeline stage', ['stage'],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+)
+TRIGGERS_PUBLISHED = Counter(
+    'speech_triggers_published_total', 'Overlay triggers published', ['source']
+)
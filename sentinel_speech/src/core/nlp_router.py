@@ -1,74 +1,129 @@
 # Keyword/Regex Matching Logic# sentinel_speech/src/core/nlp_router.py
-import re
-import time
-from typing import List, Optional, Dict
-from functools import lru_cache
+from typing import List, Optional, Dict, Set, Tuple
+
+from src.core.config import settings
+from src.core.keyword_matcher import KeywordMatcher, KeywordMatch
+from src.core.timer_wheel import TimerWheel
+
+DEFAULT_TENANT = "default"
+GLOBAL_SESSION = "*"
+ANY_RULE = "*"
+
+# Built-in playbook, used for tenants without a rule set in Redis
+DEFAULT_RULES = [
+    {
+        "keywords": ["budget", "price", "expensive", "cost"],
+        "trigger": {
+            "title": "Pricing Objection",
+            "message": "Focus on Value (ROI), not cost.",
+            "color_hex": "#FFA500" # Orange
+        }
+    },
+    {
+        "keywords": ["competitor", "other solution", "using jira"],
+        "trigger": {
+            "title": "Competitor Detected",
+            "message": "We offer 24/7 support, they don't.",
+            "color_hex": "#FF0000" # Red
+        }
+    },
+    {
+        "keywords": ["timeline", "start date", "implementation"],
+        "trigger": {
+            "title": "Closing Signal",
+            "message": "Propose a start date next week.",
+            "color_hex": "#00FF00" # Green
+        }
+    }
+]
+
+class RuleSet:
+    """An immutable, compiled set of rules. Swapped as a whole on reload."""
+
+    def __init__(self, rules: List[Dict], version: str = "builtin"):
+        self.rules = rules
+        self.version = version
+        # OPTIMIZATION: All keywords of all rules in ONE automaton
+        self.matcher = KeywordMatcher(rules)
 
 class NLPRouter:
-    def __init__(self, use_vector: bool = True):
-        # In a real app, load this from Database/Redis
-        self.rules = [
-            {
-                "keywords": ["budget", "price", "expensive", "cost"],
-                "trigger": {
-                    "title": "Pricing Objection",
-                    "message": "Focus on Value (ROI), not cost.",
-                    "color_hex": "#FFA500" # Orange
-                }
-            },
-            {
-                "keywords": ["competitor", "other solution", "using jira"],
-                "trigger": {
-                    "title": "Competitor Detected",
-                    "message": "We offer 24/7 support, they don't.",
-                    "color_hex": "#FF0000" # Red
-                }
-            },
-            {
-                "keywords": ["timeline", "start date", "implementation"],
-                "trigger": {
-                    "title": "Closing Signal",
-                    "message": "Propose a start date next week.",
-                    "color_hex": "#00FF00" # Green
-                }
-            }
-        ]
-        for rule in self.rules:
-            # Create a regex like: \b(budget|cost|price)\b
-            pattern_str = r"\b(" + "|".join([re.escape(k) for k in rule["keywords"]]) + r")\b"
-            rule["_compiled"] = re.compile(pattern_str, re.IGNORECASE)
-        self.cooldowns = {} 
-        self.COOLDOWN_SECONDS = 10
-        if self.use_vector:
-            # OPTIMIZATION: prefer_grpc=True uses Port 6334
-            self.qdrant = QdrantClient(
-                url="http://localhost:6333", 
-                prefer_grpc=True 
-            )
-            
-    # OPTIMIZATION: Cache the last 1000 phrases. 
-    # This prevents running the model for repeated short commands.
-    @lru_cache(maxsize=1000)
-    def _get_embedding(self, text: str):
-        # SentenceTransformer isn't thread-safe, ensure single thread access if needed
-        # or just rely on the GIL for simple calls.
-        return self.embedder.encode(text).tolist()
+    def __init__(self, wheel: TimerWheel = None):
+        # Tenant -> RuleSet. Replaced atomically by the RuleStore on hot reload.
+        self.rulesets: Dict[str, RuleSet] = {DEFAULT_TENANT: RuleSet(DEFAULT_RULES)}
+        # Active cooldowns: (session_id, rule title) and (session_id, ANY_RULE).
+        # Entries remove themselves when their wheel timer fires, so the set
+        # only ever holds cooldowns that are currently running.
+        self.wheel = wheel or TimerWheel()
+        self.cooldowns: Set[Tuple[str, str]] = set()
+        self.COOLDOWN_SECONDS = settings.TRIGGER_COOLDOWN
+        self.SESSION_COOLDOWN_SECONDS = settings.SESSION_TRIGGER_COOLDOWN
     
-    def process(self, text: str) -> Optional[Dict]:
-        current_time = time.time()
+    @property
+    def rules(self) -> List[Dict]:
+        return self.rulesets[DEFAULT_TENANT].rules
+
+    def set_rules(self, tenant: str, rules: List[Dict], version: str = "builtin"):
+        # Compile first, then swap the reference: in-flight calls keep the old set
+        self.rulesets[tenant] = RuleSet(rules, version)
+
+    def remove_rules(self, tenant: str):
+        if tenant != DEFAULT_TENANT:
+            self.rulesets.pop(tenant, None)
+
+    def match(self, text: str, tenant: str = DEFAULT_TENANT) -> List[KeywordMatch]:
+        """Every keyword hit of every rule, in one pass over the text."""
+        ruleset = self.rulesets.get(tenant) or self.rulesets[DEFAULT_TENANT]
+        return ruleset.matcher.find_all(text)
+
+    def _start_cooldown(self, key: Tuple[str, str], seconds: float):
+        if seconds <= 0 or key in self.cooldowns:
+            return
+        self.cooldowns.add(key)
+        self.wheel.schedule(seconds, lambda: self.cooldowns.discard(key))
+
+    def accept(self, trigger: Dict, session_id: str = GLOBAL_SESSION) -> bool:
+        """
+        Cooldown gate shared by keyword and semantic matches. Returns True
+        (and starts the cooldowns) if the trigger may be shown now.
+        """
+        self.wheel.advance()
+        key = (session_id, trigger["title"])
+        if (session_id, ANY_RULE) in self.cooldowns or key in self.cooldowns:
+            return False
+        self._start_cooldown(key, self.COOLDOWN_SECONDS)
+        self._start_cooldown((session_id, ANY_RULE), self.SESSION_COOLDOWN_SECONDS)
+        return True
+
+    def process(self, text: str, session_id: str = GLOBAL_SESSION, tenant: str = DEFAULT_TENANT,
+                min_end: int = 0) -> Optional[Dict]:
+        """
+        Returns the trigger of the earliest matching rule that is not cooling
+        down for this session. Matches ending at or before `min_end`
+        (already-seen context) are ignored.
+        """
+        # Expire due cooldowns (O(1) when no tick has passed)
+        self.wheel.advance()
+
+        # One hint at a time per call: don't flood the rep's overlay
+        if (session_id, ANY_RULE) in self.cooldowns:
+            return None
+
+        ruleset = self.rulesets.get(tenant) or self.rulesets[DEFAULT_TENANT]
         
-        for rule in self.rules:
-            if rule["_compiled"].search(text):
-                trigger_name = rule["trigger"]["title"]
-                
-                # OPTIMIZATION: Cooldown Check
-                last_time = self.cooldowns.get(trigger_name, 0)
-                if current_time - last_time < self.COOLDOWN_SECONDS:
-                    # Too soon, ignore this trigger
-                    continue
-                
-                # Update timestamp and return
-                self.cooldowns[trigger_name] = current_time
-                return rule["trigger"]
+        for match in ruleset.matcher.find_all(text):
+            if match.end <= min_end:
+                continue
+
+            trigger = ruleset.rules[match.rule_index]["trigger"]
+            key = (session_id, trigger["title"])
+            
+            # OPTIMIZATION: Cooldown Check, scoped to this session + rule
+            if key in self.cooldowns:
+                # Too soon, ignore this trigger
+                continue
+            
+            self._start_cooldown(key, self.COOLDOWN_SECONDS)
+            self._start_cooldown((session_id, ANY_RULE), self.SESSION_COOLDOWN_SECONDS)
+            return trigger
                 
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,51 @@
+# sentinel_speech/src/core/partials.py
+import re
+from typing import List
+
+_NORMALIZE = re.compile(r"[^\w']+")
+
+
+def _norm(word: str) -> str:
+    return _NORMALIZE.sub("", word.lower())
+
+
+class LocalAgreement:
+    """
+    Prefix stabilisation for streaming re-decodes (LocalAgreement-2).
+
+    The growing window of the current utterance is re-transcribed at a
+    fixed cadence. A word is committed once two consecutive hypotheses
+    agree on it (and on everything before it); committed words are never
+    revised, so downstream consumers can act on them immediately.
+    """
+
+    def __init__(self):
+        self.committed: List[str] = []
+        self._previous: List[str] = []
+
+    def update(self, hypothesis: str) -> List[str]:
+        """Feeds a new hypothesis for the whole utterance. Returns newly committed words."""
+        words = hypothesis.split()
+        agreed = 0
+        for a, b in zip(self._previous, words):
+            if _norm(a) != _norm(b):
+                break
+            agreed += 1
+        self._previous = words
+
+        if agreed <= len(self.committed):
+            return []
+        new_words = words[len(self.committed):agreed]
+        self.committed.extend(new_words)
+        return new_words
+
+    def finalize(self, final_text: str) -> List[str]:
+        """Closes the utterance with its final transcript. Returns the uncommitted remainder."""
+        words = final_text.split()
+        remainder = words[len(self.committed):]
+        self.reset()
+        return remainder
+
+    def reset(self):
+        self.committed = []
+        self._previous = []
@@ -0,0 +1,91 @@
+# sentinel_speech/src/core/resampler.py
+import math
+from functools import lru_cache
+
+import numpy as np
+from src.core.config import settings
+
+
+@lru_cache(maxsize=32)
+def polyphase_filter(up: int, down: int, taps: int) -> np.ndarray:
+    """
+    Kaiser-windowed sinc low-pass for resampling by up/down, split into
+    `up` phases of `taps` coefficients: bank[phase, k]. Cached per ratio,
+    so all sessions at the same rate share one read-only bank.
+    """
+    n = up * taps
+    # Cut off just below the lower of the two Nyquist frequencies
+    cutoff = 0.45 / max(up, down)  # Cycles per sample at the upsampled rate
+    j = np.arange(n) - (n - 1) / 2.0
+    h = 2 * cutoff * np.sinc(2 * cutoff * j) * np.kaiser(n, 8.0) * up
+    # bank[p, k] = h[p + (taps - 1 - k) * up], so that
+    # y[n] = sum_k bank[phase, k] * x[base + k]
+    bank = np.ascontiguousarray(h.reshape(taps, up)[::-1].T, dtype=np.float32)
+    bank.setflags(write=False)
+    return bank
+
+
+class StreamingResampler:
+    """
+    Per-session downmix + rational polyphase resampler (e.g. 44.1kHz or
+    48kHz stereo -> 16kHz mono).
+
+    Each chunk is processed with one vectorised gather + multiply-add over
+    all output samples, with no per-sample Python loop. The last taps-1
+    input samples and the fractional phase carry over between chunks, so
+    consecutive chunks resample exactly like one long signal.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = settings.SAMPLE_RATE, channels: int = 1,
+                 taps: int = 16):
+        g = math.gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        self.channels = channels
+        # Wider filter when decimating, to keep the same transition band
+        self.taps = int(taps * max(1.0, self.down / self.up))
+        self.bank = polyphase_filter(self.up, self.down, self.taps)
+        self._offsets = np.arange(self.taps)
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._pos = 0  # Next output position, in 1/up input samples from the start of history
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down == 1 and self.channels == 1
+
+    def process(self, pcm: np.ndarray) -> np.ndarray:
+        """Interleaved int16 in, mono int16 at `out_rate` out."""
+        if self.passthrough:
+            return pcm
+
+        # Downmix first: everything after runs on 1/channels of the data
+        if self.channels > 1:
+            usable = len(pcm) - len(pcm) % self.channels
+            x = pcm[:usable].reshape(-1, self.channels).astype(np.float32).mean(axis=1)
+        else:
+            x = pcm.astype(np.float32)
+
+        if self.up == self.down:
+            return np.clip(x, -32768, 32767).astype(np.int16)
+
+        buf = np.concatenate((self._history, x))
+        # Outputs whose window [base, base + taps) is fully available
+        last = (len(buf) - self.taps) * self.up
+        n_out = 0 if last < self._pos else (last - self._pos) // self.down + 1
+        positions = self._pos + self.down * np.arange(n_out)
+        bases, phases = np.divmod(positions, self.up)
+
+        windows = buf[bases[:, None] + self._offsets]
+        y = np.einsum("ij,ij->i", windows, self.bank[phases])
+
+        # Keep what the next chunk still needs
+        self._pos += self.down * n_out
+        drop = min(self._pos // self.up, len(buf) - (self.taps - 1))
+        self._history = buf[drop:]
+        self._pos -= drop * self.up
+
+        return np.clip(y, -32768, 32767).astype(np.int16)
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._pos = 0
+
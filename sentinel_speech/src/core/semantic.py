@@ -0,0 +1,147 @@
+# sentinel_speech/src/core/semantic.py
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from src.core.config import settings
+from src.core.tracing import observe
+
+logger = logging.getLogger("speech.semantic")
+
+# Playbook payload field naming the org an entry belongs to; entries
+# without it are shared by every org
+PLAYBOOK_ORG_FIELD = "org_id"
+
+
+class PlaybookIndex:
+    """
+    Flat in-memory index of playbook vectors.
+    For playbooks of a few thousand entries an exact matrix product is
+    faster than any ANN structure and needs no tuning. Each query only
+    scores its tenant's entries and the shared ones.
+    """
+
+    def __init__(self, vectors: np.ndarray, payloads: List[Dict], fingerprint: str = ""):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.maximum(norms, 1e-12)
+        self.payloads = payloads
+        self.fingerprint = fingerprint
+        # Entry masks per org, built once per refresh: {org: shared | owned}
+        owners = np.array([p.get(PLAYBOOK_ORG_FIELD) or "" for p in payloads], dtype=object)
+        self.shared = owners == ""
+        self.allowed = {org: self.shared | (owners == org) for org in set(owners) - {""}}
+
+    def search(self, queries: np.ndarray, tenants: Optional[List[str]] = None) -> List[Optional[Tuple[float, Dict]]]:
+        """Best (cosine score, payload) per query row among its tenant's entries (None: shared only)."""
+        if len(self.payloads) == 0:
+            return [None] * len(queries)
+        scores = queries @ self.vectors.T
+        for i, tenant in enumerate(tenants or [None] * len(queries)):
+            allowed = self.allowed.get(tenant, self.shared)
+            if not allowed.all():
+                scores[i, ~allowed] = -np.inf
+        best = scores.argmax(axis=1)
+        return [
+            (float(scores[i, j]), self.payloads[j]) if np.isfinite(scores[i, j]) else None
+            for i, j in enumerate(best)
+        ]
+
+    def __len__(self):
+        return len(self.payloads)
+
+
+class SemanticMatcher:
+    """
+    Batches committed utterances from all sessions, embeds them in one
+    encoder call on the CPU pool and searches the playbook mirror.
+    Returns the trigger of the best entry above `threshold` among the
+    session's org's entries and the shared ones.
+
+    With a `cache` (see adapters/embedding_cache.py) only texts that no
+    worker has embedded recently reach the encoder.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        mirror,
+        executor,
+        threshold: float = settings.SEMANTIC_THRESHOLD,
+        max_batch: int = settings.SEMANTIC_MAX_BATCH,
+        max_wait_ms: float = settings.SEMANTIC_MAX_WAIT_MS,
+        cache=None
+    ):
+        self.embedder = embedder
+        self.cache = cache
+        self.mirror = mirror
+        self.executor = executor
+        self.threshold = threshold
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def match(self, text: str, tenant: Optional[str] = None) -> Optional[Dict]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, tenant, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            asyncio.create_task(self._run(items))
+
+    def _encode(self, texts: List[str], queued_at: float) -> np.ndarray:
+        t0 = time.perf_counter()
+        observe("executor_wait", t0 - queued_at)
+        vectors = self.embedder.encode(texts)
+        observe("embed", time.perf_counter() - t0)
+        return vectors
+
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if self.cache is None:
+            # Encoder is CPU-bound: keep it off the event loop
+            return await loop.run_in_executor(self.executor, self._encode, texts, time.perf_counter())
+
+        cached = await self.cache.get_many(texts)
+        # Encode each distinct missing text once
+        keys = [self.cache.normalize(t) for t in texts]
+        missing = {k: t for k, t, v in zip(keys, texts, cached) if v is None}
+        if missing:
+            fresh = await loop.run_in_executor(
+                self.executor, self._encode, list(missing.values()), time.perf_counter()
+            )
+            self.cache.put_many(list(missing.values()), fresh)
+            by_key = dict(zip(missing, fresh))
+            cached = [v if v is not None else by_key[k] for k, v in zip(keys, cached)]
+        return np.stack(cached)
+
+    async def _run(self, items: List[Tuple[str, str, asyncio.Future]]):
+        try:
+            vectors = await self._embed([text for text, _, _ in items])
+            hits = await self.mirror.search(vectors, [tenant for _, tenant, _ in items])
+        except Exception as e:
+            logger.error(f"Semantic batch of {len(items)} failed: {e}")
+            hits = [None] * len(items)
+
+        for (_, _, future), hit in zip(items, hits):
+            if future.done():
+                continue
+            if hit and hit[0] >= self.threshold:
+                future.set_result(hit[1].get("trigger"))
+            else:
+                future.set_result(None)
@@ -0,0 +1,169 @@
+# sentinel_speech/src/core/session.py
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.core.config import settings
+from src.core.audio_buffer import AudioBuffer, AudioBufferPool
+from src.core.vad import VADStream
+from src.core.endpointer import Endpointer
+from src.core.partials import LocalAgreement
+from src.core.nlp_router import DEFAULT_TENANT
+from src.core.timer_wheel import Timer, TimerWheel
+from src.core.tracing import is_sampled
+from src.core.codecs import AudioInput, DEFAULT_FORMAT
+from src.core.jitter import JitterBuffer
+from sentinel_shared.schemas.events import AGENT, CUSTOMER, MIXED
+from sentinel_shared.utils.ids import session_tenant
+
+
+class ChannelState:
+    """
+    One speaker's audio within a session: its own VAD context, ring
+    buffer, endpointer and streaming partials. Both channels of a session
+    share the worker's VAD and transcription batches.
+    """
+
+    def __init__(self, session_id: str, index: int, speaker: str, buffer: AudioBuffer):
+        self.key = (session_id, index)  # VAD scheduler / admission key
+        self.speaker = speaker
+        self.buffer = buffer
+        self.vad = VADStream()
+        self.endpointer = Endpointer()
+
+        # Streaming partials for the utterance currently being spoken
+        self.agreement = LocalAgreement()
+        self.utterance_seq = 0  # Bumped when an utterance closes; stale partials are dropped
+        self.partial_inflight = False
+        self.next_partial_at = 0  # Stream sample at which the next re-decode is due
+        # Recently committed words, so phrases spanning two commits still match
+        self.context_words = deque(maxlen=settings.NLP_CONTEXT_WORDS)
+
+    @property
+    def triggers(self) -> bool:
+        """Hints are for what the customer says, never for the rep's own words."""
+        return self.speaker != AGENT
+
+
+# Channel slot per speaker: a mono call and the agent's mic share slot 0
+_SLOTS = {MIXED: 0, AGENT: 0, CUSTOMER: 1}
+
+
+class SessionState:
+    """Everything the worker holds for one live call."""
+
+    def __init__(self, session_id: str, buffer: AudioBuffer):
+        self.session_id = session_id
+        # The Gateway binds session IDs to the caller's org (per-tenant rules)
+        self.tenant = session_tenant(session_id) or DEFAULT_TENANT
+        self.channels: List[ChannelState] = [ChannelState(session_id, 0, MIXED, buffer)]
+        # Ring mode: format of the session's untagged frames (see RECORD_FORMAT)
+        self.audio_format = DEFAULT_FORMAT
+        # AudioInput per stream layout: one for mixed/dual audio, or one per speaker
+        self.inputs: Dict[str, AudioInput] = {}
+        # Per envelope channel: reordering, and where the next frame's capture time should be
+        self.jitter: Dict[int, JitterBuffer] = {}
+        self.next_capture_us: Dict[int, int] = {}
+        self.last_seen = time.monotonic()
+        self.idle_timer: Optional[Timer] = None
+        self.last_arrival = 0.0  # perf_counter() of the newest chunk (tracing)
+        self.traced = is_sampled(session_id)
+
+    @property
+    def buffer(self) -> AudioBuffer:
+        return self.channels[0].buffer
+
+    def channel(self, speaker: str, pool: AudioBufferPool) -> ChannelState:
+        """The speaker's channel; the customer's is created on first use."""
+        slot = _SLOTS[speaker]
+        if slot == len(self.channels):
+            self.channels.append(ChannelState(self.session_id, slot, speaker, pool.acquire()))
+        channel = self.channels[slot]
+        channel.speaker = speaker
+        return channel
+
+
+class SessionRegistry:
+    """
+    Resident sessions in least-recently-used order.
+
+    The hard cap evicts the stalest call first. Idle timeouts run on the
+    shared TimerWheel: each session has one timer, and touch() only stamps
+    last_seen instead of rescheduling it on every frame. When the timer
+    fires it either evicts the session or re-arms for the remaining time.
+    Evicted sessions go through `on_evict` so the caller can flush state
+    before the buffer returns to the pool.
+    """
+
+    def __init__(
+        self,
+        pool: AudioBufferPool,
+        on_evict: Callable[[SessionState, str], None],
+        wheel: TimerWheel,
+        max_sessions: int = settings.MAX_SESSIONS,
+        idle_timeout: float = settings.SESSION_IDLE_TIMEOUT
+    ):
+        self.pool = pool
+        self.on_evict = on_evict
+        self.wheel = wheel
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+
+    def touch(self, session_id: str) -> SessionState:
+        """Returns the session (creating it if needed) and marks it active."""
+        state = self._sessions.get(session_id)
+        if state is None:
+            while len(self._sessions) >= self.max_sessions:
+                _, oldest = self._sessions.popitem(last=False)
+                self._evict(oldest, "capacity")
+            state = SessionState(session_id, self.pool.acquire())
+            self._sessions[session_id] = state
+            state.idle_timer = self.wheel.schedule(self.idle_timeout, lambda: self._check_idle(state))
+        else:
+            self._sessions.move_to_end(session_id)
+        state.last_seen = self.wheel.now
+        return state
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        return self._sessions.get(session_id)
+
+    def end(self, session_id: str, reason: str = "ended") -> bool:
+        state = self._sessions.pop(session_id, None)
+        if state is None:
+            return False
+        self._evict(state, reason)
+        return True
+
+    def _check_idle(self, state: SessionState):
+        if self._sessions.get(state.session_id) is not state:
+            return
+        idle_for = self.wheel.now - state.last_seen
+        if idle_for >= self.idle_timeout:
+            del self._sessions[state.session_id]
+            self._evict(state, "idle")
+        else:
+            state.idle_timer = self.wheel.schedule(
+                self.idle_timeout - idle_for, lambda: self._check_idle(state)
+            )
+
+    def _evict(self, state: SessionState, reason: str):
+        if state.idle_timer:
+            self.wheel.cancel(state.idle_timer)
+        try:
+            self.on_evict(state, reason)
+        finally:
+            for channel in state.channels:
+                self.pool.release(channel.buffer)
+
+    def buffer_bytes(self) -> int:
+        return sum(c.buffer.nbytes for s in self._sessions.values() for c in s.channels)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str):
+        return session_id in self._sessions
+
+    def __iter__(self) -> Iterator[SessionState]:
+        return iter(list(self._sessions.values()))
@@ -0,0 +1,130 @@
+# sentinel_speech/src/core/shm_ring.py
+import platform
+import struct
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+RECORD_AUDIO = 0  # A frame in the session's current format
+RECORD_END = 1
+RECORD_FORMAT = 2  # Session's audio format changed (see codecs.encode_format)
+
+# Record: payload length, kind, session id length | session id | payload (8-byte aligned)
+_HEADER = struct.Struct("<IBH")
+_WRAP = 0xFFFFFFFF  # Payload length marking "skip to the start of the ring"
+_META = 128  # head at 0, tail at 64: separate cache lines for reader and writer
+
+# Total store order, which the unfenced head/tail publication relies on
+STORES_ORDERED = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class ShmRing:
+    """
+    Single-producer / single-consumer byte ring in POSIX shared memory.
+
+    The supervisor process is the only writer and one shard process the
+    only reader. `head` and `tail` are ever-increasing byte counters; each
+    side only writes its own, so no lock is needed. A record is written in
+    full before `tail` is advanced past it.
+
+    Memory ordering: nothing here is a fence. The counters are aligned
+    8-byte stores (single instructions, so never torn), and publication
+    relies on the CPU keeping stores, and loads, in program order: true
+    on x86-64 (TSO), which is what the speech pods run on. On weakly
+    ordered CPUs (arm64) the reader could see a new `tail` before the
+    record bytes; shard mode must not be used there (see STORES_ORDERED).
+
+    put() never blocks: it returns False when the ring is full and the
+    caller decides what to shed.
+    """
+
+    def __init__(self, name: str = None, capacity: int = 0):
+        if name is None:
+            capacity = _align(capacity)
+            self.shm = shared_memory.SharedMemory(create=True, size=_META + capacity)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.capacity = self.shm.size - _META
+        self._head = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf, offset=0)
+        self._tail = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf, offset=64)
+        self._data = self.shm.buf[_META:_META + self.capacity]
+        if self.owner:
+            self._head[0] = 0
+            self._tail[0] = 0
+
+    def put(self, kind: int, session_id: str, payload: bytes = b"") -> bool:
+        sid = session_id.encode()
+        size = _align(_HEADER.size + len(sid) + len(payload))
+        cap = self.capacity
+        tail = int(self._tail[0])
+        pos = tail % cap
+        room = cap - pos
+        skip = room if size > room else 0
+        if size > cap or tail + skip + size - int(self._head[0]) > cap:
+            return False
+
+        data = self._data
+        if skip:
+            _HEADER.pack_into(data, pos, _WRAP, 0, 0)
+            pos = 0
+        _HEADER.pack_into(data, pos, len(payload), kind, len(sid))
+        start = pos + _HEADER.size
+        data[start:start + len(sid)] = sid
+        start += len(sid)
+        data[start:start + len(payload)] = payload
+
+        # Publish only after the record is complete
+        self._tail[0] = tail + skip + size
+        return True
+
+    def get(self) -> Optional[Tuple[int, str, bytes]]:
+        head = int(self._head[0])
+        if head == int(self._tail[0]):
+            return None
+
+        cap = self.capacity
+        data = self._data
+        pos = head % cap
+        length, kind, sid_len = _HEADER.unpack_from(data, pos)
+        if length == _WRAP:
+            head += cap - pos
+            pos = 0
+            length, kind, sid_len = _HEADER.unpack_from(data, pos)
+
+        start = pos + _HEADER.size
+        session_id = bytes(data[start:start + sid_len]).decode()
+        start += sid_len
+        # Copy out: the slot is reused as soon as head moves past it
+        payload = bytes(data[start:start + length])
+
+        self._head[0] = head + _align(_HEADER.size + sid_len + length)
+        return kind, session_id, payload
+
+    def drain(self, max_items: int) -> List[Tuple[int, str, bytes]]:
+        records = []
+        while len(records) < max_items:
+            record = self.get()
+            if record is None:
+                break
+            records.append(record)
+        return records
+
+    def __len__(self):
+        """Bytes currently queued."""
+        return int(self._tail[0]) - int(self._head[0])
+
+    def close(self):
+        # Views into the segment must go before it can be closed
+        self._head = self._tail = None
+        self._data.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
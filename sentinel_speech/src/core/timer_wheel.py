@@ -0,0 +1,113 @@
+# sentinel_speech/src/core/timer_wheel.py
+import logging
+import math
+import time
+from typing import Callable, List, Optional, Set
+
+logger = logging.getLogger("speech.timers")
+
+
+class Timer:
+    __slots__ = ("target", "callback", "slot")
+
+    def __init__(self, target: int, callback: Callable[[], None]):
+        self.target = target  # Absolute tick at which the timer fires
+        self.callback = callback
+        self.slot: Optional[Set["Timer"]] = None
+
+    @property
+    def active(self) -> bool:
+        return self.slot is not None
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel (Varghese & Lauck).
+
+    Level 0 has one slot per tick; each higher level has one slot per full
+    revolution of the level below. Scheduling and cancelling are O(1), and
+    each timer is touched at most once per level on its way down, so
+    thousands of per-session timers cost almost nothing to keep.
+
+    The wheel is passive: call advance(now) from a periodic task (and/or
+    before reading state that depends on expiries).
+    """
+
+    def __init__(self, tick: float = 0.1, slots: tuple = (256, 64, 64), now: float = None):
+        self.tick = tick
+        self.start = time.monotonic() if now is None else now
+        self.now = self.start
+        self._tick = 0
+        self._slots = slots
+        # Ticks covered by one slot at each level: 1, 256, 256*64, ...
+        self._units = [1]
+        for n in slots[:-1]:
+            self._units.append(self._units[-1] * n)
+        self._levels: List[List[Set[Timer]]] = [[set() for _ in range(n)] for n in slots]
+        self._count = 0
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """Runs `callback` once, `delay` seconds after the wheel's current time."""
+        ticks = max(1, math.ceil((self.now + delay - self.start) / self.tick) - self._tick)
+        timer = Timer(self._tick + ticks, callback)
+        self._insert(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer: Timer):
+        if timer.slot is not None:
+            timer.slot.discard(timer)
+            timer.slot = None
+            self._count -= 1
+
+    def _insert(self, timer: Timer):
+        diff = timer.target - self._tick
+        last = len(self._slots) - 1
+        level = 0
+        while level < last and diff >= self._units[level] * self._slots[level]:
+            level += 1
+        # Beyond the top level's range: park it in the furthest top slot,
+        # it is re-cascaded (and re-placed) when that slot comes round.
+        target = min(timer.target, self._tick + self._units[last] * self._slots[last] - 1)
+        idx = (target // self._units[level]) % self._slots[level]
+        timer.slot = self._levels[level][idx]
+        timer.slot.add(timer)
+
+    def advance(self, now: float = None) -> int:
+        """Fires every timer due by `now`. Returns how many fired."""
+        self.now = time.monotonic() if now is None else now
+        target_tick = int((self.now - self.start) / self.tick)
+        fired = 0
+
+        while self._tick < target_tick:
+            self._tick += 1
+
+            # Cascade higher levels whose slot boundary we just crossed
+            for level in range(len(self._slots) - 1, 0, -1):
+                if self._tick % self._units[level] == 0:
+                    idx = (self._tick // self._units[level]) % self._slots[level]
+                    slot = self._levels[level][idx]
+                    if slot:
+                        timers = list(slot)
+                        slot.clear()
+                        for timer in timers:
+                            self._insert(timer)
+
+            slot = self._levels[0][self._tick % self._slots[0]]
+            if not slot:
+                continue
+            due = [t for t in slot if t.target <= self._tick]
+            for timer in due:
+                slot.discard(timer)
+                timer.slot = None
+                self._count -= 1
+                fired += 1
+                try:
+                    timer.callback()
+                except Exception as e:
+                    logger.error(f"Timer callback failed: {e}")
+
+        return fired
+
+    def __len__(self):
+        return self._count
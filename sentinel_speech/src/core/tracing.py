@@ -0,0 +1,61 @@
+# sentinel_speech/src/core/tracing.py
+import logging
+import time
+import uuid
+import zlib
+from typing import Callable, List
+
+from src.core.config import settings
+from src.core.metrics import STAGE_SECONDS
+
+logger = logging.getLogger("speech.trace")
+
+# Called as fn(trace, seconds) for every finished trace, sampled or not
+# (e.g. by the replay benchmark to collect exact end-to-end latencies)
+_listeners: List[Callable[["Trace", float], None]] = []
+
+def add_listener(fn: Callable[["Trace", float], None]):
+    _listeners.append(fn)
+
+def remove_listener(fn: Callable[["Trace", float], None]):
+    _listeners.remove(fn)
+
+def is_sampled(session_id: str, rate: float = settings.TRACE_SAMPLE_RATE) -> bool:
+    """Whole sessions are sampled, so a trace covers every utterance of a call."""
+    return zlib.crc32(session_id.encode()) % 10000 < rate * 10000
+
+def observe(stage: str, seconds: float, trace: "Trace" = None):
+    if trace is not None and trace.sampled:
+        STAGE_SECONDS.labels(stage=stage).observe(seconds, exemplar={"trace_id": trace.trace_id})
+    else:
+        STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+class Trace:
+    """
+    Timing context for one utterance (or partial) from audio arrival to
+    trigger. `start` is the perf_counter() at which the audio that closed
+    it arrived. Sampled traces get an ID and log their stage breakdown.
+    """
+    __slots__ = ("session_id", "start", "sampled", "trace_id", "stages")
+
+    def __init__(self, session_id: str, start: float, sampled: bool):
+        self.session_id = session_id
+        self.start = start
+        self.sampled = sampled
+        self.trace_id = uuid.uuid4().hex[:16] if sampled else ""
+        self.stages = []
+
+    def observe(self, stage: str, seconds: float):
+        observe(stage, seconds, self)
+        if self.sampled:
+            self.stages.append((stage, seconds))
+
+    def finish(self, stage: str = "audio_to_trigger"):
+        """Records the end-to-end time since the audio arrived."""
+        seconds = time.perf_counter() - self.start
+        self.observe(stage, seconds)
+        for fn in _listeners:
+            fn(self, seconds)
+        if self.sampled:
+            breakdown = " ".join(f"{name}={secs * 1000:.1f}ms" for name, secs in self.stages)
+            logger.info(f"[{self.session_id}] trace={self.trace_id} {breakdown}")
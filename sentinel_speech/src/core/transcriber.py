@@ -1,56 +1,160 @@
+import asyncio
+import logging
+from typing import List, Optional
+
 import numpy as np
 import tritonclient.grpc as grpcclient
+import tritonclient.grpc.aio as aio_grpcclient
+from tritonclient.utils import InferenceServerException
 from src.core.config import settings
-import logging
 
 logger = logging.getLogger("speech.transcriber")
 
 class Transcriber:
-    def __init__(self):
-        # Configuration for Triton
+    """
+    Async Triton client.
+    OPTIMIZATION: One grpc.aio channel is shared by every session, so
+    in-flight requests are bounded by TRITON_MAX_INFLIGHT instead of by the
+    size of a thread pool.
+    """
+
+    def __init__(
+        self,
+        url: str = settings.TRITON_URL,
+        model_name: str = settings.TRITON_MODEL_NAME,
+        max_inflight: int = settings.TRITON_MAX_INFLIGHT
+    ):
         # In K8s, this URL will be the Service DNS: "sentinel-triton:8001"
-        self.triton_url = settings.TRITON_URL if hasattr(settings, 'TRITON_URL') else "localhost:8001"
-        
+        self.triton_url = url
+        self.model_name = model_name
+        self.client: Optional[aio_grpcclient.InferenceServerClient] = None
+        self.healthy = False
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._reconnect_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    def _new_client(self):
+        return aio_grpcclient.InferenceServerClient(
+            url=self.triton_url,
+            keepalive_options=grpcclient.KeepAliveOptions(
+                keepalive_time_ms=10000,
+                keepalive_timeout_ms=5000,
+                keepalive_permit_without_calls=True
+            )
+        )
+
+    async def connect(self):
         logger.info(f"Connecting to Triton Inference Server at {self.triton_url}...")
-        self.client = grpcclient.InferenceServerClient(url=self.triton_url)
-        
-        # Check server status
-        if not self.client.is_server_live():
+        self.client = self._new_client()
+        await self._check_health()
+        if not self.healthy:
             logger.warning("Triton Server is NOT live.")
+        self._health_task = asyncio.create_task(self._health_loop())
 
-    def transcribe(self, audio_data: np.ndarray) -> str:
-        """
-        Sends audio to Triton via gRPC.
-        """
+    async def _check_health(self):
+        try:
+            self.healthy = (
+                await self.client.is_server_live(client_timeout=settings.TRITON_TIMEOUT)
+                and await self.client.is_model_ready(self.model_name, client_timeout=settings.TRITON_TIMEOUT)
+            )
+        except Exception as e:
+            logger.debug(f"Triton health check failed: {e}")
+            self.healthy = False
+
+    async def _reconnect(self):
+        """Replaces the channel. Concurrent callers share one reconnect."""
+        async with self._reconnect_lock:
+            if self.healthy:
+                return
+            logger.warning("Reconnecting to Triton...")
+            old, self.client = self.client, self._new_client()
+            try:
+                await old.close()
+            except Exception:
+                pass
+            await self._check_health()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(settings.TRITON_HEALTH_INTERVAL)
+            was_healthy = self.healthy
+            await self._check_health()
+            if not self.healthy:
+                await self._reconnect()
+            if self.healthy and not was_healthy:
+                logger.info("Triton is live again.")
+
+    async def transcribe(self, audio_data: np.ndarray, timeout: float = settings.TRITON_TIMEOUT) -> str:
+        """Single utterance convenience wrapper around transcribe_batch."""
         if len(audio_data) == 0:
             return ""
+        return (await self.transcribe_batch([audio_data], timeout))[0]
+
+    async def transcribe_batch(self, audios: List[np.ndarray], timeout: float = settings.TRITON_TIMEOUT) -> List[str]:
+        """
+        Sends several utterances as ONE request: AUDIO_DATA is zero-padded
+        to [batch, max_samples] and AUDIO_LENGTH carries the real lengths.
+        `timeout` is a per-request deadline in seconds; a late transcript
+        is worthless for live coaching.
+        """
+        empty = [""] * len(audios)
+
+        # Fail fast while Triton is down instead of stacking up deadlines
+        if not self.healthy or not audios:
+            return empty
+
+        # Prepare Input
+        lengths = np.array([[len(a)] for a in audios], dtype=np.int32)
+        batch = np.zeros((len(audios), int(lengths.max())), dtype=np.float32)
+        for i, audio in enumerate(audios):
+            batch[i, :len(audio)] = audio
+
+        inputs = [
+            grpcclient.InferInput("AUDIO_DATA", batch.shape, "FP32"),
+            grpcclient.InferInput("AUDIO_LENGTH", lengths.shape, "INT32")
+        ]
+        inputs[0].set_data_from_numpy(batch)
+        inputs[1].set_data_from_numpy(lengths)
+
+        # Prepare Output
+        outputs = [
+            grpcclient.InferRequestedOutput("TRANSCRIPT")
+        ]
 
         try:
-            # Prepare Input
-            # Triton expects shape [batch_size, samples] or [samples] depending on config
-            # Our config expects 1D array for simplicity, Triton handles batching
-            inputs = [
-                grpcclient.InferInput("AUDIO_DATA", audio_data.shape, "FP32")
-            ]
-            inputs[0].set_data_from_numpy(audio_data)
-
-            # Prepare Output
-            outputs = [
-                grpcclient.InferRequestedOutput("TRANSCRIPT")
-            ]
-
-            # Inference Call
-            result = self.client.infer(
-                model_name="whisper",
-                inputs=inputs,
-                outputs=outputs
-            )
+            async with self._inflight:
+                result = await self.client.infer(
+                    model_name=self.model_name,
+                    inputs=inputs,
+                    outputs=outputs,
+                    client_timeout=timeout
+                )
 
             # Parse Output
-            # Result comes back as bytes array
-            transcript_bytes = result.as_numpy("TRANSCRIPT")[0]
-            return transcript_bytes.decode("utf-8")
+            # Result comes back as a [batch, 1] bytes array
+            return [t.decode("utf-8") for t in result.as_numpy("TRANSCRIPT").reshape(-1)]
 
-        except Exception as e:
-            logger.error(f"Triton Inference Failed: {e}")
-            return ""
\ No newline at end of file
+        except InferenceServerException as e:
+            logger.error(f"Triton Inference Failed ({len(audios)} utterances): {e}")
+            if "UNAVAILABLE" in str(e.status()):
+                self.healthy = False
+                self._schedule_reconnect()
+            return empty
+
+    def _schedule_reconnect(self):
+        # Keep the handle: a bare task can be garbage-collected mid-flight
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+            self._reconnect_task.add_done_callback(self._on_reconnect_done)
+
+    def _on_reconnect_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Triton reconnect failed: {task.exception()}")
+
+    async def close(self):
+        for task in (self._health_task, self._reconnect_task):
+            if task:
+                task.cancel()
+        if self.client:
+            await self.client.close()
@@ -1,14 +1,37 @@
 # Service Entrypoint# sentinel_speech/src/main.py
 import asyncio
 import logging
+import os
+from src.core.config import settings
+from src.core.shm_ring import STORES_ORDERED
 from src.workers.stream_processor import StreamProcessor
+from src.workers.supervisor import Supervisor
 from sentinel_shared.utils.logger import setup_logger
 
 # Setup structured logging
 logger = setup_logger("speech_service", "INFO")
 
+def available_cpus() -> int:
+    """CPUs this container may use: the cgroup quota if set, not the node's core count."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" when unlimited
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
 if __name__ == "__main__":
-    processor = StreamProcessor()
+    workers = settings.SPEECH_WORKERS or available_cpus()
+    if workers > 1 and not STORES_ORDERED:
+        # The shard rings rely on x86 store ordering (see ShmRing)
+        logger.warning("Shard mode needs an x86-64 host; running a single worker")
+        workers = 1
+    # One process per core behind a supervisor, or a single in-process worker
+    processor = Supervisor(workers) if workers > 1 else StreamProcessor()
     
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
@@ -2,130 +2,538 @@
 import asyncio
 import json
 import logging
+import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict
+from dataclasses import replace
 
+import numpy as np
 import nats
-from nats.errors import ConnectionClosedError, TimeoutError, NoRespondersError
+from nats.errors import ConnectionClosedError, TimeoutError, NoRespondersError, SlowConsumerError
+from prometheus_client import start_http_server
 
 from src.core.config import settings
-from src.core.audio_buffer import AudioBuffer
-from src.core.vad import VADEngine
+from src.core.audio_buffer import AudioBufferPool
+from src.core.vad import VADEngine, VADBatchScheduler
+from src.core.endpointer import Utterance
+from src.core.admission import AdmissionController
+from src.core.shm_ring import ShmRing, RECORD_AUDIO, RECORD_FORMAT
+from src.core.codecs import AudioFormat, AudioInput, format_from_headers, decode_format
+from src.core.session import SessionRegistry, SessionState, ChannelState
+from src.core.jitter import JitterBuffer
+from src.core.partials import LocalAgreement
+from src.core.timer_wheel import TimerWheel
+from src.core import metrics
+from src.core.tracing import Trace
 from src.core.transcriber import Transcriber
+from src.core.batcher import TranscriptionBatcher
 from src.core.nlp_router import NLPRouter
 from src.adapters.state import StateManager
-from sentinel_shared.schemas.events import OverlayTriggerPayload, EventType, OverlayContent
+from src.adapters.rules import RuleStore
+from src.adapters.playbook import PlaybookMirror
+from src.adapters.embedding_cache import EmbeddingCache
+from src.core.embedder import OnnxEmbedder, embedder_available
+from src.core.semantic import SemanticMatcher
+from sentinel_shared.schemas.events import (
+    OverlayTriggerPayload, EventType, OverlayContent, TranscriptPayload
+)
+from sentinel_shared.utils.audio import FrameHeader, parse_frame, skip_frames, CODECS, CHANNEL_LAYOUTS
 
 logger = logging.getLogger("worker.speech")
 
 class StreamProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        shard: int = None,
+        bus=None,
+        vad: VADEngine = None,
+        transcriber=None,
+        state_db: StateManager = None,
+        rule_store: RuleStore = None,
+        semantic_matching: bool = settings.SEMANTIC_MATCHING
+    ):
+        """
+        Dependencies default to the production ones (NATS, Triton, Redis);
+        pass stand-ins to run the pipeline offline (see scripts/replay_bench.py).
+        """
+        # Set when running as one shard under the Supervisor
+        self.shard = shard
+        self.bus = bus
+
+        # OPTIMIZATION: One timer wheel drives every per-session timer
+        # (trigger cooldowns, idle timeouts) with O(1) schedule/expire.
+        self.wheel = TimerWheel(tick=settings.TIMER_TICK)
+
         # 1. Initialize Engines (Heavy Loading)
-        self.vad = VADEngine()
-        self.transcriber = Transcriber()
-        self.nlp = NLPRouter()
-        self.state_db = StateManager()
+        self.vad = vad or VADEngine()
+        self.transcriber = transcriber or Transcriber()
+        # OPTIMIZATION: Utterances from all sessions share batched Triton requests
+        self.batcher = TranscriptionBatcher(self.transcriber)
+        # Under overload finals can be routed to a smaller, faster model
+        self.fallback_transcriber = None
+        self.fallback_batcher = None
+        if settings.TRITON_FALLBACK_MODEL:
+            self.fallback_transcriber = Transcriber(model_name=settings.TRITON_FALLBACK_MODEL)
+            self.fallback_batcher = TranscriptionBatcher(self.fallback_transcriber)
+        self.nlp = NLPRouter(wheel=self.wheel)
+        self.rule_store = rule_store or RuleStore(self.nlp)
+        self.state_db = state_db or StateManager()
         
-        # 2. Session State: Dict[session_id, AudioBuffer]
-        self.sessions: Dict[str, AudioBuffer] = {}
+        # 2. Session State: LRU of SessionState, bounded by MAX_SESSIONS
+        self.buffer_pool = AudioBufferPool()
+        self.sessions = SessionRegistry(self.buffer_pool, self._on_session_evicted, self.wheel)
+        metrics.RESIDENT_SESSIONS.set_function(lambda: len(self.sessions))
+        metrics.BUFFER_BYTES.set_function(self.sessions.buffer_bytes)
+
+        # OPTIMIZATION: Frames from all sessions are scored in one ONNX batch
+        self.vad_scheduler = VADBatchScheduler(self.vad, self._on_vad_frame)
         
-        # 3. Thread Pool for blocking GPU/CPU tasks
+        self.partial_interval = int(settings.PARTIAL_INTERVAL * settings.SAMPLE_RATE)
+
+        # Frame envelope: (session, channel) streams with frames held behind a gap
+        self._jitter_waiting = set()
+        self.gap_tolerance_us = int(settings.GAP_TOLERANCE_MS * 1000)
+        self.max_silence_fill = int(settings.MAX_SILENCE_FILL_MS * settings.SAMPLE_RATE / 1000)
+
+        # OPTIMIZATION: Bounded in-flight work. When Triton slows down, spans
+        # wait as sample positions in the ring buffer instead of piling up
+        # as tasks holding float32 copies.
+        self.admission = AdmissionController()
+        metrics.INFLIGHT_UTTERANCES.set_function(lambda: self.admission.inflight)
+        metrics.WAITING_SESSIONS.set_function(lambda: self.admission.waiting)
+        metrics.VAD_QUEUE_DEPTH.set_function(lambda: len(self.vad_scheduler))
+
+        # 3. Thread Pool for blocking CPU tasks only (e.g. the sentence encoder).
+        # Transcription is native asyncio (grpc.aio) and does not use it.
         self.executor = ThreadPoolExecutor(max_workers=4) 
+
+        # 4. Semantic matching against a local mirror of the Qdrant playbook
+        self.playbook = None
+        self.embedding_cache = None
+        self.semantic = None
+        if semantic_matching and not embedder_available():
+            logger.warning(
+                f"Semantic matching disabled: {settings.EMBEDDER_MODEL_PATH} or its tokenizer "
+                f"is missing (see scripts/export_embedder.py). Keyword rules only."
+            )
+            semantic_matching = False
+        if semantic_matching:
+            embedder = OnnxEmbedder()
+            self.playbook = PlaybookMirror()
+            self.embedding_cache = EmbeddingCache(embedder.version)
+            self.semantic = SemanticMatcher(
+                embedder, self.playbook, self.executor, cache=self.embedding_cache
+            )
         
         self.nc = None
+        self.audio_sub = None
+
+    async def _on_nats_error(self, e):
+        if isinstance(e, SlowConsumerError):
+            metrics.AUDIO_CHUNKS_DROPPED.inc()
+            logger.warning(f"Audio dropped by NATS (slow consumer): {e}")
+        else:
+            logger.error(f"NATS error: {e}")
+
+    async def start(self, ring: ShmRing = None):
+        """
+        Connects to NATS and starts the subscriber loop. With a `ring`, audio
+        and session-end signals come from the supervisor instead of NATS.
+        """
+        if self.bus is not None:
+            self.nc = self.bus
+        else:
+            self.nc = await nats.connect(settings.NATS_URL, error_cb=self._on_nats_error)
+            logger.info("Connected to NATS.")
 
-    async def start(self):
-        """Connects to NATS and starts the subscriber loop."""
-        self.nc = await nats.connect(settings.NATS_URL if hasattr(settings, 'NATS_URL') else "nats://localhost:4222")
-        logger.info("Connected to NATS.")
+        # /metrics: each shard process has its own registry, hence its own port
+        if settings.METRICS_PORT:
+            port = settings.METRICS_PORT + (0 if self.shard is None else 1 + self.shard)
+            start_http_server(port)
+            logger.info(f"Metrics on :{port}/metrics")
+
+        await self.transcriber.connect()
+        if self.fallback_transcriber:
+            await self.fallback_transcriber.connect()
+        await self.rule_store.load_all()
+        asyncio.create_task(self.rule_store.watch())
+        if self.playbook:
+            asyncio.create_task(self.playbook.watch())
+        asyncio.create_task(self.vad_scheduler.run())
 
         # Subscribe to all audio streams
         # Queue Group "speech_workers" ensures load balancing if we scale replicas
-        await self.nc.subscribe("audio.raw.>", queue="speech_workers", cb=self.message_handler)
+        if ring is not None:
+            asyncio.create_task(self._drain_ring(ring))
+        else:
+            # Pending limits cap what NATS buffers for us if the loop falls behind
+            self.audio_sub = await self.nc.subscribe(
+                "audio.raw.>",
+                queue="speech_workers",
+                cb=self.message_handler,
+                pending_msgs_limit=settings.NATS_PENDING_MSGS,
+                pending_bytes_limit=settings.NATS_PENDING_BYTES
+            )
+            metrics.NATS_PENDING_MSGS.set_function(lambda: self.audio_sub.pending_msgs)
+
+            # End-of-call signal from the Gateway. No queue group: every worker
+            # gets it and whichever one holds the session releases it.
+            await self.nc.subscribe("session.end.>", cb=self.session_end_handler)
         
-        # Keep alive
+        # Keep alive + drive the timer wheel (idle timeouts, cooldowns)
         while True:
-            await asyncio.sleep(1)
+            await asyncio.sleep(settings.TIMER_TICK)
+            self.wheel.advance()
+            if self._jitter_waiting:
+                self._expire_jitter()
 
     async def message_handler(self, msg):
-        subject = msg.subject
-        session_id = subject.split(".")[-1]
-        data = msg.data
+        self.handle_frame(msg.subject.split(".")[-1], msg.data, format_from_headers(msg.headers))
 
-        if session_id not in self.sessions:
-            self.sessions[session_id] = AudioBuffer()
-        
-        buffer = self.sessions[session_id]
-        
-        # OPTIMIZATION: Pre-Filter using VAD on the raw chunk (approx 30-60ms)
-        # We need to quickly convert just this chunk to float for VAD
-        # Note: We do this in the main loop because VAD is very lightweight (0.5ms)
-        # compared to the overhead of thread switching.
-        chunk_float = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        # Check if this specific chunk has speech
-        is_speech = self.vad.has_speech(chunk_float)
-        
-        if is_speech:
-            buffer.add_bytes(data) # Only add if speech exists
+    async def session_end_handler(self, msg):
+        self.handle_end(msg.subject.split(".")[-1])
+
+    async def _drain_ring(self, ring: ShmRing):
+        """Shard mode: pulls records from the supervisor once per VAD tick."""
+        interval = settings.VAD_BATCH_INTERVAL_MS / 1000.0
+        while True:
+            records = ring.drain(settings.VAD_MAX_BATCH)
+            for kind, session_id, data in records:
+                if kind == RECORD_AUDIO:
+                    self.handle_frame(session_id, data)
+                elif kind == RECORD_FORMAT:
+                    self.sessions.touch(session_id).audio_format = decode_format(data)
+                else:
+                    self.handle_end(session_id)
+            # Ring still has data: yield, but come straight back
+            await asyncio.sleep(0 if len(records) == settings.VAD_MAX_BATCH else interval)
+
+    def handle_frame(self, session_id: str, data: bytes, fmt: AudioFormat = None):
+        """`fmt` None is the session's current format (ring mode sends changes separately)."""
+        state = self.sessions.touch(session_id)
+        state.last_arrival = time.perf_counter()
+        try:
+            header, payload = parse_frame(data)
+        except ValueError as e:
+            metrics.AUDIO_FRAME_EVENTS.labels(event="malformed").inc()
+            logger.warning(f"[{session_id}] Audio frame dropped: {e}")
+            return
+
+        # The envelope is authoritative for the codec and, in two-stream
+        # sessions, for which speaker the frame belongs to
+        fmt = fmt or state.audio_format
+        fmt = (CODECS.get(header.codec, fmt[0]), fmt[1], fmt[2], CHANNEL_LAYOUTS.get(header.channel, fmt[3]))
+
+        stream = header.channel
+        jitter = state.jitter.get(stream)
+        if jitter is None:
+            jitter = state.jitter[stream] = JitterBuffer()
+        for item, lost in jitter.push(header.seq, (header, payload, fmt), count=header.frames):
+            self._play_frame(state, *item, lost)
+        if jitter.held:
+            self._jitter_waiting.add((session_id, stream))
+
+    def _expire_jitter(self):
+        """Releases frames held behind gaps that have waited JITTER_MAX_MS."""
+        now = time.monotonic()
+        for key in list(self._jitter_waiting):
+            state = self.sessions.get(key[0])
+            jitter = state.jitter.get(key[1]) if state else None
+            if jitter is None:
+                self._jitter_waiting.discard(key)
+                continue
+            for item, lost in jitter.expire(now):
+                self._play_frame(state, *item, lost)
+            if not jitter.held:
+                self._jitter_waiting.discard(key)
+
+    def _play_frame(self, state: SessionState, header: FrameHeader, payload, fmt: AudioFormat, lost: int):
+        source = state.inputs.get(fmt[3])
+        if source is None or source.format != fmt:
+            source = state.inputs[fmt[3]] = AudioInput(fmt)
+            logger.info(f"[{state.session_id}] Audio {fmt[0]} {fmt[1]}Hz x{fmt[2]} -> {'/'.join(source.speakers)}")
+
+        if lost < 0:
+            # Replayed after a resume: only the frames past what was played are new
+            header, payload = skip_frames(header, payload, -lost, fmt[1], fmt[2])
+            lost = 0
+
+        # Normalise to 16kHz mono int16 per speaker: one vectorised pass per frame
+        outputs = source.convert(payload)
+        gap = self._gap_samples(state, header, lost, len(outputs[0]))
+        for speaker, pcm in zip(source.speakers, outputs):
+            channel = state.channel(speaker, self.buffer_pool)
+            if gap:
+                # Keeps buffer positions (and so transcript offsets) on the capture clock
+                self.vad_scheduler.submit(channel.key, channel.vad, np.zeros(gap, dtype=np.int16))
+            # OPTIMIZATION: Do not run VAD here. The chunk is queued and scored
+            # together with frames from every other session and channel on the
+            # next batch tick; results come back through _on_vad_frame in order.
+            self.vad_scheduler.submit(channel.key, channel.vad, pcm)
+
+    def _gap_samples(self, state: SessionState, header: FrameHeader, lost: int, samples: int) -> int:
+        """Silence owed before this frame: audio lost in transit, or never sent by the client."""
+        rate = settings.SAMPLE_RATE
+        if header.capture_us:
+            expected = state.next_capture_us.get(header.channel)
+            state.next_capture_us[header.channel] = header.capture_us + samples * 1_000_000 // rate
+            gap_us = header.capture_us - expected if expected is not None else 0
+            gap = gap_us * rate // 1_000_000 if gap_us > self.gap_tolerance_us else 0
         else:
-            # Optional: Add a counter here to detect "End of Sentence" logic
-            pass
-
-        # Check if we have enough "Valid Speech" to transcribe
-        if buffer.is_ready(min_seconds=settings.MIN_AUDIO_DURATION):
-            audio_chunk = buffer.get_audio().copy()
-            buffer.clear()
-            asyncio.create_task(self.process_audio_chunk(session_id, audio_chunk))
-
-    async def process_audio_chunk(self, session_id: str, audio_data):
-        loop = asyncio.get_running_loop()
-        previous_text = self.sessions[session_id].last_transcript_segment
-
-         # Step B: Transcribe (Heavy GPU operation)
-        # Transcribe with context
-        text = await loop.run_in_executor(
-            self.executor, 
-            lambda: self.transcriber.model.transcribe(
-                audio_data, 
-                initial_prompt=previous_text, # <--- The Fix
-                beam_size=1
-            )
+            # No capture clock (legacy client, wrapped by the Gateway): count lost frames
+            gap = lost * samples // header.frames
+        gap = min(gap, self.max_silence_fill)
+        if gap:
+            metrics.SILENCE_FILLED_SECONDS.inc(gap / rate)
+        return gap
+
+    def handle_end(self, session_id: str):
+        if self.sessions.end(session_id):
+            logger.info(f"[{session_id}] Session ended")
+
+    def _on_vad_frame(self, key, frame: np.ndarray, is_speech: bool):
+        state = self.sessions.get(key[0])
+        if state is None:
+            return
+        self._on_channel_frame(state, state.channels[key[1]], frame, is_speech)
+
+    def _on_channel_frame(self, state: SessionState, channel: ChannelState, frame: np.ndarray, is_speech: bool):
+        # Every frame is buffered; the endpointer decides which span is sent.
+        # Silence is needed for pre-roll and hangover padding.
+        buffer = channel.buffer
+        buffer.add_samples(frame)
+
+        utterance = channel.endpointer.process(is_speech, buffer.total_samples, len(frame))
+        if utterance:
+            utterance.arrived_at = state.last_arrival
+            self._dispatch_utterance(state, channel, utterance)
+        elif settings.STREAMING_PARTIALS and channel.triggers and channel.endpointer.in_speech:
+            # Partials only serve low-latency hints, so the agent's channel gets finals only
+            self._maybe_dispatch_partial(state, channel)
+
+    def _dispatch_utterance(self, state: SessionState, channel: ChannelState, utterance: Utterance):
+        # Close the streaming window: in-flight partials for it become stale
+        agreement = channel.agreement
+        channel.agreement = LocalAgreement()
+        channel.utterance_seq += 1
+        channel.next_partial_at = 0
+
+        admitted = self.admission.offer(channel.key, utterance)
+        if admitted:
+            self._send_utterance(state, channel, admitted, agreement)
+        # else: held (and possibly merged with later speech) until a slot frees
+
+    def _send_utterance(self, state: SessionState, channel: ChannelState, utterance: Utterance,
+                        agreement: LocalAgreement):
+        # Dwell: closing audio arrived -> handed to transcription (VAD tick + any hold)
+        trace = Trace(state.session_id, utterance.arrived_at or time.perf_counter(), state.traced)
+        trace.observe("buffer_dwell", time.perf_counter() - trace.start)
+
+        # int16 -> float32 happens here, once per utterance
+        audio_chunk = channel.buffer.get_range(utterance.start_sample, utterance.end_sample)
+        batcher = self.batcher
+        if self.fallback_batcher and self.admission.degraded:
+            batcher = self.fallback_batcher
+            metrics.UTTERANCES_SHED.labels(reason="degraded").inc()
+        asyncio.create_task(
+            self.process_audio_chunk(state, channel, audio_chunk, utterance, agreement, batcher, trace)
+        )
+
+    def _send_ready(self, ready):
+        """Sends held spans the admission controller just let through."""
+        for key, utterance in ready:
+            state = self.sessions.get(key[0])
+            if state is None:
+                self._send_ready(self.admission.release(key))
+                continue
+            # Partials committed for a held span are re-matched; cooldowns dedupe them
+            self._send_utterance(state, state.channels[key[1]], utterance, LocalAgreement())
+
+    def _maybe_dispatch_partial(self, state: SessionState, channel: ChannelState):
+        """Re-decodes the growing utterance every PARTIAL_INTERVAL seconds of audio."""
+        if channel.partial_inflight:
+            return
+
+        start = channel.endpointer.start_sample
+        now = channel.buffer.total_samples
+        if now < max(channel.next_partial_at, start + self.partial_interval):
+            return
+
+        channel.next_partial_at = now + self.partial_interval
+        # Partials are best-effort: shed first when the worker is busy
+        if not self.admission.try_partial():
+            return
+        channel.partial_inflight = True
+        trace = Trace(state.session_id, state.last_arrival, state.traced)
+        audio_chunk = channel.buffer.get_range(start, now)
+        asyncio.create_task(
+            self.process_partial(state, channel, audio_chunk, channel.utterance_seq, start, now, trace)
+        )
+
+    def _on_session_evicted(self, state: SessionState, reason: str):
+        """Called before the session's buffer goes back to the pool."""
+        metrics.SESSIONS_EVICTED.labels(reason=reason).inc()
+        logger.info(f"[{state.session_id}] Released ({reason}), {len(self.sessions)} resident")
+        # Frames still queued for the next VAD batch are the end of the call:
+        # score them now, while the session's state is still here
+        self.vad_scheduler.flush_streams(
+            {channel.key for channel in state.channels},
+            lambda key, frame, is_speech: self._on_channel_frame(state, state.channels[key[1]], frame, is_speech)
         )
+        # Don't lose the last sentence (or a held one) when the call ends.
+        # The audio must be copied now, before the buffer is recycled, so
+        # this one request bypasses the limits.
+        for channel in state.channels:
+            utterance = channel.endpointer.flush(channel.buffer.total_samples)
+            held = self.admission.take(channel.key)
+            if held:
+                utterance = replace(held, end_sample=utterance.end_sample) if utterance else held
+            if utterance:
+                self.admission.force(channel.key)
+                self._send_utterance(state, channel, utterance, channel.agreement)
+
+    async def process_partial(self, state: SessionState, channel: ChannelState, audio_data, seq: int,
+                              start: int, end: int, trace: Trace):
+        t0 = time.perf_counter()
+        try:
+            text = await self.batcher.submit(audio_data)
+            trace.observe("transcribe_partial", time.perf_counter() - t0)
+        finally:
+            channel.partial_inflight = False
+            self._send_ready(self.admission.release_partial())
+
+        # The utterance closed while we were decoding; the final pass owns it now
+        if not text or seq != channel.utterance_seq:
+            return
+
+        words = channel.agreement.update(text)
+        if words:
+            await self._commit_words(
+                state, channel, words, start / settings.SAMPLE_RATE, end / settings.SAMPLE_RATE, trace
+            )
+
+    async def process_audio_chunk(self, state: SessionState, channel: ChannelState, audio_data,
+                                  utterance: Utterance, agreement: LocalAgreement,
+                                  batcher: TranscriptionBatcher, trace: Trace):
+        session_id = state.session_id
+
+        # Step B: Transcribe (Heavy GPU operation, batched with other sessions)
+        t0 = time.perf_counter()
+        try:
+            text = await batcher.submit(audio_data)
+            trace.observe("transcribe", time.perf_counter() - t0)
+        finally:
+            self._send_ready(self.admission.release(channel.key))
 
         if not text:
             return
 
-        logger.info(f"[{session_id}] Transcript: {text}")
+        logger.info(
+            f"[{session_id}] Transcript {channel.speaker} "
+            f"[{utterance.start_offset:.2f}s-{utterance.end_offset:.2f}s]: {text}"
+        )
+
+        # Step C: Persist to Redis (queued; flushed in a pipelined batch)
+        self.state_db.append_transcript(
+            session_id, text, utterance.start_offset, utterance.end_offset, channel.speaker
+        )
+
+        final = TranscriptPayload(
+            session_id=session_id,
+            text=text,
+            is_final=True,
+            speaker=channel.speaker,
+            start_offset=utterance.start_offset,
+            end_offset=utterance.end_offset
+        )
+        await self.nc.publish(f"transcripts.{session_id}", final.model_dump_json().encode())
+
+        # The rep's own words are transcribed for the record but never matched
+        if not channel.triggers:
+            return
+
+        # Step D: NLP on whatever the partials have not committed yet
+        remainder = agreement.finalize(text)
+        if remainder:
+            await self._commit_words(
+                state, channel, remainder, utterance.start_offset, utterance.end_offset, trace,
+                publish=False
+            )
+
+        # Step D2: Semantic match of the whole utterance (catches paraphrases)
+        if self.semantic:
+            t0 = time.perf_counter()
+            trigger = await self.semantic.match(text, state.tenant)
+            trace.observe("nlp_semantic", time.perf_counter() - t0)
+            if trigger and self.nlp.accept(trigger, session_id):
+                await self._publish_trigger(session_id, trigger, trace, source="semantic")
 
-        # Step C: Persist to Redis (Async)
-        await self.state_db.append_transcript(session_id, text)
+    async def _commit_words(self, state: SessionState, channel: ChannelState, words,
+                            start_offset: float, end_offset: float, trace: Trace, publish: bool = True):
+        """Stable words are final: publish them and run NLP right away."""
+        session_id = state.session_id
+
+        if publish:
+            partial = TranscriptPayload(
+                session_id=session_id,
+                text=" ".join(words),
+                speaker=channel.speaker,
+                start_offset=start_offset,
+                end_offset=end_offset
+            )
+            await self.nc.publish(f"transcripts.{session_id}", partial.model_dump_json().encode())
+
+        # Match on the new words plus a little committed context, but only
+        # accept hits that end inside the new words
+        context = " ".join(channel.context_words)
+        text = f"{context} {' '.join(words)}" if context else " ".join(words)
+        channel.context_words.extend(words)
 
         # Step D: NLP Routing (Find Intelligence)
-        trigger = self.nlp.process(text)
+        t0 = time.perf_counter()
+        trigger = self.nlp.process(text, session_id=session_id, tenant=state.tenant, min_end=len(context))
+        trace.observe("nlp_keyword", time.perf_counter() - t0)
         
         if trigger:
-            logger.info(f"[{session_id}] Trigger Match: {trigger['title']}")
-            
-            # Step E: Construct Payload using Shared Schema
-            payload = OverlayTriggerPayload(
-                content=OverlayContent(
-                    title=trigger["title"],
-                    message=trigger["message"],
-                    color_hex=trigger["color_hex"]
-                )
-            )
-            
-            # Step F: Publish to UI Command Topic
-            # Subject: ui.commands.{session_id} -> Gateway listens to this
-            await self.nc.publish(
-                f"ui.commands.{session_id}", 
-                payload.model_dump_json().encode()
+            await self._publish_trigger(session_id, trigger, trace, source="keyword")
+
+    async def _publish_trigger(self, session_id: str, trigger: dict, trace: Trace, source: str):
+        logger.info(f"[{session_id}] Trigger Match: {trigger['title']}")
+        
+        # Step E: Construct Payload using Shared Schema
+        payload = OverlayTriggerPayload(
+            content=OverlayContent(
+                title=trigger["title"],
+                message=trigger["message"],
+                color_hex=trigger["color_hex"]
             )
+        )
+        
+        # Step F: Publish to UI Command Topic
+        # Subject: ui.commands.{session_id} -> Gateway listens to this
+        t0 = time.perf_counter()
+        await self.nc.publish(
+            f"ui.commands.{session_id}", 
+            payload.model_dump_json().encode()
+        )
+        trace.observe("publish", time.perf_counter() - t0)
+        metrics.TRIGGERS_PUBLISHED.labels(source=source).inc()
+        trace.finish()
 
     async def shutdown(self):
         logger.info("Shutting down worker...")
         if self.nc:
             await self.nc.close()
+        # Batches still in flight finish before their transcripts' stores close
+        await self.batcher.close()
+        if self.fallback_batcher:
+            await self.fallback_batcher.close()
         await self.state_db.close()
+        await self.rule_store.close()
+        if self.playbook:
+            await self.playbook.close()
+        if self.embedding_cache:
+            await self.embedding_cache.close()
+        await self.transcriber.close()
+        if self.fallback_transcriber:
+            await self.fallback_transcriber.close()
         self.executor.shutdown()
\ No newline at end of file
@@ -0,0 +1,162 @@
+# sentinel_speech/src/workers/supervisor.py
+import asyncio
+import logging
+import multiprocessing
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Optional
+
+import nats
+from prometheus_client import start_http_server
+
+from src.core.config import settings
+from src.core.shm_ring import ShmRing, RECORD_AUDIO, RECORD_END, RECORD_FORMAT
+from src.core.codecs import DEFAULT_FORMAT, format_from_headers, encode_format
+from src.core import metrics
+
+logger = logging.getLogger("worker.supervisor")
+
+def shard_for(session_id: str, n_shards: int) -> int:
+    """Stable session -> shard mapping (same in every process and restart)."""
+    return zlib.crc32(session_id.encode()) % n_shards
+
+def run_shard(index: int, ring_name: str):
+    """Entry point of a shard process."""
+    from src.workers.stream_processor import StreamProcessor
+    from sentinel_shared.utils.logger import setup_logger
+
+    shard_logger = setup_logger(f"speech_service.shard{index}", "INFO")
+    ring = ShmRing(ring_name)
+    processor = StreamProcessor(shard=index)
+    try:
+        asyncio.run(processor.start(ring=ring))
+    except KeyboardInterrupt:
+        shard_logger.info("Stopping...")
+
+class Supervisor:
+    """
+    Runs N StreamProcessor shards, one process (and core) each.
+
+    The supervisor is the only NATS audio subscriber of the pod. It routes
+    each chunk by crc32(session_id) to its shard through a shared-memory
+    ring, so a session's VAD, buffer and NLP state live in exactly one
+    process and no audio takes a second trip through NATS. Session-end
+    signals travel through the same ring, behind the session's audio.
+    Shards publish their results to NATS directly. Dead shards are
+    restarted; their sessions start over.
+    """
+
+    def __init__(self, n_shards: int, ring_bytes: int = settings.SHM_RING_BYTES):
+        self.n_shards = n_shards
+        self.rings = [ShmRing(capacity=ring_bytes) for _ in range(n_shards)]
+        # Spawn, not fork: ONNX Runtime and gRPC threads do not survive fork
+        self.ctx = multiprocessing.get_context("spawn")
+        self.procs: List[Optional[multiprocessing.Process]] = [None] * n_shards
+        # Last format sent down the ring per session, with when the session was
+        # last seen: shards are only told on change (two-stream sessions
+        # alternate, costing one tiny record per switch). Least recently seen
+        # first, so idle sessions are pruned from the front.
+        self.formats: "OrderedDict[str, tuple]" = OrderedDict()
+        self.max_formats = settings.MAX_SESSIONS * n_shards
+        self.nc = None
+
+    def _spawn(self, index: int):
+        proc = self.ctx.Process(
+            target=run_shard, args=(index, self.rings[index].name),
+            name=f"speech-shard-{index}", daemon=True
+        )
+        proc.start()
+        self.procs[index] = proc
+        logger.info(f"Shard {index} started (pid {proc.pid})")
+
+    async def start(self):
+        for i in range(self.n_shards):
+            self._spawn(i)
+
+        # Supervisor metrics on METRICS_PORT; shards use the ports after it
+        if settings.METRICS_PORT:
+            start_http_server(settings.METRICS_PORT)
+        self.nc = await nats.connect(settings.NATS_URL)
+        await self.nc.subscribe(
+            "audio.raw.>",
+            queue="speech_workers",
+            cb=self.audio_handler,
+            pending_msgs_limit=settings.NATS_PENDING_MSGS,
+            pending_bytes_limit=settings.NATS_PENDING_BYTES
+        )
+        await self.nc.subscribe("session.end.>", cb=self.session_end_handler)
+        logger.info(f"Supervising {self.n_shards} shards")
+
+        while True:
+            await asyncio.sleep(1.0)
+            self._prune_formats(time.monotonic())
+            for i, proc in enumerate(self.procs):
+                if not proc.is_alive():
+                    logger.error(f"Shard {i} exited ({proc.exitcode}); restarting")
+                    self._restart(i)
+
+    def _restart(self, index: int):
+        # The new process starts at DEFAULT_FORMAT for every session: its
+        # sessions' formats must be sent again with their next frame
+        for session_id in [s for s in self.formats if shard_for(s, self.n_shards) == index]:
+            del self.formats[session_id]
+        self._spawn(index)
+
+    def _prune_formats(self, now: float):
+        """
+        Forgets sessions not seen for half SESSION_IDLE_TIMEOUT (no session.end
+        came). Shards evict them at the full timeout and start over at
+        DEFAULT_FORMAT, so a session that comes back is sent its format again.
+        """
+        cutoff = now - settings.SESSION_IDLE_TIMEOUT / 2
+        while self.formats:
+            session_id, (_, seen) = next(iter(self.formats.items()))
+            if seen > cutoff:
+                break
+            del self.formats[session_id]
+
+    def _route(self, kind: int, session_id: str, payload: bytes = b"") -> bool:
+        ring = self.rings[shard_for(session_id, self.n_shards)]
+        if not ring.put(kind, session_id, payload):
+            # Shard is behind: shed here rather than grow without bound
+            metrics.SHARD_RING_DROPPED.inc()
+            return False
+        return True
+
+    async def audio_handler(self, msg):
+        session_id = msg.subject.split(".")[-1]
+        fmt = format_from_headers(msg.headers)
+        entry = self.formats.pop(session_id, None)
+        sent = entry[0] if entry else DEFAULT_FORMAT
+        # Recorded only once the shard has it: a shed format record is sent
+        # again with the next frame
+        if sent != fmt and self._route(RECORD_FORMAT, session_id, encode_format(fmt)):
+            sent = fmt
+        if sent != DEFAULT_FORMAT:
+            self.formats[session_id] = (sent, time.monotonic())
+            if len(self.formats) > self.max_formats:
+                self.formats.popitem(last=False)
+        if sent != fmt:
+            # The shard would read it in its old format
+            metrics.SHARD_RING_DROPPED.inc()
+            return
+        self._route(RECORD_AUDIO, session_id, msg.data)
+
+    async def session_end_handler(self, msg):
+        session_id = msg.subject.split(".")[-1]
+        self.formats.pop(session_id, None)
+        self._route(RECORD_END, session_id)
+
+    async def shutdown(self):
+        logger.info("Shutting down supervisor...")
+        if self.nc:
+            await self.nc.close()
+        for proc in self.procs:
+            if proc and proc.is_alive():
+                proc.terminate()
+        for proc in self.procs:
+            if proc:
+                proc.join(timeout=10)
+        for ring in self.rings:
+            ring.close()
@@ -0,0 +1,60 @@
+import pytest
+from src.core.admission import AdmissionController, COALESCE, DROP_OLDEST
+from src.core.endpointer import Utterance
+
+
+def utt(start, end):
+    return Utterance(start, end, 16000)
+
+
+def test_per_session_limit_coalesces_held_spans():
+    adm = AdmissionController(max_inflight=10, max_per_session=1, policy=COALESCE)
+    assert adm.offer("a", utt(0, 100)) is not None
+    assert adm.offer("a", utt(200, 300)) is None
+    assert adm.offer("a", utt(400, 500)) is None
+    assert adm.offer("b", utt(0, 50)) is not None  # Other sessions unaffected
+    assert adm.waiting == 1
+
+    ready = adm.release("a")
+    assert ready == [("a", utt(200, 500))]  # One longer request, nothing lost
+    assert adm.inflight == 2
+
+
+def test_coalesced_span_is_capped_at_max_duration():
+    adm = AdmissionController(max_inflight=10, max_per_session=1, policy=COALESCE, max_span_seconds=1.0)
+    adm.offer("a", utt(0, 100))
+    assert adm.offer("a", utt(200, 8000)) is None
+    assert adm.offer("a", utt(9000, 16200)) is None  # Exactly 1s from the held start: merged
+    # Would outgrow 1s: the newest span replaces it, and nothing goes past the limit
+    assert adm.offer("a", utt(17000, 17500)) is None
+    assert adm.inflight == 1
+    assert adm.release("a") == [("a", utt(17000, 17500))]
+
+
+def test_drop_oldest_keeps_latest_span():
+    adm = AdmissionController(max_inflight=10, max_per_session=1, policy=DROP_OLDEST)
+    adm.offer("a", utt(0, 100))
+    adm.offer("a", utt(200, 300))
+    adm.offer("a", utt(400, 500))
+    assert adm.release("a") == [("a", utt(400, 500))]
+
+
+def test_global_limit_wakes_waiters_fifo_and_sheds_partials():
+    adm = AdmissionController(max_inflight=2, max_per_session=2,
+                              partial_watermark=0.5, degrade_watermark=1.0)
+    assert adm.try_partial()
+    assert not adm.try_partial()  # Past the partial watermark
+    adm.offer("a", utt(0, 100))
+    assert adm.degraded
+    adm.offer("b", utt(0, 100))
+    adm.offer("c", utt(0, 100))
+    assert adm.waiting == 2
+
+    assert adm.release_partial() == [("b", utt(0, 100))]
+    assert adm.release("a") == [("c", utt(0, 100))]
+    assert adm.take("c") is None
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        AdmissionController(policy="panic")
@@ -0,0 +1,28 @@
+import asyncio
+
+from src.adapters.bus import InMemoryBus, subject_matches
+
+
+def test_subject_wildcards():
+    assert subject_matches("audio.raw.>", "audio.raw.abc")
+    assert not subject_matches("audio.raw.>", "audio.raw")
+    assert subject_matches("ui.*.x", "ui.commands.x")
+    assert not subject_matches("ui.*", "ui.commands.x")
+    assert subject_matches("session.end.s1", "session.end.s1")
+
+
+def test_publish_delivers_to_matching_subscribers():
+    received = []
+
+    async def run():
+        bus = InMemoryBus(on_publish=lambda msg: received.append(("seen", msg.subject)))
+
+        async def handler(msg):
+            received.append(("audio", msg.data))
+
+        await bus.subscribe("audio.raw.>", queue="speech_workers", cb=handler)
+        await bus.publish("audio.raw.s1", b"\x00\x01")
+        await bus.publish("transcripts.s1", b"{}")
+
+    asyncio.run(run())
+    assert received == [("seen", "audio.raw.s1"), ("audio", b"\x00\x01"), ("seen", "transcripts.s1")]
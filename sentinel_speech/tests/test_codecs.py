@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.core.codecs import AudioInput, DEFAULT_FORMAT, format_from_headers, encode_format, decode_format
+
+def test_format_from_headers_defaults_and_round_trips():
+    assert format_from_headers(None) == DEFAULT_FORMAT
+    fmt = format_from_headers({
+        "Audio-Encoding": "pcm_s16le", "Audio-Rate": "44100", "Audio-Channels": "2", "Audio-Layout": "dual"
+    })
+    assert fmt == ("pcm_s16le", 44100, 2, "dual")
+    assert decode_format(encode_format(fmt)) == fmt
+
+def test_dual_layout_splits_channels():
+    mic = np.full(320, 1000, dtype=np.int16)
+    system = np.full(320, -2000, dtype=np.int16)
+    stereo = np.stack([mic, system], axis=1).reshape(-1)
+
+    source = AudioInput(("pcm_s16le", 16000, 2, "dual"))
+    assert source.speakers == ("agent", "customer")
+    agent, customer = source.convert(stereo.tobytes())
+    assert np.array_equal(agent, mic) and np.array_equal(customer, system)
+
+def test_mixed_layout_downmixes_to_one_channel():
+    stereo = np.tile(np.array([1000, -1000], dtype=np.int16), 320)
+    source = AudioInput(("pcm_s16le", 16000, 2, "mixed"))
+    (pcm,) = source.convert(stereo.tobytes())
+    assert source.speakers == ("mixed",)
+    assert len(pcm) == 320 and np.abs(pcm).max() == 0
@@ -0,0 +1,100 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from src.adapters.embedding_cache import EmbeddingCache
+from src.core.semantic import SemanticMatcher
+from src.core.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def set(self, key, value, ex=None):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        self.store.update(self.ops)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+    async def close(self):
+        pass
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+class NoMirror:
+    async def search(self, queries):
+        return [None] * len(queries)
+
+
+def test_ttl_cache_evicts_lru_and_expires():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None and len(cache) == 2
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_shared_tier_serves_other_workers_and_skips_encoder():
+    shared = FakeRedis()
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            first, second = CountingEmbedder(), CountingEmbedder()
+            worker_a = SemanticMatcher(first, NoMirror(), executor, max_wait_ms=1,
+                                       cache=EmbeddingCache("v1", client=shared))
+            await asyncio.gather(worker_a.match("Too  expensive"), worker_a.match("too expensive"))
+            await worker_a.cache.close()
+
+            # Different process, same Redis: no encoder call at all
+            worker_b = SemanticMatcher(second, NoMirror(), executor, max_wait_ms=1,
+                                       cache=EmbeddingCache("v1", client=shared))
+            await worker_b.match("TOO expensive")
+
+            # New model version never reads the old vectors
+            third = CountingEmbedder()
+            worker_c = SemanticMatcher(third, NoMirror(), executor, max_wait_ms=1,
+                                       cache=EmbeddingCache("v2", client=shared))
+            await worker_c.match("too expensive")
+            await worker_c.cache.close()
+            return first.calls, second.calls, third.calls
+
+    first_calls, second_calls, third_calls = asyncio.run(run())
+    assert len(first_calls) == 1 and len(first_calls[0]) == 1  # Both spellings share one entry
+    assert second_calls == []
+    assert third_calls == [["too expensive"]]
+    assert len(shared.store) == 2
@@ -0,0 +1,51 @@
+from src.core.endpointer import Endpointer
+
+FRAME = 10  # samples per VAD frame (sample_rate=100 -> 0.1s frames)
+
+def feed(endpointer, pattern, offset=0):
+    """Feeds a string like '0011100' (1 = speech). Returns emitted utterances."""
+    out = []
+    for i, flag in enumerate(pattern):
+        u = endpointer.process(flag == "1", offset + (i + 1) * FRAME, FRAME)
+        if u:
+            out.append(u)
+    return out
+
+def make(**kwargs):
+    params = dict(sample_rate=100, start_frames=2, hangover=0.3, pad=0.1,
+                  min_duration=0.3, max_duration=1.0)
+    params.update(kwargs)
+    return Endpointer(**params)
+
+def test_utterance_closes_after_hangover():
+    ep = make()
+    utterances = feed(ep, "0011110000")
+    assert len(utterances) == 1
+    u = utterances[0]
+    # Speech frames 2-5 => samples 20..60, padded by 10 on each side
+    assert (u.start_sample, u.end_sample) == (10, 70)
+    assert u.start_offset == 0.1 and not u.forced
+    assert not ep.in_speech
+
+def test_short_pause_does_not_split():
+    ep = make()
+    assert feed(ep, "11101100") == []  # Pause shorter than hangover
+    assert ep.in_speech
+
+def test_blips_are_ignored():
+    ep = make()
+    assert feed(ep, "0100000") == []  # Single frame never opens speech
+    assert feed(ep, "1100000", offset=70) == []  # Opens, but too short
+
+def test_max_length_force_flush():
+    ep = make()
+    utterances = feed(ep, "1" * 12)
+    assert len(utterances) == 1
+    assert utterances[0].forced
+    assert ep.in_speech  # Still listening after the forced cut
+
+def test_flush_on_session_end():
+    ep = make()
+    feed(ep, "01111")
+    u = ep.flush(50)
+    assert u is not None and u.end_sample == 50
@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from src.core.audio_buffer import AudioBuffer
+from src.core.audio_buffer import AudioBuffer, AudioBufferPool
 from src.core.nlp_router import NLPRouter
 
 # Note: We skip VAD/Transcriber in unit tests unless we mock the heavy models,
@@ -18,6 +18,29 @@ def test_audio_buffer_conversion():
     assert audio_out.dtype == np.float32
     assert len(audio_out) == 16000
 
+def test_audio_buffer_wraps_without_shifting():
+    buf = AudioBuffer(sample_rate=10, max_duration=1) # capacity 10
+    buf.add_samples(np.arange(8, dtype=np.int16))
+    buf.add_samples(np.arange(8, 13, dtype=np.int16))
+
+    head, tail = buf.get_views()
+    assert len(tail) > 0 # Data wrapped: two zero-copy segments
+    assert np.concatenate([head, tail]).tolist() == list(range(3, 13))
+    assert buf.total_samples == 13
+    assert buf.get_audio(last_n=2).tolist() == [11 / 32768.0, 12 / 32768.0]
+
+def test_audio_buffer_pool_reuses_storage():
+    pool = AudioBufferPool(max_free=1, sample_rate=10, max_duration=1)
+    buf = pool.acquire()
+    assert buf.nbytes == 0 # Lazy allocation
+    buf.add_bytes(bytes(4))
+    pool.release(buf)
+
+    reused = pool.acquire()
+    assert reused is buf
+    assert reused.get_duration() == 0
+    assert reused.nbytes == 20
+
 def test_nlp_router_match():
     router = NLPRouter()
     
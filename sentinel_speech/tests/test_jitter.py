@@ -0,0 +1,77 @@
+from src.core.jitter import JitterBuffer
+
+
+def test_in_order_frames_pass_through():
+    jitter = JitterBuffer(depth=4, max_wait_ms=100)
+    assert jitter.push(10, "a", now=0) == [("a", 0)]
+    assert jitter.push(11, "b", now=0) == [("b", 0)]
+    assert len(jitter) == 0
+
+
+def test_reordered_frames_are_released_in_sequence():
+    jitter = JitterBuffer(depth=4, max_wait_ms=100)
+    jitter.push(0, "a", now=0)
+    assert jitter.push(2, "c", now=0) == []
+    assert jitter.push(3, "d", now=0) == []
+    assert jitter.push(1, "b", now=0) == [("b", 0), ("c", 0), ("d", 0)]
+
+
+def test_duplicates_and_late_frames_are_dropped():
+    jitter = JitterBuffer(depth=4, max_wait_ms=100)
+    jitter.push(0, "a", now=0)
+    assert jitter.push(0, "a", now=0) == []
+    jitter.push(2, "c", now=0)
+    assert jitter.push(2, "c", now=0) == []
+    # Gap given up on, then the missing frame shows up
+    assert jitter.expire(now=1.0) == [("c", 1)]
+    assert jitter.push(1, "b", now=1.0) == []
+
+
+def test_gap_is_skipped_when_depth_is_exceeded():
+    jitter = JitterBuffer(depth=2, max_wait_ms=1000)
+    jitter.push(0, "a", now=0)
+    jitter.push(3, "d", now=0)
+    jitter.push(4, "e", now=0)
+    assert jitter.push(5, "f", now=0) == [("d", 2), ("e", 0), ("f", 0)]
+
+
+def test_gap_waits_for_max_wait():
+    jitter = JitterBuffer(depth=8, max_wait_ms=100)
+    jitter.push(0, "a", now=0)
+    jitter.push(2, "c", now=0)
+    assert jitter.expire(now=0.05) == []
+    assert jitter.expire(now=0.1) == [("c", 1)]
+
+
+def test_merged_frames_advance_by_their_count():
+    jitter = JitterBuffer(depth=4, max_wait_ms=100)
+    assert jitter.push(0, "a", now=0, count=3) == [("a", 0)]
+    assert jitter.push(5, "c", now=0, count=2) == []
+    assert jitter.push(3, "b", now=0, count=2) == [("b", 0), ("c", 0)]
+    assert jitter.next_seq == 7
+
+
+def test_merged_frame_covering_held_frames_drops_them():
+    jitter = JitterBuffer(depth=4, max_wait_ms=100)
+    jitter.push(0, "a", now=0)
+    jitter.push(5, "f", now=0)
+    # Covers 1..6, so the held 5 is a duplicate
+    assert jitter.push(1, "b", now=0, count=6) == [("b", 0)]
+    assert jitter.next_seq == 7
+    assert len(jitter) == 0
+    assert jitter.expire(now=1.0) == []
+
+    # A held merged frame partly covered: its remainder is released
+    jitter.push(9, "j", now=1.0, count=3)
+    assert jitter.push(7, "h", now=1.0, count=3) == [("h", 0), ("j", -1)]
+    assert jitter.next_seq == 12
+
+
+def test_replay_straddling_played_audio_keeps_the_new_frames():
+    jitter = JitterBuffer(depth=4, max_wait_ms=100)
+    for seq in range(5):
+        jitter.push(seq, seq, now=0)
+    # Resume replays 3..7: frames 3 and 4 were already played
+    assert jitter.push(3, "replay", now=0, count=5) == [("replay", -2)]
+    assert jitter.next_seq == 8
+    assert jitter.push(8, "next", now=0) == [("next", 0)]
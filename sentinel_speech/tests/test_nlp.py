@@ -0,0 +1,27 @@
+from src.core.keyword_matcher import KeywordMatcher
+
+RULES = [
+    {"keywords": ["price", "cost"]},
+    {"keywords": ["other solution", "using jira"]},
+    {"keywords": ["start date", "start"]},
+]
+
+def test_single_pass_finds_all_rules_with_positions():
+    matcher = KeywordMatcher(RULES)
+    text = "The Price is fine, but we are Using Jira and the start date slips."
+    hits = [(m.rule_index, m.keyword, text[m.start:m.end]) for m in matcher.find_all(text)]
+    assert hits == [
+        (0, "price", "Price"),
+        (1, "using jira", "Using Jira"),
+        (2, "start", "start"),
+        (2, "start date", "start date"),
+    ]
+
+def test_word_boundaries():
+    matcher = KeywordMatcher(RULES)
+    assert matcher.find_all("costly pricing restart") == []
+    assert [m.keyword for m in matcher.find_all("cost.")] == ["cost"]
+
+def test_overlapping_keywords_share_suffixes():
+    matcher = KeywordMatcher([{"keywords": ["he said", "said no"]}, {"keywords": ["no"]}])
+    assert [m.keyword for m in matcher.find_all("he said no")] == ["he said", "said no", "no"]
@@ -0,0 +1,22 @@
+from src.core.partials import LocalAgreement
+
+def test_words_commit_when_two_hypotheses_agree():
+    la = LocalAgreement()
+    assert la.update("the price") == []  # Nothing to agree with yet
+    assert la.update("the price is too") == ["the", "price"]
+    assert la.update("the price is too high") == ["is", "too"]
+    # Revisions after the committed prefix do not un-commit words
+    assert la.update("the price, is to hire") == []
+    assert la.committed == ["the", "price", "is", "too"]
+
+def test_agreement_ignores_case_and_punctuation():
+    la = LocalAgreement()
+    la.update("We use Jira")
+    assert la.update("we use jira, mostly") == ["we", "use", "jira,"]
+
+def test_finalize_returns_uncommitted_tail():
+    la = LocalAgreement()
+    la.update("send me a")
+    la.update("send me a proposal")
+    assert la.finalize("send me a proposal today") == ["proposal", "today"]
+    assert la.committed == []
@@ -0,0 +1,43 @@
+import numpy as np
+from src.core.resampler import StreamingResampler
+
+
+def tone(freq, rate, seconds, channels=1, amp=8000):
+    t = np.arange(int(rate * seconds)) / rate
+    mono = (amp * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+    return np.repeat(mono, channels) if channels > 1 else mono
+
+
+def dominant_freq(x, rate):
+    spectrum = np.abs(np.fft.rfft(x.astype(np.float64) * np.hanning(len(x))))
+    return np.fft.rfftfreq(len(x), 1 / rate)[spectrum.argmax()]
+
+
+def test_48k_stereo_to_16k_mono_keeps_tone_and_level():
+    rs = StreamingResampler(48000, 16000, channels=2)
+    out = rs.process(tone(1000, 48000, 1.0, channels=2))
+    assert abs(len(out) - 16000) <= rs.taps
+    assert abs(dominant_freq(out, 16000) - 1000) < 5
+    steady = out[len(out) // 4:]
+    assert abs(np.abs(steady).max() - 8000) < 400
+
+
+def test_chunked_output_matches_one_shot():
+    pcm = tone(440, 44100, 0.5) + tone(3000, 44100, 0.5, amp=2000)
+    one_shot = StreamingResampler(44100).process(pcm)
+    rs = StreamingResampler(44100)
+    chunks = [rs.process(pcm[i:i + 1411]) for i in range(0, len(pcm), 1411)]
+    assert np.array_equal(np.concatenate(chunks), one_shot)
+
+
+def test_aliasing_tone_is_removed():
+    # 12 kHz is above the 8 kHz output Nyquist: must be filtered, not folded to 4 kHz
+    out = StreamingResampler(48000).process(tone(12000, 48000, 0.5))
+    assert np.abs(out[200:]).max() < 200
+
+
+def test_passthrough_for_native_format():
+    pcm = tone(1000, 16000, 0.1)
+    rs = StreamingResampler(16000)
+    assert rs.passthrough and rs.process(pcm) is pcm
+
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from src.adapters import rules as rules_module
+from src.adapters.rules import RuleStore
+from src.core.nlp_router import NLPRouter
+
+GOOD = {"keywords": ["budget"], "trigger": {"title": "Pricing", "message": "ROI", "color_hex": "#FFA500"}}
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def subscribe(self, channel):
+        self.redis.subscribes += 1
+        if self.redis.subscribes == 1:
+            # An update is published while the subscription is down
+            self.redis.docs["acme"] = json.dumps({"version": "2", "rules": [GOOD]})
+            raise ConnectionError("connection reset")
+
+    async def listen(self):
+        yield {"type": "subscribe"}
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.docs = {}
+        self.subscribes = 0
+
+    async def get(self, key):
+        return self.docs.get(key[len(RuleStore.KEY_PREFIX):])
+
+    async def scan_iter(self, match=None):
+        for tenant in list(self.docs):
+            yield RuleStore.KEY_PREFIX + tenant
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+def make_store():
+    router = NLPRouter()
+    store = RuleStore(router)
+    store.redis = FakeRedis()
+    return router, store
+
+
+def test_malformed_rules_are_skipped():
+    router, store = make_store()
+    store.redis.docs["acme"] = json.dumps({"version": "1", "rules": [
+        GOOD,
+        {"keywords": ["price"]},  # No trigger
+        {"keywords": "cost", "trigger": GOOD["trigger"]},
+        {"keywords": ["jira"], "trigger": {"title": "Competitor"}},
+    ]})
+    asyncio.run(store.load("acme"))
+
+    assert router.rulesets["acme"].rules == [GOOD]
+    assert router.process("no price or cost or jira here", tenant="acme") is None
+    assert router.process("over budget", tenant="acme")["title"] == "Pricing"
+
+
+def test_watch_resubscribes_and_reloads_missed_updates(monkeypatch):
+    monkeypatch.setattr(rules_module, "WATCH_RETRY_SECONDS", 0)
+    router, store = make_store()
+
+    async def run():
+        task = asyncio.create_task(store.watch())
+        for _ in range(100):
+            if "acme" in router.rulesets:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(run())
+    assert store.redis.subscribes == 2
+    assert router.rulesets["acme"].version == "2"
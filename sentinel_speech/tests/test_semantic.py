@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from src.core.nlp_router import NLPRouter
+from src.core.semantic import PlaybookIndex, SemanticMatcher
+from src.core.timer_wheel import TimerWheel
+
+PRICING = {"trigger": {"title": "Pricing Objection", "message": "m", "color_hex": "#FF0000"}}
+COMPETITOR = {"trigger": {"title": "Competitor Alert", "message": "m", "color_hex": "#0000FF"}}
+
+
+class FakeEmbedder:
+    """Maps known phrases to fixed unit vectors, everything else to a third axis."""
+    VECTORS = {"too expensive": [1, 0, 0], "we use jira": [0, 1, 0]}
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([self.VECTORS.get(t, [0, 0, 1]) for t in texts], dtype=np.float32)
+
+
+class FakeMirror:
+    def __init__(self, index):
+        self.index = index
+
+    async def search(self, queries, tenants=None):
+        return self.index.search(queries, tenants)
+
+
+def test_playbook_index_normalises_and_picks_best():
+    index = PlaybookIndex(np.array([[2, 0, 0], [0, 3, 0]]), [PRICING, COMPETITOR])
+    hits = index.search(np.array([[0, 1, 0], [0.8, 0.6, 0]], dtype=np.float32))
+    assert hits[0] == (1.0, COMPETITOR)
+    assert hits[1][1] is PRICING and abs(hits[1][0] - 0.8) < 1e-6
+    assert PlaybookIndex(np.zeros((0, 3)), []).search(np.ones((1, 3))) == [None]
+
+
+def test_semantic_matcher_batches_and_thresholds():
+    embedder = FakeEmbedder()
+    index = PlaybookIndex(np.array([[1, 0, 0], [0, 1, 0]]), [PRICING, COMPETITOR])
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            matcher = SemanticMatcher(embedder, FakeMirror(index), executor,
+                                      threshold=0.5, max_batch=8, max_wait_ms=5)
+            return await asyncio.gather(
+                matcher.match("too expensive"),
+                matcher.match("we use jira"),
+                matcher.match("nice weather"),
+            )
+
+    results = asyncio.run(run())
+    assert results == [PRICING["trigger"], COMPETITOR["trigger"], None]
+    assert embedder.calls == [["too expensive", "we use jira", "nice weather"]]
+
+
+def test_semantic_matcher_only_matches_the_tenants_entries():
+    acme_pricing = {**PRICING, "org_id": "acme"}
+    index = PlaybookIndex(np.array([[1, 0, 0], [0, 1, 0]]), [acme_pricing, COMPETITOR])
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            matcher = SemanticMatcher(FakeEmbedder(), FakeMirror(index), executor,
+                                      threshold=0.5, max_batch=8, max_wait_ms=5)
+            return await asyncio.gather(
+                matcher.match("too expensive", "acme"),
+                matcher.match("too expensive", "globex"),
+                matcher.match("we use jira", "globex"),  # Shared entry
+            )
+
+    assert asyncio.run(run()) == [PRICING["trigger"], None, COMPETITOR["trigger"]]
+
+
+def test_accept_shares_cooldowns_with_keyword_matches():
+    router = NLPRouter(wheel=TimerWheel(tick=0.1, now=0))
+    trigger = router.process("that is too expensive", session_id="s1")
+    assert trigger["title"] == "Pricing Objection"
+
+    # Same title from the semantic path is suppressed while cooling down
+    assert router.accept(trigger, "s1") is False
+    assert router.accept(trigger, "s2") is True
@@ -0,0 +1,47 @@
+from src.core.audio_buffer import AudioBufferPool
+from src.core.session import SessionRegistry
+from src.core.timer_wheel import TimerWheel
+
+def make_registry(**kwargs):
+    evicted = []
+    pool = AudioBufferPool(max_free=10, sample_rate=10, max_duration=1)
+    wheel = TimerWheel(tick=1.0, now=0)
+    registry = SessionRegistry(
+        pool, lambda state, reason: evicted.append((state.session_id, reason)), wheel, **kwargs
+    )
+    return registry, wheel, pool, evicted
+
+def test_capacity_evicts_least_recently_active():
+    registry, _, pool, evicted = make_registry(max_sessions=2, idle_timeout=60)
+    registry.touch("a")
+    b_buffer = registry.touch("b").buffer
+    registry.touch("a")  # "b" is now the stalest
+    registry.touch("c")
+
+    assert evicted == [("b", "capacity")]
+    assert "a" in registry and "c" in registry
+    assert registry.get("c").buffer is b_buffer  # Recycled through the pool
+
+def test_idle_timeout_on_timer_wheel():
+    registry, wheel, pool, evicted = make_registry(max_sessions=10, idle_timeout=5)
+    registry.touch("a")
+    registry.touch("b")
+
+    wheel.advance(3)
+    registry.touch("b")  # Activity only stamps last_seen, no reschedule
+
+    wheel.advance(5)
+    assert evicted == [("a", "idle")]
+    assert "b" in registry
+
+    wheel.advance(8)  # b's timer re-armed for the remaining 3s
+    assert evicted == [("a", "idle"), ("b", "idle")]
+    assert len(wheel) == 0 and len(pool) == 2
+
+def test_explicit_end_cancels_idle_timer():
+    registry, wheel, _, evicted = make_registry(max_sessions=10, idle_timeout=5)
+    registry.touch("a")
+    assert registry.end("a")
+    assert not registry.end("a")
+    assert len(wheel) == 0
+    assert evicted == [("a", "ended")]
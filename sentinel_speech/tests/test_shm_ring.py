@@ -0,0 +1,30 @@
+from src.core.shm_ring import ShmRing, RECORD_AUDIO, RECORD_END
+
+
+def test_records_round_trip_in_order_across_wrap():
+    ring = ShmRing(capacity=256)
+    reader = ShmRing(ring.name)
+    try:
+        for i in range(20):
+            payload = bytes([i]) * (40 + i)
+            assert ring.put(RECORD_AUDIO, f"s{i % 3}", payload)
+            assert reader.get() == (RECORD_AUDIO, f"s{i % 3}", payload)
+        assert ring.put(RECORD_END, "s1")
+        assert reader.drain(10) == [(RECORD_END, "s1", b"")]
+        assert reader.get() is None and len(ring) == 0
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_full_ring_rejects_without_overwriting():
+    ring = ShmRing(capacity=256)
+    try:
+        assert ring.put(RECORD_AUDIO, "a", b"x" * 200)
+        assert not ring.put(RECORD_AUDIO, "b", b"y" * 60)
+        assert not ring.put(RECORD_AUDIO, "c", b"z" * 500)  # Larger than the ring
+        assert ring.get() == (RECORD_AUDIO, "a", b"x" * 200)
+        assert ring.put(RECORD_AUDIO, "b", b"y" * 60)  # Wraps to the start
+        assert ring.get() == (RECORD_AUDIO, "b", b"y" * 60)
+    finally:
+        ring.close()
@@ -0,0 +1,148 @@
+import asyncio
+
+from src.adapters.state import StateManager
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def expire(self, key, seconds):
+        self.ops.append(("expire", key, seconds))
+
+    async def execute(self, raise_on_error=True):
+        self.redis.round_trips += 1
+        results = []
+        for op, key, arg in self.ops:
+            if op == "xadd":
+                results.append(self.redis.xadd_at_start(key, arg))
+            else:
+                self.redis.expiries[key] = arg
+                results.append(True)
+        return results
+
+
+class FakeScript:
+    """Stands in for _XADD_AT_START (queued on a pipeline)."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def __call__(self, keys, args, client):
+        client.ops.append(("xadd", keys[0], args))
+        return client
+
+
+class FakeRedis:
+    def __init__(self):
+        self.streams = {}  # key -> [(id, fields)]
+        self.expiries = {}
+        self.round_trips = 0
+        self.ranges = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        return FakeScript(self)
+
+    def xadd_at_start(self, key, args):
+        start_ms, _maxlen, *pairs = args
+        entries = self.streams.setdefault(key, [])
+        entry_id = (start_ms, 0)
+        if entries and entries[-1][0] >= entry_id:
+            entry_id = (entries[-1][0][0], entries[-1][0][1] + 1)
+        elif entry_id == (0, 0):
+            entry_id = (0, 1)
+        # As Redis: IDs must increase and 0-0 is reserved
+        assert entry_id > (0, 0) and (not entries or entry_id > entries[-1][0])
+        entries.append((entry_id, dict(zip(pairs[::2], pairs[1::2]))))
+        return f"{entry_id[0]}-{entry_id[1]}"
+
+    async def xrange(self, key, min="-", max="+"):
+        self.ranges.append((min, max))
+        low = -1 if min == "-" else min
+        high = float("inf") if max == "+" else max
+        return [(f"{ms}-{seq}", fields) for (ms, seq), fields in self.streams.get(key, [])
+                if low <= ms <= high]
+
+    async def close(self):
+        pass
+
+
+def test_appends_from_many_sessions_share_one_round_trip():
+    fake = FakeRedis()
+
+    async def run():
+        state = StateManager(flush_interval_ms=1, client=fake)
+        state.append_transcript("a", "hello there", 0.0, 1.2)
+        state.append_transcript("b", "hi", 0.5, 0.9)
+        state.append_transcript("a", "how are you", 1.5, 2.4, speaker="customer")
+        await asyncio.sleep(0.01)
+        segments = await state.get_segments("a", start_offset=1.3)
+        text = await state.get_transcript("a")
+        await state.close()
+        return segments, text
+
+    segments, text = asyncio.run(run())
+    assert fake.round_trips == 1
+    assert set(fake.expiries) == {"transcript:a", "transcript:b"}
+    assert segments == [
+        {"text": "how are you", "start_offset": 1.5, "end_offset": 2.4, "speaker": "customer"}
+    ]
+    assert text == "hello there how are you"
+
+
+def test_close_flushes_pending_segments():
+    fake = FakeRedis()
+
+    async def run():
+        state = StateManager(flush_interval_ms=1000, client=fake)
+        state.append_transcript("a", "bye", 3.0, 3.5)
+        await state.close()
+
+    asyncio.run(run())
+    assert fake.streams["transcript:a"] == [
+        ((3000, 0), {"text": "bye", "start": "3.000", "end": "3.500", "speaker": "mixed"})
+    ]
+
+
+def test_range_reads_are_selected_by_entry_id():
+    fake = FakeRedis()
+
+    async def run():
+        state = StateManager(flush_interval_ms=1, client=fake)
+        state.range_slack_ms = 10000
+        state.append_transcript("a", "agent", 5.0, 6.0)
+        state.append_transcript("a", "customer", 1.0, 7.5, speaker="customer")  # Finished later
+        state.append_transcript("a", "later", 120.0, 121.0)
+        await asyncio.sleep(0.01)
+        early = await state.get_segments("a", 0.0, 4.0)
+        late = await state.get_segments("a", 110.0, 130.0)
+        await state.close()
+        return early, late
+
+    early, late = asyncio.run(run())
+    # Out-of-order start keeps IDs increasing
+    assert [entry_id for entry_id, _ in fake.streams["transcript:a"]] == [(5000, 0), (5000, 1), (120000, 0)]
+    assert fake.ranges == [(0, 14000), (100000, 140000)]
+    assert [s["text"] for s in early] == ["customer"]
+    assert [s["text"] for s in late] == ["later"]
+
+
+def test_segment_at_offset_zero_is_stored():
+    fake = FakeRedis()
+
+    async def run():
+        state = StateManager(flush_interval_ms=1, client=fake)
+        state.append_transcript("a", "hello", 0.0, 0.8)
+        state.append_transcript("a", "again", 0.0, 0.5, speaker="customer")
+        await asyncio.sleep(0.01)
+        segments = await state.get_segments("a", 0.0, 1.0)
+        await state.close()
+        return segments
+
+    segments = asyncio.run(run())
+    assert [entry_id for entry_id, _ in fake.streams["transcript:a"]] == [(0, 1), (0, 2)]
+    assert [s["text"] for s in segments] == ["hello", "again"]
@@ -0,0 +1,82 @@
+import asyncio
+
+import numpy as np
+
+from src.adapters.bus import InMemoryBus
+from src.workers.stream_processor import StreamProcessor
+from sentinel_shared.utils.audio import pack_frame
+
+# Offline pipeline: energy VAD, scripted transcriber, no Redis/Triton/NATS
+
+class EnergyVAD:
+    def infer_batch(self, frames, streams):
+        return np.sqrt(np.mean(frames * frames, axis=1)) / 0.02
+
+class FakeTranscriber:
+    def __init__(self):
+        self.audios = []
+
+    async def connect(self):
+        pass
+
+    async def transcribe_batch(self, audios):
+        self.audios.extend(audios)
+        return ["hello there"] * len(audios)
+
+class FakeState:
+    def __init__(self):
+        self.segments = []
+
+    def append_transcript(self, session_id, text, start_offset=0.0, end_offset=0.0, speaker="mixed"):
+        self.segments.append((session_id, text))
+
+def make_processor():
+    transcriber = FakeTranscriber()
+    state = FakeState()
+    processor = StreamProcessor(
+        bus=InMemoryBus(), vad=EnergyVAD(), transcriber=transcriber, state_db=state,
+        rule_store=object(), semantic_matching=False
+    )
+    processor.nc = processor.bus
+    return processor, transcriber, state
+
+def test_end_scores_frames_still_queued_for_vad():
+    async def run():
+        processor, transcriber, state = make_processor()
+        speech = (8000 * np.sin(np.arange(16000) / 5)).astype(np.int16)
+        # 1s of speech, handed over and ended before any VAD batch tick
+        processor.handle_frame("acme_alice_1", pack_frame(0, speech.tobytes(), capture_us=0))
+        assert len(processor.vad_scheduler) > 0
+        processor.handle_end("acme_alice_1")
+        await asyncio.sleep(0.1)
+        return processor, transcriber, state
+
+    processor, transcriber, state = asyncio.run(run())
+    assert len(processor.vad_scheduler) == 0
+    # The last decode is the final: the whole second, not just what a tick had scored
+    assert len(transcriber.audios[-1]) > 15000
+    assert state.segments == [("acme_alice_1", "hello there")]
+
+
+def test_resumed_replay_only_adds_unplayed_audio():
+    async def run():
+        processor, _, _ = make_processor()
+        block = bytes(1024 * 2)
+        for seq in range(5):
+            processor.handle_frame("acme_alice_1", pack_frame(seq, block, capture_us=0))
+        # Cross-pod resume: the client replays 3..7 as one merged frame
+        processor.handle_frame("acme_alice_1", pack_frame(3, block * 5, capture_us=0, frames=5))
+        processor.vad_scheduler.flush()
+        return processor.sessions.get("acme_alice_1")
+
+    state = asyncio.run(run())
+    assert state.channels[0].buffer.total_samples == 8 * 1024
+
+
+def test_semantic_matching_is_skipped_without_the_embedder_model(monkeypatch):
+    monkeypatch.setattr("src.workers.stream_processor.embedder_available", lambda: False)
+    processor = StreamProcessor(
+        bus=InMemoryBus(), vad=EnergyVAD(), transcriber=FakeTranscriber(), state_db=FakeState(),
+        rule_store=object(), semantic_matching=True
+    )
+    assert processor.semantic is None
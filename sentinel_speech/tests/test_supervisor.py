@@ -0,0 +1,72 @@
+import asyncio
+
+from sentinel_shared.schemas.events import AudioConfig
+from src.core.codecs import decode_format
+from src.core.config import settings
+from src.core.shm_ring import ShmRing, RECORD_AUDIO, RECORD_FORMAT
+from src.workers.supervisor import Supervisor, shard_for
+
+
+class FakeMsg:
+    def __init__(self, subject, data=b"", headers=None):
+        self.subject = subject
+        self.data = data
+        self.headers = headers
+
+
+def test_respawned_shard_is_sent_formats_again():
+    supervisor = Supervisor(n_shards=2, ring_bytes=4096)
+    supervisor._spawn = lambda index: None
+    shard = shard_for("s1", 2)
+    reader = ShmRing(supervisor.rings[shard].name)
+    msg = FakeMsg("audio.raw.s1", b"frame", AudioConfig(sample_rate=48000, channels=2).to_headers())
+    try:
+        asyncio.run(supervisor.audio_handler(msg))
+        asyncio.run(supervisor.audio_handler(msg))
+        assert [r[0] for r in reader.drain(10)] == [RECORD_FORMAT, RECORD_AUDIO, RECORD_AUDIO]
+
+        # The new process starts from the default format
+        supervisor._restart(shard)
+        asyncio.run(supervisor.audio_handler(msg))
+        records = reader.drain(10)
+        assert [r[0] for r in records] == [RECORD_FORMAT, RECORD_AUDIO]
+        assert decode_format(records[0][2])[1:3] == (48000, 2)
+    finally:
+        reader.close()
+        for ring in supervisor.rings:
+            ring.close()
+
+def test_format_shed_on_full_ring_is_sent_again():
+    supervisor = Supervisor(n_shards=1, ring_bytes=4096)
+    reader = ShmRing(supervisor.rings[0].name)
+    msg = FakeMsg("audio.raw.s1", b"frame", AudioConfig(sample_rate=48000, channels=2).to_headers())
+    try:
+        while supervisor.rings[0].put(RECORD_AUDIO, "other", b"\x00" * 256):
+            pass
+        # No room for the format record: the frame would be misread, so it goes too
+        asyncio.run(supervisor.audio_handler(msg))
+        assert "s1" not in supervisor.formats
+
+        reader.drain(1000)
+        asyncio.run(supervisor.audio_handler(msg))
+        records = reader.drain(10)
+        assert [r[0] for r in records] == [RECORD_FORMAT, RECORD_AUDIO]
+        assert decode_format(records[0][2])[1:3] == (48000, 2)
+    finally:
+        reader.close()
+        for ring in supervisor.rings:
+            ring.close()
+
+def test_idle_sessions_are_forgotten():
+    supervisor = Supervisor(n_shards=1, ring_bytes=4096)
+    msg = FakeMsg("audio.raw.s1", b"frame", AudioConfig(sample_rate=48000).to_headers())
+    try:
+        asyncio.run(supervisor.audio_handler(msg))
+        seen = supervisor.formats["s1"][1]
+        supervisor._prune_formats(seen + 1.0)
+        assert "s1" in supervisor.formats
+        supervisor._prune_formats(seen + settings.SESSION_IDLE_TIMEOUT)
+        assert "s1" not in supervisor.formats
+    finally:
+        for ring in supervisor.rings:
+            ring.close()
@@ -0,0 +1,23 @@
+from src.core.timer_wheel import TimerWheel
+
+def test_timers_fire_in_order_across_levels():
+    wheel = TimerWheel(tick=1.0, slots=(4, 4, 4), now=0)
+    fired = []
+    for delay in (1, 3, 6, 17, 40, 100):  # Spans all levels and the overflow
+        wheel.schedule(delay, lambda d=delay: fired.append((d, wheel.now)))
+
+    for t in range(1, 120):
+        wheel.advance(t)
+
+    # Each timer fires exactly on its tick
+    assert fired == [(1, 1), (3, 3), (6, 6), (17, 17), (40, 40), (100, 100)]
+    assert len(wheel) == 0
+
+def test_cancel_is_constant_time_and_final():
+    wheel = TimerWheel(tick=1.0, slots=(4, 4), now=0)
+    fired = []
+    timer = wheel.schedule(10, lambda: fired.append("x"))
+    wheel.cancel(timer)
+    wheel.cancel(timer)  # Idempotent
+    wheel.advance(20)
+    assert fired == [] and len(wheel) == 0
@@ -0,0 +1,30 @@
+import time
+
+from prometheus_client import REGISTRY
+from src.core.tracing import Trace, is_sampled
+
+
+def stage_count(stage):
+    return REGISTRY.get_sample_value("speech_stage_seconds_count", {"stage": stage}) or 0
+
+
+def test_sampling_is_per_session_and_stable():
+    assert is_sampled("call-1", rate=1.0)
+    assert not is_sampled("call-1", rate=0.0)
+    assert all(is_sampled(f"s{i}", 0.3) == is_sampled(f"s{i}", 0.3) for i in range(50))
+    assert 5 < sum(is_sampled(f"s{i}", 0.3) for i in range(100)) < 60
+
+
+def test_trace_records_stages_and_end_to_end():
+    before = stage_count("test_stage"), stage_count("audio_to_trigger")
+    trace = Trace("call-1", time.perf_counter(), sampled=True)
+    trace.observe("test_stage", 0.002)
+    trace.finish()
+
+    assert len(trace.trace_id) == 16
+    assert [name for name, _ in trace.stages] == ["test_stage", "audio_to_trigger"]
+    assert (stage_count("test_stage"), stage_count("audio_to_trigger")) == (before[0] + 1, before[1] + 1)
+
+    unsampled = Trace("call-2", time.perf_counter(), sampled=False)
+    unsampled.observe("test_stage", 0.001)
+    assert unsampled.trace_id == "" and unsampled.stages == []
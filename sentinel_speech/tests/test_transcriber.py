@@ -0,0 +1,172 @@
+import asyncio
+import numpy as np
+from src.core.batcher import TranscriptionBatcher
+
+# Triton is not contacted here; FakeTranscriber records each batched call.
+
+class FakeTranscriber:
+    def __init__(self):
+        self.calls = []
+
+    async def transcribe_batch(self, audios):
+        self.calls.append([len(a) for a in audios])
+        return [f"len={len(a)}" for a in audios]
+
+def test_batcher_groups_sessions_into_one_request():
+    async def run():
+        fake = FakeTranscriber()
+        batcher = TranscriptionBatcher(fake, max_batch=8, max_wait_ms=5,
+                                       bucket_edges=[1.0], sample_rate=10)
+        texts = await asyncio.gather(*[
+            batcher.submit(np.zeros(n, dtype=np.float32)) for n in (5, 8, 25)
+        ])
+        return fake.calls, texts
+
+    calls, texts = asyncio.run(run())
+    # Short utterances share a request; the long one goes in its own bucket
+    assert sorted(calls) == [[5, 8], [25]]
+    assert texts == ["len=5", "len=8", "len=25"]
+
+def test_batcher_flushes_when_full():
+    async def run():
+        fake = FakeTranscriber()
+        batcher = TranscriptionBatcher(fake, max_batch=2, max_wait_ms=10000,
+                                       bucket_edges=[1.0], sample_rate=10)
+        await asyncio.wait_for(asyncio.gather(
+            batcher.submit(np.zeros(3, dtype=np.float32)),
+            batcher.submit(np.zeros(4, dtype=np.float32))
+        ), timeout=1)
+        return fake.calls
+
+    assert asyncio.run(run()) == [[3, 4]]
+
+def test_batcher_close_sends_queued_and_drains_in_flight():
+    async def run():
+        fake = FakeTranscriber()
+        batcher = TranscriptionBatcher(fake, max_batch=8, max_wait_ms=10000,
+                                       bucket_edges=[1.0], sample_rate=10)
+        pending = asyncio.ensure_future(batcher.submit(np.zeros(3, dtype=np.float32)))
+        await asyncio.sleep(0)
+        await batcher.close()
+        return fake.calls, batcher._sends, await asyncio.wait_for(pending, timeout=1)
+
+    calls, sends, text = asyncio.run(run())
+    assert calls == [[3]] and not sends and text == "len=3"
+
+# Transcriber against a fake grpc.aio client (no Triton)
+
+from tritonclient.utils import InferenceServerException
+from src.core.transcriber import Transcriber
+
+
+class FakeResult:
+    def __init__(self, texts):
+        self.texts = texts
+
+    def as_numpy(self, name):
+        return np.array([[t.encode()] for t in self.texts], dtype=object)
+
+
+class FakeTritonClient:
+    def __init__(self, live=True, delay=0.0, status=None):
+        self.live = live
+        self.delay = delay
+        self.status = status  # Raise an InferenceServerException with this status
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.closed = False
+
+    async def is_server_live(self, client_timeout=None):
+        return self.live
+
+    async def is_model_ready(self, model_name, client_timeout=None):
+        return self.live
+
+    async def infer(self, model_name, inputs, outputs, client_timeout=None):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.delay > client_timeout:
+                await asyncio.sleep(client_timeout)
+                raise InferenceServerException("Deadline Exceeded", status="StatusCode.DEADLINE_EXCEEDED")
+            await asyncio.sleep(self.delay)
+            if self.status:
+                raise InferenceServerException("failed", status=self.status)
+            batch = inputs[0].shape()[0]
+            return FakeResult([f"text{i}" for i in range(batch)])
+        finally:
+            self.active -= 1
+
+    async def close(self):
+        self.closed = True
+
+
+def make_transcriber(client, max_inflight=64, replacement=None):
+    transcriber = Transcriber(url="fake:8001", max_inflight=max_inflight)
+    transcriber.client = client
+    transcriber.healthy = True
+    transcriber.channels_opened = 0
+
+    def new_client():
+        transcriber.channels_opened += 1
+        return replacement or FakeTritonClient()
+
+    transcriber._new_client = new_client
+    return transcriber
+
+
+def test_transcribe_batch_returns_one_text_per_utterance():
+    client = FakeTritonClient()
+    transcriber = make_transcriber(client)
+    audios = [np.ones(n, dtype=np.float32) for n in (3, 7)]
+    assert asyncio.run(transcriber.transcribe_batch(audios)) == ["text0", "text1"]
+
+
+def test_missed_deadline_returns_empty_without_reconnecting():
+    client = FakeTritonClient(delay=1.0)
+    transcriber = make_transcriber(client)
+    texts = asyncio.run(transcriber.transcribe_batch([np.ones(4, dtype=np.float32)], timeout=0.02))
+    assert texts == [""]
+    assert transcriber.healthy and transcriber._reconnect_task is None
+
+
+def test_inflight_requests_are_bounded():
+    client = FakeTritonClient(delay=0.01)
+    transcriber = make_transcriber(client, max_inflight=2)
+
+    async def run():
+        return await asyncio.gather(*[
+            transcriber.transcribe_batch([np.ones(4, dtype=np.float32)]) for _ in range(6)
+        ])
+
+    assert asyncio.run(run()) == [["text0"]] * 6
+    assert client.calls == 6 and client.peak == 2
+
+
+def test_unhealthy_fails_fast():
+    client = FakeTritonClient()
+    transcriber = make_transcriber(client)
+    transcriber.healthy = False
+    assert asyncio.run(transcriber.transcribe_batch([np.ones(4, dtype=np.float32)] * 2)) == ["", ""]
+    assert client.calls == 0
+
+
+def test_unavailable_triggers_one_tracked_reconnect():
+    client = FakeTritonClient(status="StatusCode.UNAVAILABLE")
+    replacement = FakeTritonClient()
+    transcriber = make_transcriber(client, replacement=replacement)
+
+    async def run():
+        audio = [np.ones(4, dtype=np.float32)]
+        results = await asyncio.gather(*[transcriber.transcribe_batch(audio) for _ in range(3)])
+        task = transcriber._reconnect_task
+        assert task is not None
+        await task
+        return results
+
+    assert asyncio.run(run()) == [[""]] * 3
+    # Concurrent failures shared one reconnect onto a fresh channel
+    assert transcriber.channels_opened == 1 and client.closed
+    assert transcriber.client is replacement and transcriber.healthy
@@ -0,0 +1,54 @@
+import numpy as np
+from src.core.vad import VADStream, VADBatchScheduler
+
+# The real Silero model is not loaded here. FakeEngine mimics its contract:
+# one call per batch, state gathered/scattered per row.
+
+class FakeEngine:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def infer_batch(self, frames, streams):
+        self.batch_sizes.append(len(streams))
+        for stream in streams:
+            # Count frames seen by this stream in its recurrent state
+            stream.h = stream.h + 1
+        return frames.mean(axis=1)
+
+def test_scheduler_batches_across_sessions():
+    engine = FakeEngine()
+    results = []
+    scheduler = VADBatchScheduler(
+        engine, lambda sid, frame, speech: results.append((sid, speech)),
+        frame_samples=4, max_batch=1000
+    )
+    a, b = VADStream(), VADStream()
+    loud = np.full(4, 30000, dtype=np.int16)
+    quiet = np.zeros(4, dtype=np.int16)
+
+    scheduler.submit("a", a, loud)
+    scheduler.submit("b", b, quiet)
+    scheduler.flush()
+
+    assert engine.batch_sizes == [2]
+    assert results == [("a", True), ("b", False)]
+
+def test_scheduler_keeps_stream_order_and_state():
+    engine = FakeEngine()
+    results = []
+    scheduler = VADBatchScheduler(
+        engine, lambda sid, frame, speech: results.append((sid, int(frame[0]))),
+        frame_samples=2, max_batch=1000
+    )
+    a = VADStream()
+
+    # 5 samples -> 2 frames now, 1 sample carried to the next chunk
+    scheduler.submit("a", a, np.array([1, 1, 2, 2, 3], dtype=np.int16))
+    scheduler.flush()
+    assert results == [("a", 1), ("a", 2)]
+    assert engine.batch_sizes == [1, 1]  # Dependent frames run in separate rounds
+    assert a.h[0, 0, 0] == 2
+
+    scheduler.submit("a", a, np.array([3], dtype=np.int16))
+    scheduler.flush()
+    assert results[-1] == ("a", 3)